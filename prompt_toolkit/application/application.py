@@ -4,9 +4,9 @@ from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.cache import SimpleCache
 from prompt_toolkit.clipboard import Clipboard, InMemoryClipboard
 from prompt_toolkit.enums import EditingMode
-from prompt_toolkit.eventloop import get_event_loop, ensure_future, Return, run_in_executor, run_until_complete, call_from_executor, From
+from prompt_toolkit.eventloop import get_event_loop, ensure_future, Return, run_in_executor, run_until_complete, call_from_executor, call_later, From
 from prompt_toolkit.eventloop.base import get_traceback_from_context
-from prompt_toolkit.filters import to_filter, Condition
+from prompt_toolkit.filters import to_filter, Condition, cache_filter_results
 from prompt_toolkit.input.base import Input
 from prompt_toolkit.input.defaults import get_default_input
 from prompt_toolkit.input.typeahead import store_typeahead, get_typeahead
@@ -76,6 +76,9 @@ class Application(object):
     :param max_render_postpone_time: When there is high CPU (a lot of other
         scheduled calls), postpone the rendering max x seconds.  '0' means:
         don't postpone. '.5' means: try to draw at least twice a second.
+    :param cache_filters: When True, evaluate every filter only once during a
+        rendering, and only once while matching a key press against the key
+        bindings. (See :func:`~prompt_toolkit.filters.cache_filter_results`.)
 
     Filters:
 
@@ -126,6 +129,7 @@ class Application(object):
                  reverse_vi_search_direction=False,
                  min_redraw_interval=None,
                  max_render_postpone_time=0,
+                 cache_filters=False,
 
                  on_reset=None, on_invalidate=None,
                  before_render=None, after_render=None,
@@ -192,6 +196,7 @@ class Application(object):
         self.enable_page_navigation_bindings = enable_page_navigation_bindings
         self.min_redraw_interval = min_redraw_interval
         self.max_render_postpone_time = max_render_postpone_time
+        self.cache_filters = cache_filters
 
         # Events.
         self.on_invalidate = Event(self, on_invalidate)
@@ -392,10 +397,7 @@ class Application(object):
             # of time between redraws.
             diff = time.time() - self._last_redraw_time
             if diff < self.min_redraw_interval:
-                def redraw_in_future():
-                    time.sleep(self.min_redraw_interval - diff)
-                    schedule_redraw()
-                run_in_executor(redraw_in_future)
+                call_later(self.min_redraw_interval - diff, schedule_redraw)
             else:
                 schedule_redraw()
         else:
@@ -415,6 +417,11 @@ class Application(object):
         """
         # Only draw when no sub application was started.
         if self._is_running and not self._running_in_terminal:
+            # Don't draw intermediate states for an output that can't keep
+            # up. It will invalidate again, when it has caught up.
+            if self.output.backlogged and not render_as_done:
+                return
+
             if self.min_redraw_interval:
                 self._last_redraw_time = time.time()
 
@@ -432,7 +439,7 @@ class Application(object):
             #       at the point where another Application was active. This
             #       would cause prompt_toolkit to render the wrong application
             #       to this output device.
-            with set_app(self):
+            with set_app(self), cache_filter_results(self.cache_filters):
                 if render_as_done:
                     if self.erase_when_done:
                         self.renderer.erase()
@@ -525,11 +532,11 @@ class Application(object):
             f = loop.create_future()
             self.future = f  # XXX: make sure to set this before calling '_redraw'.
 
-            # Counter for cancelling 'flush' timeouts. Every time when a key is
-            # pressed, we start a 'flush' timer for flushing our escape key. But
-            # when any subsequent input is received, a new timer is started and
-            # the current timer will be ignored.
-            flush_counter = [0]  # Non local.
+            # Timer for the 'flush' timeout. Every time when a key is pressed,
+            # we start a 'flush' timer for flushing our escape key. But when
+            # any subsequent input is received, the current timer is cancelled
+            # and a new timer is started.
+            flush_timer = [None]  # Non local.
 
             # Reset.
             self.reset()
@@ -558,23 +565,11 @@ class Application(object):
                 if self.input.closed:
                     f.set_exception(EOFError)
                 else:
-                    # Increase this flush counter.
-                    flush_counter[0] += 1
-                    counter = flush_counter[0]
-
-                    # Automatically flush keys.
-                    # (_daemon needs to be set, otherwise, this will hang the
-                    # application for .5 seconds before exiting.)
-                    run_in_executor(
-                        lambda: auto_flush_input(counter), _daemon=True)
-
-            def auto_flush_input(counter):
-                # Flush input after timeout.
-                # (Used for flushing the enter key.)
-                time.sleep(self.ttimeoutlen)
-
-                if flush_counter[0] == counter:
-                    call_from_executor(flush_input)
+                    # Automatically flush keys after a timeout.
+                    # (Used for flushing the enter key.)
+                    if flush_timer[0]:
+                        flush_timer[0].cancel()
+                    flush_timer[0] = call_later(self.ttimeoutlen, flush_input)
 
             def flush_input():
                 if not self.is_done:
@@ -923,6 +918,9 @@ class _CombinedRegistry(KeyBindingsBase):
     def get_bindings_starting_with_keys(self, keys):
         return self._key_bindings.get_bindings_starting_with_keys(keys)
 
+    def get_filters_starting_with_keys(self, keys):
+        return self._key_bindings.get_filters_starting_with_keys(keys)
+
 
 def _do_wait_for_enter(wait_text):
     """
@@ -167,6 +167,22 @@ class Completer(with_metaclass(ABCMeta, object)):
             assert isinstance(item, Completion)
             yield AsyncGeneratorItem(item)
 
+    def refine_completions(self, document, complete_event, previous_document,
+                           previous_completions):
+        """
+        Opt-in for completers that are "prefix refinable": when the user keeps
+        typing, the completions are a subset of the previous completions. If
+        so, the `Buffer` doesn't have to compute all completions again.
+
+        `document` extends the text before the cursor of `previous_document`,
+        for which `previous_completions` were generated. (By this completer.)
+
+        Return a list of :class:`.Completion` instances for `document`, or
+        `None` if the completions have to be computed from scratch. (The
+        default.)
+        """
+        return None
+
 
 class ThreadedCompleter(Completer):
     """
@@ -193,6 +209,11 @@ class ThreadedCompleter(Completer):
         return generator_to_async_generator(
             lambda: self.completer.get_completions(document, complete_event))
 
+    def refine_completions(self, document, complete_event, previous_document,
+                           previous_completions):
+        return self.completer.refine_completions(
+            document, complete_event, previous_document, previous_completions)
+
     def __repr__(self):
         return 'ThreadedCompleter(%r)' % (self.completer, )
 
@@ -218,14 +239,27 @@ class DynamicCompleter(Completer):
         assert callable(get_completer)
         self.get_completer = get_completer
 
+        # The completer that produced the last completions.
+        self._last_completer = None
+
     def get_completions(self, document, complete_event):
-        completer = self.get_completer() or DummyCompleter()
+        completer = self._last_completer = self.get_completer() or DummyCompleter()
         return completer.get_completions(document, complete_event)
 
     def get_completions_async(self, document, complete_event):
-        completer = self.get_completer() or DummyCompleter()
+        completer = self._last_completer = self.get_completer() or DummyCompleter()
         return completer.get_completions_async(document, complete_event)
 
+    def refine_completions(self, document, complete_event, previous_document,
+                           previous_completions):
+        # Only the completer that produced the previous completions can
+        # refine them.
+        completer = self.get_completer() or DummyCompleter()
+
+        if completer is self._last_completer:
+            return completer.refine_completions(
+                document, complete_event, previous_document, previous_completions)
+
     def __repr__(self):
         return 'DynamicCompleter(%r -> %r)' % (
             self.get_completer, self.get_completer())
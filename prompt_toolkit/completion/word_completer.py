@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
-from six import string_types
+from bisect import bisect_left
+from six import string_types, unichr
 from prompt_toolkit.completion import Completer, Completion
 
 __all__ = [
@@ -22,6 +23,12 @@ class WordCompleter(Completer):
         contain spaces. (Can not be used together with the WORD option.)
     :param match_middle: When True, match not only the start, but also in the
                          middle of the word.
+
+    For prefix matching, a sorted index of the words is built the first time
+    completions are requested. This index is kept as long as the same list
+    (or the same object returned by the callable) is used, and its length
+    doesn't change. (After replacing words in the list itself, assign a new
+    list.) Completions are still yielded in the order of the word list.
     """
     def __init__(self, words, ignore_case=False, meta_dict=None, WORD=False,
                  sentence=False, match_middle=False):
@@ -35,32 +42,138 @@ class WordCompleter(Completer):
         self.sentence = sentence
         self.match_middle = match_middle
 
+        self._index = None
+        self._index_key = None  # (words, len(words), ignore_case) of the index.
+
+    def _get_index(self, words):
+        """
+        Return the `_WordIndex` for this list of words. The index is reused as
+        long as the words object (its identity, not its content), its length
+        and `ignore_case` don't change.
+        """
+        key = self._index_key
+        if (self._index is None or key[0] is not words or
+                key[1] != len(words) or key[2] != self.ignore_case):
+            self._index = _WordIndex(list(words), self.ignore_case)
+            self._index_key = (words, len(self._index.words), self.ignore_case)
+        return self._index
+
+    def _get_word_before_cursor(self, document):
+        " Get word/text before cursor. "
+        if self.sentence:
+            return document.text_before_cursor
+        else:
+            return document.get_word_before_cursor(WORD=self.WORD)
+
+    def _word_matches(self, word, word_before_cursor):
+        """
+        True when the word before the cursor matches. (`word_before_cursor`
+        should already be lowercase when `ignore_case` is set.)
+        """
+        if self.ignore_case:
+            word = word.lower()
+
+        if self.match_middle:
+            return word_before_cursor in word
+        else:
+            return word.startswith(word_before_cursor)
+
     def get_completions(self, document, complete_event):
         # Get list of words.
         words = self.words
         if callable(words):
             words = words()
 
-        # Get word/text before cursor.
-        if self.sentence:
-            word_before_cursor = document.text_before_cursor
+        index = self._get_index(words)
+
+        word_before_cursor = self._get_word_before_cursor(document)
+        match_text = word_before_cursor.lower() if self.ignore_case else word_before_cursor
+
+        if self.match_middle:
+            positions = index.find_substring(match_text)
         else:
-            word_before_cursor = document.get_word_before_cursor(WORD=self.WORD)
+            positions = index.find_prefix(match_text)
 
-        if self.ignore_case:
-            word_before_cursor = word_before_cursor.lower()
-
-        def word_matches(word):
-            """ True when the word before the cursor matches. """
-            if self.ignore_case:
-                word = word.lower()
-
-            if self.match_middle:
-                return word_before_cursor in word
-            else:
-                return word.startswith(word_before_cursor)
-
-        for a in words:
-            if word_matches(a):
-                display_meta = self.meta_dict.get(a, '')
-                yield Completion(a, -len(word_before_cursor), display_meta=display_meta)
+        for i in positions:
+            a = index.words[i]
+            display_meta = self.meta_dict.get(a, '')
+            yield Completion(a, -len(word_before_cursor), display_meta=display_meta)
+
+    def refine_completions(self, document, complete_event, previous_document,
+                           previous_completions):
+        """
+        When the word before the cursor got longer, the completions are the
+        previous completions that still match. (Not when the list of words is
+        a callable, because then, it could have changed.)
+        """
+        if callable(self.words):
+            return None
+
+        word_before_cursor = self._get_word_before_cursor(document)
+        previous_word = self._get_word_before_cursor(previous_document)
+
+        # The word should start at the same position.
+        start = document.cursor_position - len(word_before_cursor)
+        previous_start = previous_document.cursor_position - len(previous_word)
+
+        if start != previous_start or not word_before_cursor.startswith(previous_word):
+            return None
+
+        match_text = word_before_cursor.lower() if self.ignore_case else word_before_cursor
+
+        return [
+            Completion(c.text, -len(word_before_cursor),
+                       display_meta=self.meta_dict.get(c.text, ''))
+            for c in previous_completions
+            if self._word_matches(c.text, match_text)]
+
+
+class _WordIndex(object):
+    """
+    Index of a list of words, for finding the words that start with a given
+    prefix using a binary search.
+
+    :param words: List of words.
+    :param ignore_case: When True, the keys are lowercased.
+    """
+    def __init__(self, words, ignore_case):
+        self.words = words
+        self.ignore_case = ignore_case
+
+        # The (lowercased) keys, in the order of the words.
+        if ignore_case:
+            self.keys = [w.lower() for w in words]
+        else:
+            self.keys = self.words
+
+        # Positions of the words, sorted by key.
+        self.order = sorted(range(len(words)), key=self.keys.__getitem__)
+        self.sorted_keys = [self.keys[i] for i in self.order]
+
+    def find_prefix(self, prefix):
+        """
+        Return the positions of the words for which the key starts with
+        `prefix`, in the order of the words.
+        """
+        if not prefix:
+            return range(len(self.words))
+
+        sorted_keys = self.sorted_keys
+        start = bisect_left(sorted_keys, prefix)
+
+        # Everything before the first string that's bigger than all strings
+        # starting with `prefix`.
+        try:
+            upper = prefix[:-1] + unichr(ord(prefix[-1]) + 1)
+        except ValueError:
+            end = len(sorted_keys)
+        else:
+            end = bisect_left(sorted_keys, upper, start)
+
+        return sorted(self.order[start:end])
+
+    def find_substring(self, text):
+        """
+        Return the positions of the words for which the key contains `text`.
+        """
+        return [i for i, key in enumerate(self.keys) if text in key]
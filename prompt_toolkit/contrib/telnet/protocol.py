@@ -7,7 +7,7 @@ Inspired by `Twisted.conch.telnet`.
 from __future__ import unicode_literals
 
 import struct
-from six import int2byte, binary_type, iterbytes
+from six import int2byte, binary_type
 
 from .log import logger
 
@@ -61,8 +61,10 @@ class TelnetProtocolParser(object):
         self.data_received_callback = data_received_callback
         self.size_received_callback = size_received_callback
 
-        self._parser = self._parse_coroutine()
-        self._parser.send(None)
+        # The parser state is the method that handles the next byte(s).
+        self._state = self._parse_data
+        self._command = None
+        self._subnegotiation = []
 
     def received_data(self, data):
         self.data_received_callback(data)
@@ -124,58 +126,87 @@ class TelnetProtocolParser(object):
         else:
             logger.info('Negotiate (%r got bytes)', len(data))
 
-    def _parse_coroutine(self):
-        """
-        Parser state machine.
-        Every 'yield' expression returns the next byte.
-        """
-        while True:
-            d = yield
+    # Parser state machine. Every state takes the data and the index of the
+    # first byte to handle. It returns the index of the next byte, and sets
+    # the next state.
+
+    def _parse_data(self, data, i):
+        " Normal data. Pass everything until the next IAC at once. "
+        end = data.find(IAC, i)
+        if end == -1:
+            end = len(data)
+        else:
+            self._state = self._parse_iac
 
-            if d == int2byte(0):
-                pass  # NOP
+        chunk = data[i:end]
+        if int2byte(0) in chunk:
+            chunk = chunk.replace(int2byte(0), b'')  # NOP
 
-            # Go to state escaped.
-            elif d == IAC:
-                d2 = yield
+        if chunk:
+            self.received_data(chunk)
 
-                if d2 == IAC:
-                    self.received_data(d2)
+        return end + 1
 
-                # Handle simple commands.
-                elif d2 in (NOP, DM, BRK, IP, AO, AYT, EC, EL, GA):
-                    self.command_received(d2, None)
+    def _parse_iac(self, data, i):
+        " Byte after IAC. "
+        d = data[i:i + 1]
+        self._state = self._parse_data
 
-                # Handle IAC-[DO/DONT/WILL/WONT] commands.
-                elif d2 in (DO, DONT, WILL, WONT):
-                    d3 = yield
-                    self.command_received(d2, d3)
+        if d == IAC:
+            self.received_data(d)
 
-                # Subnegotiation
-                elif d2 == SB:
-                    # Consume everything until next IAC-SE
-                    data = []
+        # Handle simple commands.
+        elif d in (NOP, DM, BRK, IP, AO, AYT, EC, EL, GA):
+            self.command_received(d, None)
 
-                    while True:
-                        d3 = yield
+        # Handle IAC-[DO/DONT/WILL/WONT] commands.
+        elif d in (DO, DONT, WILL, WONT):
+            self._command = d
+            self._state = self._parse_command
 
-                        if d3 == IAC:
-                            d4 = yield
-                            if d4 == SE:
-                                break
-                            else:
-                                data.append(d4)
-                        else:
-                            data.append(d3)
+        # Subnegotiation
+        elif d == SB:
+            self._subnegotiation = []
+            self._state = self._parse_subnegotiation
 
-                    self.negotiate(b''.join(data))
-            else:
-                self.received_data(d)
+        return i + 1
+
+    def _parse_command(self, data, i):
+        " Byte after IAC-[DO/DONT/WILL/WONT]. "
+        self._state = self._parse_data
+        self.command_received(self._command, data[i:i + 1])
+        return i + 1
+
+    def _parse_subnegotiation(self, data, i):
+        " Consume everything until the next IAC-SE. "
+        end = data.find(IAC, i)
+        if end == -1:
+            end = len(data)
+        else:
+            self._state = self._parse_subnegotiation_iac
+
+        self._subnegotiation.append(data[i:end])
+        return end + 1
+
+    def _parse_subnegotiation_iac(self, data, i):
+        " Byte after IAC in a subnegotiation. "
+        d = data[i:i + 1]
+
+        if d == SE:
+            self._state = self._parse_data
+            self.negotiate(b''.join(self._subnegotiation))
+        else:
+            self._subnegotiation.append(d)
+            self._state = self._parse_subnegotiation
+
+        return i + 1
 
     def feed(self, data):
         """
         Feed data to the parser.
         """
         assert isinstance(data, binary_type)
-        for b in iterbytes(data):
-            self._parser.send(int2byte(b))
+        i = 0
+
+        while i < len(data):
+            i = self._state(data, i)
@@ -3,9 +3,11 @@ Telnet server.
 """
 from __future__ import unicode_literals
 
+import errno
 import inspect
 import socket
 import sys
+from collections import deque
 
 from six import int2byte, text_type, binary_type
 
@@ -15,7 +17,7 @@ from prompt_toolkit.eventloop import get_event_loop, ensure_future, Future, From
 from prompt_toolkit.eventloop.context import context
 from prompt_toolkit.formatted_text import to_formatted_text
 from prompt_toolkit.input.defaults import set_default_input
-from prompt_toolkit.input.vt100 import PipeInput
+from prompt_toolkit.input.memory import MemoryInput
 from prompt_toolkit.layout.screen import Size
 from prompt_toolkit.output.defaults import set_default_output
 from prompt_toolkit.output.vt100 import Vt100_Output
@@ -61,24 +63,110 @@ class _ConnectionStdout(object):
     """
     Wrapper around socket which provides `write` and `flush` methods for the
     Vt100_Output output.
+
+    The output is collected until `flush` is called. Then it's sent without
+    blocking the event loop: what the socket doesn't accept right away is
+    queued, and sent when the socket becomes writable again.
+
+    :param high_watermark: When more than this number of bytes is queued, the
+        output is `backlogged`. (Rendering is skipped until the client has
+        caught up, then `on_drained` is called.)
     """
-    def __init__(self, connection, encoding):
+    def __init__(self, connection, encoding, high_watermark=64 * 1024, on_drained=None):
+        assert on_drained is None or callable(on_drained)
+
         self._encoding = encoding
         self._connection = connection
         self._buffer = []
+        self.high_watermark = high_watermark
+        self.on_drained = on_drained
+
+        self._queue = deque()  # Data that was not sent yet.
+        self._queued_size = 0
+        self._writer_added = False
+        self._closed = False
 
     def write(self, data):
         assert isinstance(data, text_type)
         self._buffer.append(data.encode(self._encoding))
-        self.flush()
 
     def flush(self):
+        if self._buffer and not self._closed:
+            data = b''.join(self._buffer)
+            self._queue.append(data)
+            self._queued_size += len(data)
+
+            # When we are waiting for the socket already, the data is sent
+            # after the data that was queued before.
+            if not self._writer_added:
+                self._send_queued()
+
+        self._buffer = []
+
+    @property
+    def backlogged(self):
+        " True when more than `high_watermark` bytes are waiting to be sent. "
+        return self._queued_size > self.high_watermark
+
+    def _send_queued(self):
+        """
+        Send as much of the queued data as the socket accepts without
+        blocking. (Also called by the event loop when the socket becomes
+        writable.)
+        """
+        was_backlogged = self.backlogged
+
         try:
-            self._connection.send(b''.join(self._buffer))
+            while self._queue:
+                data = self._queue[0]
+                sent = self._connection.send(data)
+                self._queued_size -= sent
+
+                if sent < len(data):
+                    self._queue[0] = data[sent:]
+                    break
+                self._queue.popleft()
         except socket.error as e:
-            logger.warning("Couldn't send data over socket: %s" % e)
+            if e.args and e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                pass  # Try again when the socket becomes writable.
+            else:
+                logger.warning("Couldn't send data over socket: %s" % e)
+                self._queue.clear()
+                self._queued_size = 0
+
+        # Wait for the socket to become writable, as long as something is left.
+        if self._queue and not self._writer_added:
+            get_event_loop().add_writer(self._connection, self._send_queued)
+            self._writer_added = True
+        elif not self._queue and self._writer_added:
+            get_event_loop().remove_writer(self._connection)
+            self._writer_added = False
+
+        if self._closed:
+            # Everything was sent, or sending failed.
+            if not self._queue:
+                self._connection.close()
+
+        elif was_backlogged and not self.backlogged and self.on_drained:
+            self.on_drained()
 
-        self._buffer = []
+    def close(self):
+        """
+        Don't accept any new output, and close the socket. (After the queued
+        data has been sent.)
+        """
+        if not self._closed:
+            self._closed = True
+
+            if not self._queue:
+                self._connection.close()
+
+
+class _ConnectionOutput(Vt100_Output):
+    " `Vt100_Output` that reports when the client can't keep up. "
+    @property
+    def backlogged(self):
+        return self.stdout.backlogged
 
 
 class TelnetConnection(object):
@@ -108,14 +196,23 @@ class TelnetConnection(object):
         # Initialize.
         _initialize_telnet(conn)
 
-        # Create input.
-        self.vt100_input = PipeInput()
+        # Don't let a slow client block the event loop.
+        conn.setblocking(False)
+
+        # Create input. (The parser feeds it directly, no pipe is needed.)
+        self.vt100_input = MemoryInput(batch_text=True)
 
         # Create output.
         def get_size():
             return self.size
-        self.stdout = _ConnectionStdout(conn, encoding=encoding)
-        self.vt100_output = Vt100_Output(
+
+        def output_drained():
+            " Rendering was skipped while the output was backlogged. "
+            with context(self._context_id):
+                get_app().invalidate()
+
+        self.stdout = _ConnectionStdout(conn, encoding=encoding, on_drained=output_drained)
+        self.vt100_output = _ConnectionOutput(
             self.stdout, get_size, write_binary=False)
 
         def data_received(data):
@@ -190,7 +287,9 @@ class TelnetConnection(object):
 
             self.vt100_input.close()
             get_event_loop().remove_reader(self.conn)
-            self.conn.close()
+
+            # (This closes the socket when the pending output has been sent.)
+            self.stdout.close()
 
     def send(self, formatted_text):
         """
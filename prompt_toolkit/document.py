@@ -10,12 +10,15 @@ import string
 import weakref
 from six.moves import range, map
 
+from .cache import SimpleCache
 from .clipboard import ClipboardData
 from .filters import vi_mode
+from .rope import Rope
 from .selection import SelectionType, SelectionState, PasteMode
 
 __all__ = [
     'Document',
+    'SearchIndex',
 ]
 
 
@@ -38,6 +41,7 @@ _FIND_CURRENT_BIG_WORD_INCLUDE_TRAILING_WHITESPACE_RE = re.compile(r'^([^\s]+\s*
 # `Document` is constructed with the same text, it should have the same
 # `_DocumentCache`.)
 _text_to_document_cache = weakref.WeakValueDictionary()  # Maps document.text to DocumentCache instance.
+_rope_to_document_cache = weakref.WeakValueDictionary()  # Maps a Rope to DocumentCache instance.
 
 
 class _ImmutableLineList(list):
@@ -67,6 +71,55 @@ class _DocumentCache(object):
         #: List of index positions, pointing to the start of all the lines.
         self.line_indexes = None
 
+        #: `SimpleCache` of `SearchIndex` instances. (Created when needed.)
+        self.search_indexes = None
+
+        #: The text, for a Document that is backed by a `Rope`. (Created when
+        #: needed.)
+        self.text = None
+
+        #: (previous_cache, start, end, inserted_text) tuple, when this is the
+        #: cache of a document that was created by replacing a part of the
+        #: text of another document.
+        self.previous = None
+
+    def derive_lines(self):
+        """
+        Calculate `lines` and `line_indexes` from the cache of the previous
+        document. Only the lines that were touched by the edit are split
+        again, the following line indexes are shifted.
+        """
+        previous, start, end, inserted = self.previous
+        self.previous = None
+
+        old_lines = previous.lines
+        old_indexes = previous.line_indexes
+
+        # Rows that contain the start and end of the replaced text.
+        first_row = bisect.bisect_right(old_indexes, start) - 1
+        last_row = bisect.bisect_right(old_indexes, end) - 1
+        first_start = old_indexes[first_row]
+        last_start = old_indexes[last_row]
+
+        middle = (old_lines[first_row][:start - first_start] + inserted +
+                  old_lines[last_row][end - last_start:]).split('\n')
+
+        lines = old_lines[:first_row]
+        lines.extend(middle)
+        lines.extend(old_lines[last_row + 1:])
+
+        indexes = old_indexes[:first_row + 1]
+        pos = first_start
+        for line in middle[:-1]:
+            pos += len(line) + 1
+            indexes.append(pos)
+
+        delta = len(inserted) - (end - start)
+        indexes.extend(map(delta.__add__, old_indexes[last_row + 1:]))
+
+        self.lines = _ImmutableLineList(lines)
+        self.line_indexes = indexes
+
 
 class Document(object):
     """
@@ -76,14 +129,18 @@ class Document(object):
     This class is usually instantiated by a :class:`~prompt_toolkit.buffer.Buffer`
     object, and accessed as the `document` property of that class.
 
-    :param text: string
+    The text can also be given as a :class:`~prompt_toolkit.rope.Rope`. In
+    that case, the text as a string is only created when it's asked for, and
+    finding rows and columns doesn't require splitting the text into lines.
+
+    :param text: string or :class:`~prompt_toolkit.rope.Rope`
     :param cursor_position: int
     :param selection: :class:`.SelectionState`
     """
-    __slots__ = ('_text', '_cursor_position', '_selection', '_cache')
+    __slots__ = ('_text', '_rope', '_cursor_position', '_selection', '_cache')
 
     def __init__(self, text='', cursor_position=None, selection=None):
-        assert isinstance(text, six.text_type), 'Got %r' % text
+        assert isinstance(text, (six.text_type, Rope)), 'Got %r' % text
         assert selection is None or isinstance(selection, SelectionState)
 
         # Check cursor position. It can also be right after the end. (Where we
@@ -100,17 +157,25 @@ class Document(object):
         # Keep these attributes private. A `Document` really has to be
         # considered to be immutable, because otherwise the caching will break
         # things. Because of that, we wrap these into read-only properties.
-        self._text = text
         self._cursor_position = cursor_position
         self._selection = selection
 
+        if isinstance(text, Rope):
+            self._text = None
+            self._rope = text
+            text_to_document_cache = _rope_to_document_cache
+        else:
+            self._text = text
+            self._rope = None
+            text_to_document_cache = _text_to_document_cache
+
         # Cache for lines/indexes. (Shared with other Document instances that
         # contain the same text.
         try:
-            self._cache = _text_to_document_cache[self.text]
+            self._cache = text_to_document_cache[text]
         except KeyError:
             self._cache = _DocumentCache()
-            _text_to_document_cache[self.text] = self._cache
+            text_to_document_cache[text] = self._cache
 
         # XX: For some reason, above, we can't use 'WeakValueDictionary.setdefault'.
         #     This fails in Pypy3. `self._cache` becomes None, because that's what
@@ -130,8 +195,18 @@ class Document(object):
     @property
     def text(self):
         " The document text. "
+        if self._text is None:
+            cache = self._cache
+            if cache.text is None:
+                cache.text = self._rope.text
+            self._text = cache.text
         return self._text
 
+    @property
+    def rope(self):
+        " The :class:`~prompt_toolkit.rope.Rope` of the text, or `None`. "
+        return self._rope
+
     @property
     def cursor_position(self):
         " The document cursor position. "
@@ -163,12 +238,20 @@ class Document(object):
     @property
     def current_line_before_cursor(self):
         """ Text from the start of the line until the cursor. """
+        if self._rope is not None:
+            row, col = self._rope.translate_index_to_position(self.cursor_position)
+            return self._rope.get_line(row)[:col]
+
         _, _, text = self.text_before_cursor.rpartition('\n')
         return text
 
     @property
     def current_line_after_cursor(self):
         """ Text from the cursor until the end of the line. """
+        if self._rope is not None:
+            row, col = self._rope.translate_index_to_position(self.cursor_position)
+            return self._rope.get_line(row)[col:]
+
         text, _, _ = self.text_after_cursor.partition('\n')
         return text
 
@@ -179,7 +262,10 @@ class Document(object):
         """
         # Cache, because this one is reused very often.
         if self._cache.lines is None:
-            self._cache.lines = _ImmutableLineList(self.text.split('\n'))
+            if self._cache.previous is not None:
+                self._cache.derive_lines()
+            else:
+                self._cache.lines = _ImmutableLineList(self.text.split('\n'))
 
         return self._cache.lines
 
@@ -190,6 +276,9 @@ class Document(object):
         """
         # Cache, because this is often reused. (If it is used, it's often used
         # many times. And this has to be fast for editing big documents!)
+        if self._cache.line_indexes is None and self._cache.previous is not None:
+            self._cache.derive_lines()
+
         if self._cache.line_indexes is None:
             # Create list of line lengths.
             line_lengths = map(len, self.lines)
@@ -222,6 +311,8 @@ class Document(object):
     def line_count(self):
         r""" Return the number of lines in this document. If the document ends
         with a trailing \n, that counts as the beginning of a new line. """
+        if self._rope is not None:
+            return self._rope.line_count
         return len(self.lines)
 
     @property
@@ -241,8 +332,9 @@ class Document(object):
         """
         Return character relative to cursor position, or empty string
         """
+        text = self._rope if self._text is None else self._text
         try:
-            return self.text[self.cursor_position + offset]
+            return text[self.cursor_position + offset]
         except IndexError:
             return ''
 
@@ -286,6 +378,10 @@ class Document(object):
 
         Return (row, index) tuple.
         """
+        if self._rope is not None:
+            row, col = self._rope.translate_index_to_position(index)
+            return row, index - col
+
         indexes = self._line_start_indexes
 
         pos = bisect.bisect_right(indexes, index) - 1
@@ -309,6 +405,20 @@ class Document(object):
 
         Negative row/col values are turned into zero.
         """
+        if self._rope is not None:
+            rope = self._rope
+            line_count = rope.line_count
+
+            if row >= line_count:
+                row = line_count - 1
+            elif row < -line_count:
+                row = 0
+            elif row < 0:
+                row += line_count
+
+            line = rope.get_line(row)
+            return rope.get_line_start(row) + max(0, min(col, len(line)))
+
         try:
             result = self._line_start_indexes[row]
             line = self.lines[row]
@@ -385,6 +495,17 @@ class Document(object):
         flags = re.IGNORECASE if ignore_case else 0
         return [a.start() for a in re.finditer(re.escape(sub), self.text, flags)]
 
+    def get_search_index(self, sub, ignore_case=False):
+        """
+        Return a :class:`.SearchIndex` with all occurrences of the substring.
+        This is shared with all `Document` instances with the same text.
+        """
+        cache = self._cache.search_indexes
+        if cache is None:
+            cache = self._cache.search_indexes = SimpleCache(maxsize=4)
+
+        return cache.get((sub, ignore_case), lambda: SearchIndex(self, sub, ignore_case))
+
     def find_backwards(self, sub, in_current_line=False, ignore_case=False, count=1):
         """
         Find `text` before the cursor, return position relative to the cursor
@@ -1017,6 +1138,44 @@ class Document(object):
                 cursor_position=self.cursor_position,
                 selection=self.selection)
 
+    def replace(self, start, end, text, cursor_position=None):
+        """
+        Create a new document, in which the text between `start` and `end` has
+        been replaced by `text`. (The selection is not kept.)
+
+        When the lines of this document have been calculated, the new document
+        derives its lines and line indexes from these, instead of splitting
+        the whole text again.
+
+        :param cursor_position: The cursor position of the new document. By
+            default, the cursor stays at the same place in the surrounding
+            text, or moves to the end of the new text when it was inside the
+            replaced text.
+        """
+        assert 0 <= start <= end <= len(self._rope if self._text is None else self._text)
+        assert isinstance(text, six.text_type)
+
+        if cursor_position is None:
+            cursor_position = self.cursor_position
+            if cursor_position >= end:
+                cursor_position += len(text) - (end - start)
+            elif cursor_position > start:
+                cursor_position = start + len(text)
+
+        if self._rope is not None:
+            return Document(self._rope.replace(start, end, text), cursor_position)
+
+        document = Document(self._text[:start] + text + self._text[end:], cursor_position)
+
+        cache = self._cache
+        new_cache = document._cache
+
+        if (new_cache.lines is None and new_cache.line_indexes is None and
+                cache.lines is not None and cache.line_indexes is not None):
+            new_cache.previous = (cache, start, end, text)
+
+        return document
+
     def insert_before(self, text):
         """
         Create a new document, with this text inserted before the buffer.
@@ -1033,3 +1192,128 @@ class Document(object):
                 text=text + self.text,
                 cursor_position=self.cursor_position + len(text),
                 selection=selection_state)
+
+
+class SearchIndex(object):
+    """
+    The positions of all occurrences of a substring in a document, including
+    the overlapping ones and the ones that span multiple lines.
+
+    This can be used for both finding the next or previous occurrence and for
+    highlighting the occurrences in a line. (Use
+    :meth:`.Document.get_search_index` to get one.)
+
+    :param document: :class:`.Document` instance.
+    :param sub: The substring.
+    :param ignore_case: Case insensitive search.
+    """
+    def __init__(self, document, sub, ignore_case=False):
+        assert isinstance(document, Document)
+        assert isinstance(ignore_case, bool)
+
+        self.document = document
+        self.sub = sub
+        self.ignore_case = ignore_case
+
+        text = document.text
+
+        #: The sorted start positions of the occurrences.
+        self.positions = []
+
+        if ignore_case:
+            self.positions = [m.start() for m in re.finditer(
+                '(?=%s)' % re.escape(sub), text, re.IGNORECASE)]
+        else:
+            i = text.find(sub)
+            while i != -1:
+                self.positions.append(i)
+                i = text.find(sub, i + 1)
+
+        self._highlight_positions = None
+
+    def _get_highlight_positions(self):
+        """
+        The start positions of the occurrences that don't overlap with a
+        previous one. (Like `re.finditer` would find them.)
+        """
+        if self._highlight_positions is None:
+            length = len(self.sub)
+            result = []
+            end = 0
+
+            for i in self.positions:
+                if i >= end:
+                    result.append(i)
+                    end = i + length
+            self._highlight_positions = result
+
+        return self._highlight_positions
+
+    def find_after(self, position, count=1):
+        """
+        Return the start of the n-th occurrence that starts at or after this
+        position. (Not counting occurrences that overlap with the previous
+        one.) Return `None` if nothing was found.
+        """
+        positions = self.positions
+        length = len(self.sub)
+        end = position
+
+        for i in range(bisect.bisect_left(positions, position), len(positions)):
+            if positions[i] >= end:
+                count -= 1
+                if count == 0:
+                    return positions[i]
+                end = positions[i] + length
+
+    def find_before(self, position, count=1):
+        """
+        Return the start of the n-th occurrence that ends at or before this
+        position, searching backwards. (Not counting occurrences that overlap
+        with the previous one.) Return `None` if nothing was found.
+        """
+        positions = self.positions
+        length = len(self.sub)
+        start = position
+
+        for i in range(bisect.bisect_right(positions, position - length) - 1, -1, -1):
+            if positions[i] + length <= start:
+                count -= 1
+                if count == 0:
+                    return positions[i]
+                start = positions[i]
+
+    def get_match_at(self, position):
+        """
+        Return the (start, end) tuple of the highlighted occurrence at this
+        position, or `None`.
+        """
+        positions = self._get_highlight_positions()
+        i = bisect.bisect_right(positions, position) - 1
+
+        if i >= 0 and position < positions[i] + len(self.sub):
+            return positions[i], positions[i] + len(self.sub)
+
+    def get_matches_at_line(self, lineno):
+        """
+        Return a list of (start_column, end_column) tuples for the highlighted
+        occurrences in this line. For an occurrence that spans multiple lines,
+        this is the part in this line.
+        """
+        positions = self._get_highlight_positions()
+        length = len(self.sub)
+        line_start = self.document._line_start_indexes[lineno]
+        line_end = line_start + len(self.document.lines[lineno])
+        result = []
+
+        for i in range(bisect.bisect_right(positions, line_start - length), len(positions)):
+            start = positions[i]
+            if start >= line_end:
+                break
+
+            start = max(start, line_start)
+            end = min(positions[i] + length, line_end)
+            if start < end:
+                result.append((start - line_start, end - line_start))
+
+        return result
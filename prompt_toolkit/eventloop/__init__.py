@@ -1,15 +1,16 @@
 from __future__ import unicode_literals
 
-from .base import EventLoop, get_traceback_from_context
+from .base import EventLoop, TimerHandle, get_traceback_from_context
 from .coroutine import From, Return, ensure_future
-from .async_generator import AsyncGeneratorItem, generator_to_async_generator, consume_async_generator
-from .defaults import create_event_loop, create_asyncio_event_loop, use_asyncio_event_loop, get_event_loop, set_event_loop, run_in_executor, call_from_executor, run_until_complete
+from .async_generator import AsyncGeneratorItem, generator_to_async_generator, chunk_async_generator, consume_async_generator
+from .defaults import create_event_loop, create_asyncio_event_loop, use_asyncio_event_loop, get_event_loop, set_event_loop, run_in_executor, call_from_executor, call_later, call_at, run_until_complete
 from .future import Future, InvalidStateError
 from .event import Event
 
 __all__ = [
     # Base.
     'EventLoop',
+    'TimerHandle',
     'get_traceback_from_context',
 
     # Coroutine.
@@ -20,6 +21,7 @@ __all__ = [
     # Async generators
     'AsyncGeneratorItem',
     'generator_to_async_generator',
+    'chunk_async_generator',
     'consume_async_generator',
 
     # Defaults
@@ -30,6 +32,8 @@ __all__ = [
     'set_event_loop',
     'run_in_executor',
     'call_from_executor',
+    'call_later',
+    'call_at',
     'run_until_complete',
 
     # Futures.
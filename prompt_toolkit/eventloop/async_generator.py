@@ -21,10 +21,12 @@ from threading import RLock
 from .defaults import run_in_executor
 from .future import Future
 from .coroutine import From, Return
+import time
 
 __all__ = [
     'AsyncGeneratorItem',
     'generator_to_async_generator',
+    'chunk_async_generator',
     'consume_async_generator',
 ]
 
@@ -90,7 +92,7 @@ def generator_to_async_generator(get_iterable):
 
         # Yield final items.
         while not q.empty():
-            yield q.get()
+            yield AsyncGeneratorItem(q.get())
 
     finally:
         # When this async generator is closed (GeneratorExit exception, stop
@@ -98,6 +100,59 @@ def generator_to_async_generator(get_iterable):
         quitting = True
 
 
+def chunk_async_generator(iterator, chunk_size=1000, max_time=.05):
+    """
+    Wrap an asynchronous generator, and yield its items in lists of at most
+    `chunk_size` items. (Each list is wrapped in an `AsyncGeneratorItem`.)
+
+    A chunk is yielded earlier when `iterator` is going to wait for a `Future`,
+    or when collecting the chunk took longer than `max_time` seconds. In the
+    latter case, the event loop gets the chance to process other events before
+    we continue. (Otherwise, a generator that doesn't wait, would block the
+    event loop until it's done.)
+    """
+    assert isinstance(chunk_size, int) and chunk_size > 0
+
+    chunk = []
+    deadline = time.time() + max_time
+    next_call = (iterator.send, None)
+
+    while True:
+        method, value = next_call
+        try:
+            item = method(value)
+        except StopIteration:
+            break
+
+        next_call = (iterator.send, None)
+
+        if isinstance(item, AsyncGeneratorItem):
+            chunk.append(item.value)
+
+            if len(chunk) >= chunk_size or time.time() > deadline:
+                yield AsyncGeneratorItem(chunk)
+                chunk = []
+
+                # Give the event loop the chance to process other events.
+                yield From(Future.succeed(None))
+                deadline = time.time() + max_time
+        else:
+            # Deliver what we have, before waiting.
+            if chunk:
+                yield AsyncGeneratorItem(chunk)
+                chunk = []
+
+            try:
+                next_call = (iterator.send, (yield item))
+            except BaseException as e:
+                next_call = (iterator.throw, e)
+
+            deadline = time.time() + max_time
+
+    if chunk:
+        yield AsyncGeneratorItem(chunk)
+
+
 def consume_async_generator(iterator, cancel, item_callback):
     """
     Consume an asynchronous generator.
@@ -3,11 +3,12 @@ Posix asyncio event loop.
 """
 from __future__ import unicode_literals
 
-from .base import EventLoop
+from .base import EventLoop, TimerHandle
 from .context import wrap_in_current_context
 from .future import Future
 from .utils import ThreadWithFuture
 import asyncio
+import time
 
 __all__ = [
     'PosixAsyncioEventLoop',
@@ -60,6 +61,20 @@ class PosixAsyncioEventLoop(EventLoop):
         callback = wrap_in_current_context(callback)
         self.loop.call_soon_threadsafe(callback)
 
+    def call_at(self, when, callback):
+        """
+        Call this function in the main event loop, at the given `time.time`
+        value. (This is thread safe.)
+        """
+        handle = TimerHandle(when, wrap_in_current_context(callback))
+
+        def schedule():
+            # Asyncio uses its own clock, so convert to a delay.
+            self.loop.call_later(max(0, when - time.time()), handle._run)
+
+        self.loop.call_soon_threadsafe(schedule)
+        return handle
+
     def add_reader(self, fd, callback):
         " Start watching the file descriptor for read availability. "
         callback = wrap_in_current_context(callback)
@@ -69,6 +84,15 @@ class PosixAsyncioEventLoop(EventLoop):
         " Stop watching the file descriptor for read availability. "
         self.loop.remove_reader(fd)
 
+    def add_writer(self, fd, callback):
+        " Start watching the file descriptor for write availability. "
+        callback = wrap_in_current_context(callback)
+        self.loop.add_writer(fd, callback)
+
+    def remove_writer(self, fd):
+        " Stop watching the file descriptor for write availability. "
+        self.loop.remove_writer(fd)
+
     def add_signal_handler(self, signum, handler):
         return self.loop.add_signal_handler(signum, handler)
 
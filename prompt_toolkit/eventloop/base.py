@@ -12,9 +12,11 @@ from abc import ABCMeta, abstractmethod
 from six import with_metaclass
 from prompt_toolkit.log import logger
 import sys
+import time
 
 __all__ = [
     'EventLoop',
+    'TimerHandle',
     'get_traceback_from_context',
 ]
 
@@ -60,6 +62,20 @@ class EventLoop(with_metaclass(ABCMeta, object)):
         Stop watching the file descriptor for read availability.
         """
 
+    def add_writer(self, fd, callback):
+        """
+        Start watching the file descriptor for write availability and then
+        call the callback.
+        (Not supported by the `Win32EventLoop`.)
+        """
+        raise NotImplementedError
+
+    def remove_writer(self, fd):
+        """
+        Stop watching the file descriptor for write availability.
+        """
+        raise NotImplementedError
+
     def add_win32_handle(self, handle, callback):
         """
         Add a Windows Handle to the event loop.
@@ -98,6 +114,31 @@ class EventLoop(with_metaclass(ABCMeta, object)):
                   does fewer system calls. (It doesn't read /etc/localtime.)
         """
 
+    def call_later(self, delay, callback):
+        """
+        Call this function in the main event loop, after `delay` seconds.
+        Returns a :class:`.TimerHandle`, which can be used to cancel the call.
+        (This is thread safe.)
+        """
+        return self.call_at(time.time() + delay, callback)
+
+    def call_at(self, when, callback):
+        """
+        Call this function in the main event loop, at the given `time.time`
+        value. Returns a :class:`.TimerHandle`. (This is thread safe.)
+
+        Event loops should override this. This fallback waits in a background
+        thread.
+        """
+        handle = TimerHandle(when, callback)
+
+        def wait():
+            time.sleep(max(0, when - time.time()))
+            self.call_from_executor(handle._run)
+
+        self.run_in_executor(wait, _daemon=True)
+        return handle
+
     def create_future(self):
         """
         Create a `Future` object that is attached to this loop.
@@ -167,6 +208,32 @@ class EventLoop(with_metaclass(ABCMeta, object)):
         logger.error('\n'.join(log_lines), exc_info=exc_info)
 
 
+class TimerHandle(object):
+    """
+    Handle for a callback that was scheduled using `EventLoop.call_at` or
+    `EventLoop.call_later`.
+    """
+    def __init__(self, when, callback):
+        assert callable(callback)
+
+        self.when = float(when)
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        " Don't call the callback anymore, if it wasn't called already. "
+        self.cancelled = True
+
+    def _run(self):
+        " Called by the event loop, when the timer expires. "
+        if not self.cancelled:
+            self.callback()
+
+    def __repr__(self):
+        return '%s(when=%r, callback=%r, cancelled=%r)' % (
+            self.__class__.__name__, self.when, self.callback, self.cancelled)
+
+
 def get_traceback_from_context(context):
     """
     Get the traceback object from the context.
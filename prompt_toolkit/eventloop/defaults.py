@@ -11,6 +11,8 @@ __all__ = [
     'set_event_loop',
     'run_in_executor',
     'call_from_executor',
+    'call_later',
+    'call_at',
     'run_until_complete',
 ]
 
@@ -115,6 +117,20 @@ def call_from_executor(callback, _max_postpone_until=None):
         callback, _max_postpone_until=_max_postpone_until)
 
 
+def call_later(delay, callback):
+    """
+    Call this function in the main event loop, after `delay` seconds.
+    """
+    return get_event_loop().call_later(delay, callback)
+
+
+def call_at(when, callback):
+    """
+    Call this function in the main event loop, at the given `time.time` value.
+    """
+    return get_event_loop().call_at(when, callback)
+
+
 def run_until_complete(future, inputhook=None):
     """
     Keep running until this future has been set.
@@ -1,14 +1,16 @@
 from __future__ import unicode_literals
 import fcntl
+import heapq
 import os
 import signal
+import threading
 import time
 
-from .base import EventLoop
+from .base import EventLoop, TimerHandle
 from .future import Future
 from .inputhook import InputHookContext
 from .select import AutoSelector, Selector, fd_to_int
-from .utils import ThreadWithFuture
+from .utils import ThreadWithFuture, ThreadPool
 from .context import wrap_in_current_context
 
 __all__ = [
@@ -21,9 +23,13 @@ _now = time.time
 class PosixEventLoop(EventLoop):
     """
     Event loop for posix systems (Linux, Mac os X).
+
+    :param max_workers: Maximum number of threads used by `run_in_executor`
+        for regular (non-daemon) tasks. See :class:`.ThreadPool`.
     """
-    def __init__(self, selector=AutoSelector):
+    def __init__(self, selector=AutoSelector, max_workers=16):
         assert issubclass(selector, Selector)
+        assert isinstance(max_workers, int)
 
         super(PosixEventLoop, self).__init__()
 
@@ -32,10 +38,18 @@ class PosixEventLoop(EventLoop):
 
         self._calls_from_executor = []
         self._read_fds = {}  # Maps fd to handler.
+        self._write_fds = {}  # Maps fd to handler.
         self.selector = selector()
 
         self._signal_handler_mappings = {}  # signal: previous_handler
 
+        # Heap of (when, sequence_number, TimerHandle) for `call_at`. The lock
+        # is required, because timers can be added from other threads.
+        self._timers = []
+        self._timer_sequence = 0
+        self._timers_lock = threading.Lock()
+        self._selecting = False  # True when we're blocking in `select`.
+
         # Create a pipe for inter thread communication.
         self._schedule_pipe = os.pipe()
         fcntl.fcntl(self._schedule_pipe[0], fcntl.F_SETFL, os.O_NONBLOCK)
@@ -44,6 +58,9 @@ class PosixEventLoop(EventLoop):
         # Create inputhook context.
         self._inputhook_context = None
 
+        # Worker threads for `run_in_executor`.
+        self.thread_pool = ThreadPool(max_workers=max_workers)
+
     def run_until_complete(self, future, inputhook=None):
         """
         Keep running the event loop until `future` has been set.
@@ -81,14 +98,20 @@ class PosixEventLoop(EventLoop):
 
             def ready(wait):
                 " True when there is input ready. The inputhook should return control. "
-                return self._ready_for_reading(None if wait else 0) != []
+                if wait:
+                    fds, write_fds = self._select_until_next_timer()
+                else:
+                    fds, write_fds = self._ready_for_reading(0)
+
+                with self._timers_lock:
+                    return fds != [] or write_fds != [] or self._get_timer_timeout() == 0
             self._inputhook_context.call_inputhook(ready, inputhook)
 
-        # Wait until input is ready.
-        fds = self._ready_for_reading(None)
+        # Wait until input is ready, or until the next timer expires.
+        fds, write_fds = self._select_until_next_timer()
 
         # When any of the FDs are ready. Call the appropriate callback.
-        if fds:
+        if fds or write_fds:
             # Create lists of high/low priority tasks. The main reason for this
             # is to allow painting the UI to happen as soon as possible, but
             # when there are many events happening, we don't want to call the
@@ -127,6 +150,11 @@ class PosixEventLoop(EventLoop):
                     if handler:
                         tasks.append(handler)
 
+            for fd in write_fds:
+                handler = self._write_fds.get(fd)
+                if handler:
+                    tasks.append(handler)
+
             # When there are high priority tasks, run all these.
             # Schedule low priority tasks for the next iteration.
             if tasks:
@@ -141,6 +169,50 @@ class PosixEventLoop(EventLoop):
                 for t, _ in low_priority_tasks:
                     self._run_task(t)
 
+        # Call the expired timers.
+        if self._timers:
+            for handle in self._pop_expired_timers():
+                self._run_task(handle._run)
+
+    def _get_timer_timeout(self):
+        """
+        Return the time until the first timer expires, or `None` when no
+        timers are scheduled. (Must be called with `_timers_lock` held.)
+        """
+        timers = self._timers
+
+        # Drop cancelled timers.
+        while timers and timers[0][2].cancelled:
+            heapq.heappop(timers)
+
+        if timers:
+            return max(0, timers[0][0] - _now())
+
+    def _select_until_next_timer(self):
+        """
+        Wait until one of the file descriptors becomes ready, or until the
+        first timer expires.
+        """
+        with self._timers_lock:
+            timeout = self._get_timer_timeout()
+            self._selecting = True
+        try:
+            return self._ready_for_reading(timeout)
+        finally:
+            self._selecting = False
+
+    def _pop_expired_timers(self):
+        " Remove the expired timers from the heap and return them. "
+        now = _now()
+        result = []
+
+        with self._timers_lock:
+            timers = self._timers
+            while timers and timers[0][0] <= now:
+                result.append(heapq.heappop(timers)[2])
+
+        return result
+
     def _run_task(self, t):
         """
         Run a task in the event loop. If it fails, print the exception.
@@ -159,10 +231,12 @@ class PosixEventLoop(EventLoop):
 
     def _ready_for_reading(self, timeout=None):
         """
-        Return the file descriptors that are ready for reading.
+        Return a (read_fds, write_fds) tuple of the file descriptors that are
+        ready for reading and the writers that are ready for writing.
         """
-        fds = self.selector.select(timeout)
-        return fds
+        if self._write_fds:
+            return self.selector.select_read_write(timeout)
+        return self.selector.select(timeout), []
 
     def add_signal_handler(self, signum, handler):
         """
@@ -204,9 +278,15 @@ class PosixEventLoop(EventLoop):
         Run a long running function in a background thread.
         (This is recommended for code that could block the event loop.)
         Similar to Twisted's ``deferToThread``.
+
+        The callback runs in a worker of `self.thread_pool`. Workers are
+        reused, so this doesn't create a new thread for every call.
         """
         th = ThreadWithFuture(callback, daemon=_daemon)
 
+        def start():
+            self.thread_pool.submit(th.run, daemon=_daemon)
+
         # Wait until the main thread is idle.
         # We start the thread by using `call_from_executor`. The event loop
         # favours processing input over `calls_from_executor`, so the thread
@@ -216,7 +296,7 @@ class PosixEventLoop(EventLoop):
         # background would cause a significantly slow down of the main thread.
         # It is mostly noticeable when pasting large portions of text while
         # having real time autocompletion while typing on.
-        self.call_from_executor(th.start)
+        self.call_from_executor(start)
 
         return th.future
 
@@ -234,7 +314,10 @@ class PosixEventLoop(EventLoop):
         callback = wrap_in_current_context(callback)
 
         self._calls_from_executor.append((callback, _max_postpone_until))
+        self._write_to_schedule_pipe()
 
+    def _write_to_schedule_pipe(self):
+        " Wake up the event loop. (Thread safe.) "
         if self._schedule_pipe:
             try:
                 os.write(self._schedule_pipe[1], b'x')
@@ -245,6 +328,29 @@ class PosixEventLoop(EventLoop):
                 #   main thread could have closed the pipe already.
                 pass
 
+    def call_at(self, when, callback):
+        """
+        Call this function in the main event loop, at the given `time.time`
+        value. Returns a :class:`.TimerHandle` that can be used to cancel the
+        call. The timers are kept in a heap, the loop wakes up by passing the
+        time until the first timer as a timeout to the selector.
+        (This is thread safe.)
+        """
+        handle = TimerHandle(when, wrap_in_current_context(callback))
+
+        with self._timers_lock:
+            self._timer_sequence += 1
+            heapq.heappush(self._timers, (when, self._timer_sequence, handle))
+
+            # When another thread is waiting in `select` with a timeout that
+            # is now too long, wake it up.
+            wake_up = self._selecting and self._timers[0][2] is handle
+
+        if wake_up:
+            self._write_to_schedule_pipe()
+
+        return handle
+
     def close(self):
         """
         Close the event loop. The loop must not be running.
@@ -263,6 +369,9 @@ class PosixEventLoop(EventLoop):
         if self._inputhook_context:
             self._inputhook_context.close()
 
+        # Wait for the running (non-daemon) tasks.
+        self.thread_pool.shutdown(wait=True)
+
     def add_reader(self, fd, callback):
         " Add read file descriptor to the event loop. "
         callback = wrap_in_current_context(callback)
@@ -279,3 +388,20 @@ class PosixEventLoop(EventLoop):
             del self._read_fds[fd]
 
         self.selector.unregister(fd)
+
+    def add_writer(self, fd, callback):
+        " Add write file descriptor to the event loop. "
+        callback = wrap_in_current_context(callback)
+
+        fd = fd_to_int(fd)
+        if fd not in self._write_fds:
+            self.selector.register_writer(fd)
+        self._write_fds[fd] = callback
+
+    def remove_writer(self, fd):
+        " Remove write file descriptor from the event loop. "
+        fd = fd_to_int(fd)
+
+        if fd in self._write_fds:
+            del self._write_fds[fd]
+            self.selector.unregister_writer(fd)
@@ -5,6 +5,7 @@ from __future__ import unicode_literals, absolute_import
 import sys
 import abc
 import errno
+import math
 import select
 import six
 
@@ -39,6 +40,21 @@ class Selector(six.with_metaclass(abc.ABCMeta, object)):
     def select(self, timeout):
         pass
 
+    def register_writer(self, fd):
+        " Start watching this file descriptor for write availability. "
+        raise NotImplementedError
+
+    def unregister_writer(self, fd):
+        " Stop watching this file descriptor for write availability. "
+        raise NotImplementedError
+
+    def select_read_write(self, timeout):
+        """
+        Like `select`, but return a (read_fds, write_fds) tuple, that also
+        contains the writers that are ready.
+        """
+        return self.select(timeout), []
+
     @abc.abstractmethod
     def close(self):
         pass
@@ -83,11 +99,26 @@ class AutoSelector(Selector):
         for sel in self._selectors:
             sel.unregister(fd)
 
+    def register_writer(self, fd):
+        assert isinstance(fd, int)
+
+        for sel in self._selectors:
+            sel.register_writer(fd)
+
+    def unregister_writer(self, fd):
+        assert isinstance(fd, int)
+
+        for sel in self._selectors:
+            sel.unregister_writer(fd)
+
     def select(self, timeout):
+        return self.select_read_write(timeout)[0]
+
+    def select_read_write(self, timeout):
         # Try Python 3 selector first.
         if self._py3_selector:
             try:
-                return self._py3_selector.select(timeout)
+                return self._py3_selector.select_read_write(timeout)
             except PermissionError:  # noqa  (PermissionError doesn't exist in Py2)
                 # We had a situation (in pypager) where epoll raised a
                 # PermissionError when a local file descriptor was registered,
@@ -98,13 +129,13 @@ class AutoSelector(Selector):
         try:
             # Prefer 'select.select', if we don't have much file descriptors.
             # This is more universal.
-            return self._select_selector.select(timeout)
+            return self._select_selector.select_read_write(timeout)
         except ValueError:
             # When we have more than 1024 open file descriptors, we'll always
             # get a "ValueError: filedescriptor out of range in select()" for
             # 'select'. In this case, try, using 'poll' instead.
             if self._poll_selector is not None:
-                return self._poll_selector.select(timeout)
+                return self._poll_selector.select_read_write(timeout)
             else:
                 raise
 
@@ -123,20 +154,47 @@ class Python3Selector(Selector):
         assert sys.version_info >= (3, 5)
 
         import selectors  # Inline import: Python3 only!
+        self._selectors = selectors
         self._sel = selectors.DefaultSelector()
 
+    def _add_events(self, fd, events):
+        try:
+            key = self._sel.get_key(fd)
+        except KeyError:
+            self._sel.register(fd, events, None)
+        else:
+            self._sel.modify(fd, key.events | events, None)
+
+    def _remove_events(self, fd, events):
+        remaining = self._sel.get_key(fd).events & ~events
+        if remaining:
+            self._sel.modify(fd, remaining, None)
+        else:
+            self._sel.unregister(fd)
+
     def register(self, fd):
         assert isinstance(fd, int)
-        import selectors  # Inline import: Python3 only!
-        self._sel.register(fd, selectors.EVENT_READ, None)
+        self._add_events(fd, self._selectors.EVENT_READ)
 
     def unregister(self, fd):
         assert isinstance(fd, int)
-        self._sel.unregister(fd)
+        self._remove_events(fd, self._selectors.EVENT_READ)
+
+    def register_writer(self, fd):
+        assert isinstance(fd, int)
+        self._add_events(fd, self._selectors.EVENT_WRITE)
+
+    def unregister_writer(self, fd):
+        assert isinstance(fd, int)
+        self._remove_events(fd, self._selectors.EVENT_WRITE)
 
     def select(self, timeout):
+        return self.select_read_write(timeout)[0]
+
+    def select_read_write(self, timeout):
         events = self._sel.select(timeout=timeout)
-        return [key.fileobj for key, mask in events]
+        return ([key.fileobj for key, mask in events if mask & self._selectors.EVENT_READ],
+                [key.fileobj for key, mask in events if mask & self._selectors.EVENT_WRITE])
 
     def close(self):
         self._sel.close()
@@ -145,17 +203,50 @@ class Python3Selector(Selector):
 class PollSelector(Selector):
     def __init__(self):
         self._poll = select.poll()
+        self._readers = set()
+        self._writers = set()
+
+    def _update(self, fd):
+        events = ((select.POLLIN if fd in self._readers else 0) |
+                  (select.POLLOUT if fd in self._writers else 0))
+        if events:
+            self._poll.register(fd, events)
+        else:
+            self._poll.unregister(fd)
 
     def register(self, fd):
         assert isinstance(fd, int)
-        self._poll.register(fd, select.POLLIN)
+        self._readers.add(fd)
+        self._update(fd)
 
     def unregister(self, fd):
         assert isinstance(fd, int)
+        self._readers.discard(fd)
+        self._update(fd)
+
+    def register_writer(self, fd):
+        assert isinstance(fd, int)
+        self._writers.add(fd)
+        self._update(fd)
+
+    def unregister_writer(self, fd):
+        assert isinstance(fd, int)
+        self._writers.discard(fd)
+        self._update(fd)
 
     def select(self, timeout):
+        return self.select_read_write(timeout)[0]
+
+    def select_read_write(self, timeout):
+        # (`poll` takes the timeout in milliseconds. Round up, otherwise we
+        # would wake up too early, again and again, for a timer that is due
+        # in less than a millisecond.)
+        if timeout is not None:
+            timeout = int(math.ceil(timeout * 1000))
+
         tuples = self._poll.poll(timeout)  # Returns (fd, event) tuples.
-        return [t[0] for t in tuples]
+        return ([fd for fd, event in tuples if event & ~select.POLLOUT],
+                [fd for fd, event in tuples if event & select.POLLOUT])
 
     def close(self):
         pass  # XXX
@@ -170,6 +261,7 @@ class SelectSelector(Selector):
     """
     def __init__(self):
         self._fds = []
+        self._write_fds = []
 
     def register(self, fd):
         self._fds.append(fd)
@@ -177,10 +269,19 @@ class SelectSelector(Selector):
     def unregister(self, fd):
         self._fds.remove(fd)
 
+    def register_writer(self, fd):
+        self._write_fds.append(fd)
+
+    def unregister_writer(self, fd):
+        self._write_fds.remove(fd)
+
     def select(self, timeout):
+        return self.select_read_write(timeout)[0]
+
+    def select_read_write(self, timeout):
         while True:
             try:
-                return select.select(self._fds, [], [], timeout)[0]
+                return select.select(self._fds, self._write_fds, [], timeout)[:2]
             except select.error as e:
                 # Retry select call when EINTR
                 if e.args and e.args[0] == errno.EINTR:
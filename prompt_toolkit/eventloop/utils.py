@@ -1,10 +1,16 @@
 from __future__ import unicode_literals
+from collections import deque
+import atexit
 import threading
+import weakref
+
+from prompt_toolkit.log import logger
 from .future import Future
 from .context import get_context_id, context
 
 __all__ = [
     'ThreadWithFuture',
+    'ThreadPool',
 ]
 
 
@@ -21,22 +27,184 @@ class ThreadWithFuture(object):
 
         self._ctx_id = get_context_id()
 
+    def run(self):
+        """
+        Call the target in the current thread and set the result of
+        `self.future`. (This is what runs in the thread, but it can be passed
+        to a `ThreadPool` as well.)
+        """
+        # Mark this context (and thus `Application`) active in the current
+        # thread.
+        with context(self._ctx_id):
+            try:
+                result = self.target()
+            except BaseException as e:
+                self.future.set_exception(e)
+            else:
+                self.future.set_result(result)
+
     def start(self):
         """
         Start the thread, `self.future` will be set when the thread is done.
         """
-        def run():
-            # Mark this context (and thus `Application`) active in the current
-            # thread.
-            with context(self._ctx_id):
-                try:
-                    result = self.target()
-                except BaseException as e:
-                    self.future.set_exception(e)
-                else:
-                    self.future.set_result(result)
-
-        t = threading.Thread(target=run)
+        t = threading.Thread(target=self.run)
         if self.daemon:
             t.daemon = True
         t.start()
+
+
+# All pools that have not been shut down. When the interpreter exits, we wait
+# for the non-daemon tasks, like we would for non-daemon threads.
+_live_pools = weakref.WeakSet()
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in list(_live_pools):
+        pool.shutdown(wait=True)
+
+
+class ThreadPool(object):
+    """
+    Pool of reusable worker threads.
+
+    At most `max_workers` threads are used for regular tasks. When they are
+    all busy, new tasks are queued until a worker becomes available.
+
+    Daemon tasks (like timeouts, or consumers of generators) can block for a
+    very long time, so they never wait for a worker: when no worker is idle,
+    an additional one is started. Only `max_workers` idle workers are kept
+    around. Like daemon threads, daemon tasks don't keep the process alive.
+
+    :param max_workers: Maximum number of threads for regular tasks.
+    """
+    def __init__(self, max_workers=16):
+        assert isinstance(max_workers, int) and max_workers > 0
+
+        self.max_workers = max_workers
+
+        lock = threading.Lock()
+        self._condition = threading.Condition(lock)  # Wakes up idle workers.
+        self._done_condition = threading.Condition(lock)  # Wakes `shutdown`.
+        self._queue = deque()
+        self._daemon_queue = deque()  # Always taken before `_queue`.
+        self._worker_count = 0
+        self._idle_count = 0  # Idle workers, that haven't been notified yet.
+        self._active_count = 0
+        self._daemon_active_count = 0  # Workers running a daemon task.
+        self._pending_count = 0  # Regular tasks, queued or running.
+        self._shutdown = False
+
+        _live_pools.add(self)
+
+    @property
+    def queued_tasks(self):
+        " Number of tasks waiting for a worker. "
+        return len(self._queue) + len(self._daemon_queue)
+
+    @property
+    def active_tasks(self):
+        " Number of tasks that are running right now. "
+        return self._active_count
+
+    @property
+    def worker_count(self):
+        " Number of worker threads, busy or idle. "
+        return self._worker_count
+
+    def submit(self, callback, daemon=False):
+        """
+        Call `callback` in one of the worker threads. The return value is
+        ignored and exceptions are logged. (Use `ThreadWithFuture.run` as
+        callback for retrieving the result.)
+
+        :param daemon: Don't wait for a worker and don't wait for this task
+            when shutting down.
+        """
+        assert callable(callback)
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit tasks after shutdown.')
+
+            if daemon:
+                self._daemon_queue.append(callback)
+            else:
+                self._queue.append(callback)
+                self._pending_count += 1
+
+            # (Workers that are busy with a daemon task don't count for the
+            # `max_workers` limit.)
+            if self._idle_count:
+                self._idle_count -= 1
+                self._condition.notify()
+            elif daemon or self._worker_count - self._daemon_active_count < self.max_workers:
+                self._start_worker()
+
+    def _start_worker(self):
+        self._worker_count += 1
+
+        t = threading.Thread(target=self._work)
+        t.daemon = True
+        t.start()
+
+    def _work(self):
+        " Main loop of a worker thread. "
+        condition = self._condition
+        condition.acquire()
+        try:
+            while True:
+                regular_active_count = self._active_count - self._daemon_active_count
+
+                if self._daemon_queue:
+                    callback = self._daemon_queue.popleft()
+                    daemon = True
+                    self._daemon_active_count += 1
+                elif self._queue and regular_active_count < self.max_workers:
+                    callback = self._queue.popleft()
+                    daemon = False
+                elif self._shutdown or self._worker_count - self._daemon_active_count > self.max_workers:
+                    break
+                else:
+                    self._idle_count += 1
+                    condition.wait()
+                    continue
+
+                self._active_count += 1
+                condition.release()
+                try:
+                    callback()
+                except BaseException:
+                    logger.error('Unhandled exception in thread pool task',
+                                 exc_info=True)
+                finally:
+                    condition.acquire()
+                    self._active_count -= 1
+
+                    if daemon:
+                        self._daemon_active_count -= 1
+                    else:
+                        self._pending_count -= 1
+                        if not self._pending_count:
+                            self._done_condition.notify_all()
+        finally:
+            self._worker_count -= 1
+            condition.release()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers after the queued tasks are processed. No new tasks
+        can be submitted after this call.
+
+        :param wait: Block until all the regular (non-daemon) tasks are done.
+        """
+        with self._condition:
+            self._shutdown = True
+            self._idle_count = 0
+            self._condition.notify_all()
+
+            if wait:
+                while self._pending_count:
+                    self._done_condition.wait()
+
+        _live_pools.discard(self)
@@ -18,7 +18,7 @@ Filters can be chained using ``&`` and ``|`` operations, and inverted using the
 """
 from __future__ import unicode_literals
 
-from .base import Filter, Never, Always, Condition
+from .base import Filter, Never, Always, Condition, cache_filter_results, filter_cache_statistics
 from .app import *
 from .utils import to_filter
 
@@ -1,14 +1,20 @@
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from six import with_metaclass
 
 from prompt_toolkit.utils import test_callable_args
 
+import threading
+
 __all__ = [
     'Filter',
     'Never',
     'Always',
     'Condition',
+    'cache_filter_results',
+    'filter_cache_statistics',
+    'is_decided_by',
 ]
 
 
@@ -112,6 +118,74 @@ _or_cache = _OrCache()
 _invert_cache = _InvertCache()
 
 
+class _FilterCacheStatistics(object):
+    """
+    Counters for the filter results cache. (For debugging.)
+
+    :attr evaluations: Number of filters that were evaluated while caching.
+    :attr saved: Number of evaluations that were answered from the cache.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.evaluations = 0
+        self.saved = 0
+
+    def __repr__(self):
+        return '%s(evaluations=%r, saved=%r)' % (
+            self.__class__.__name__, self.evaluations, self.saved)
+
+
+filter_cache_statistics = _FilterCacheStatistics()
+
+
+class _FilterResults(dict):
+    """
+    Maps filters to their result, while `cache_filter_results` is active.
+    """
+    def get_result(self, filter, evaluate):
+        try:
+            result = self[filter]
+        except KeyError:
+            result = self[filter] = evaluate()
+            filter_cache_statistics.evaluations += 1
+        else:
+            filter_cache_statistics.saved += 1
+        return result
+
+
+class _Context(threading.local):
+    results = None  # `_FilterResults` while caching.
+
+
+_context = _Context()
+
+
+@contextmanager
+def cache_filter_results(enabled=True):
+    """
+    Context manager that evaluates every :class:`.Condition` (and every
+    combination of filters made with ``&``, ``|`` and ``~``) at most once
+    inside the block. Use this only around code that doesn't change the
+    state observed by the filters, like one rendering of the layout.
+
+    Nested blocks share the cache of the outermost block. (The cache is local
+    to the current thread.)
+
+    :param enabled: When False, don't cache anything.
+    """
+    if not enabled or _context.results is not None:
+        yield
+        return
+
+    _context.results = _FilterResults()
+    try:
+        yield
+    finally:
+        _context.results = None
+
+
 class _AndList(Filter):
     """
     Result of &-operation between several filters.
@@ -128,6 +202,12 @@ class _AndList(Filter):
         self.filters = all_filters
 
     def __call__(self):
+        results = _context.results
+        if results is None:
+            return self._evaluate()
+        return results.get_result(self, self._evaluate)
+
+    def _evaluate(self):
         return all(f() for f in self.filters)
 
     def __repr__(self):
@@ -150,6 +230,12 @@ class _OrList(Filter):
         self.filters = all_filters
 
     def __call__(self):
+        results = _context.results
+        if results is None:
+            return self._evaluate()
+        return results.get_result(self, self._evaluate)
+
+    def _evaluate(self):
         return any(f() for f in self.filters)
 
     def __repr__(self):
@@ -164,6 +250,12 @@ class _Invert(Filter):
         self.filter = filter
 
     def __call__(self):
+        results = _context.results
+        if results is None:
+            return self._evaluate()
+        return results.get_result(self, self._evaluate)
+
+    def _evaluate(self):
         return not self.filter()
 
     def __repr__(self):
@@ -211,7 +303,37 @@ class Condition(Filter):
         self.func = func
 
     def __call__(self):
-        return self.func()
+        results = _context.results
+        if results is None:
+            return self.func()
+        return results.get_result(self, self.func)
 
     def __repr__(self):
         return 'Condition(%r)' % self.func
+
+
+def is_decided_by(filter, filters):
+    """
+    True when the outcome of `filter` follows from the outcome of the given
+    `filters` only. That's the case for `Always`, `Never`, the given filters
+    themselves and combinations of those. Also an ``&`` combination of which
+    one of the given filters evaluates to False (or an ``|`` combination for
+    which one evaluates to True) is decided, so these are evaluated.
+
+    :param filters: Set of `Filter` instances.
+    """
+    if isinstance(filter, (Always, Never)) or filter in filters:
+        return True
+
+    if isinstance(filter, _AndList):
+        return (all(is_decided_by(f, filters) for f in filter.filters) or
+                any(is_decided_by(f, filters) and not f() for f in filter.filters))
+
+    if isinstance(filter, _OrList):
+        return (all(is_decided_by(f, filters) for f in filter.filters) or
+                any(is_decided_by(f, filters) and f() for f in filter.filters))
+
+    if isinstance(filter, _Invert):
+        return is_decided_by(filter.filter, filters)
+
+    return False
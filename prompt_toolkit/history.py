@@ -9,33 +9,212 @@ NOTE: Notice that there is no `DynamicHistory`. This doesn't work well, because
 from __future__ import unicode_literals
 
 from .utils import Event
-from .eventloop import AsyncGeneratorItem, From, ensure_future, consume_async_generator, generator_to_async_generator
+from .eventloop import AsyncGeneratorItem, From, ensure_future, chunk_async_generator, consume_async_generator, generator_to_async_generator, run_in_executor
 
 from abc import ABCMeta, abstractmethod
+from array import array
 from six import with_metaclass, text_type
+from six.moves import range
 
 import datetime
+import mmap
 import os
+import re
+import struct
 
 __all__ = [
     'History',
+    'HistoryStrings',
     'ThreadedHistory',
     'DummyHistory',
     'FileHistory',
+    'IndexedFileHistory',
     'InMemoryHistory',
 ]
 
 
+class HistoryStrings(object):
+    """
+    Sequence of history strings, oldest first. This is what
+    `History.get_strings` returns, and what `Buffer` uses for its working
+    lines.
+
+    Prepending strings is cheap. (The newest strings are loaded first, so while
+    loading, the strings are prepended.) The strings can also be backed by a
+    lazy sequence, like the entries of an :class:`.IndexedFileHistory`, which
+    is never copied.
+
+    :param strings: Sequence of strings, oldest first.
+    """
+    def __init__(self, strings=()):
+        self._older = []  # Prepended strings, in reverse order.
+        self._strings = strings
+        self._changed = {}  # Maps index in `_strings` to a new value.
+        self._newer = []  # Appended strings.
+
+        #: Number of strings that were prepended so far.
+        self.prepended = 0
+
+    def _locate(self, index):
+        """
+        Return a (part, index) tuple for the given index. `part` is 0 for
+        `_older`, 1 for `_strings` and 2 for `_newer`.
+        """
+        if index < 0:
+            index += len(self)
+
+        older_count = len(self._older)
+        if 0 <= index < older_count:
+            return 0, older_count - index - 1
+
+        index -= older_count
+        strings_count = len(self._strings)
+        if 0 <= index < strings_count:
+            return 1, index
+
+        index -= strings_count
+        if 0 <= index < len(self._newer):
+            return 2, index
+
+        raise IndexError('History index out of range.')
+
+    def __len__(self):
+        return len(self._older) + len(self._strings) + len(self._newer)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    __nonzero__ = __bool__  # For Python 2.
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+
+            if start == 0 and stop == len(self) and step == 1:
+                return self.copy()
+
+            # Don't copy the lazy sequence if we don't have to.
+            older_count = len(self._older)
+            if (step == 1 and not self._changed and
+                    older_count <= start <= stop <= older_count + len(self._strings)):
+                return self._strings[start - older_count:stop - older_count]
+
+            return [self[i] for i in range(start, stop, step)]
+
+        part, index = self._locate(index)
+        if part == 0:
+            return self._older[index]
+        elif part == 1:
+            try:
+                return self._changed[index]
+            except KeyError:
+                return self._strings[index]
+        else:
+            return self._newer[index]
+
+    def __setitem__(self, index, value):
+        part, index = self._locate(index)
+        if part == 0:
+            self._older[index] = value
+        elif part == 1:
+            self._changed[index] = value
+        else:
+            self._newer[index] = value
+
+    def __iter__(self):
+        for string in reversed(self._older):
+            yield string
+
+        changed = self._changed
+        if changed:
+            for i, string in enumerate(self._strings):
+                yield changed.get(i, string)
+        else:
+            for string in self._strings:
+                yield string
+
+        for string in self._newer:
+            yield string
+
+    def __reversed__(self):
+        for string in reversed(self._newer):
+            yield string
+
+        changed = self._changed
+        for i in range(len(self._strings) - 1, -1, -1):
+            try:
+                yield changed[i]
+            except KeyError:
+                yield self._strings[i]
+
+        for string in self._older:
+            yield string
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self))
+
+    def copy(self):
+        """
+        Return a copy. (The lazy sequence itself is not copied, it's treated
+        as immutable.)
+        """
+        result = HistoryStrings(self._strings)
+        result._older = self._older[:]
+        result._changed = self._changed.copy()
+        result._newer = self._newer[:]
+        result.prepended = self.prepended
+        return result
+
+    def append(self, string):
+        " Append string at the end. (Make it the newest string.) "
+        self._newer.append(string)
+
+    def appendleft(self, string):
+        " Prepend string. (Make it the oldest string.) "
+        self._older.append(string)
+        self.prepended += 1
+
+    def extendleft(self, strings):
+        """
+        Prepend all these strings, one at a time. (Like `deque.extendleft`,
+        this means that the order gets reversed: `strings` should yield the
+        newest string first.)
+        """
+        count = len(self._older)
+        self._older.extend(strings)
+        self.prepended += len(self._older) - count
+
+    def prepend(self, strings):
+        """
+        Prepend a sequence of strings (oldest first). When nothing else was
+        loaded yet, a lazy sequence is kept as it is.
+        """
+        if not self._older and not len(self._strings):
+            self._strings = strings
+            self._changed = {}
+            self.prepended += len(strings)
+        else:
+            self.extendleft(reversed(strings))
+
+
 class History(with_metaclass(ABCMeta, object)):
     """
     Base ``History`` class.
 
     This also includes abstract methods for loading/storing history.
     """
+    #: Loaded strings are delivered in chunks of at most this many strings.
+    #: (One item loaded event per chunk.)
+    load_chunk_size = 1000
+
+    #: Maximum time (in seconds) to spend on collecting one chunk, before
+    #: delivering it and giving the event loop the chance to process input.
+    load_chunk_time = .05
+
     def __init__(self):
         # In memory storage for strings.
         self._loading = False
-        self._loaded_strings = []
+        self._loaded_strings = HistoryStrings()
         self._item_loaded = Event(self)
 
     def _start_loading(self):
@@ -45,16 +224,21 @@ class History(with_metaclass(ABCMeta, object)):
         This is only called once, because once the history is loaded, we don't
         have to load it again.
         """
-        def add_string(string):
-            " Got one string from the asynchronous history generator. "
-            self._loaded_strings.insert(0, string)
+        def add_strings(strings):
+            " Got a chunk of strings from the asynchronous history generator. "
+            # (Newest strings come first, so `extendleft` keeps them in the
+            # right order.)
+            self._loaded_strings.extendleft(strings)
             self._item_loaded.fire()
 
         yield From(consume_async_generator(
-            self.load_history_strings_async(),
+            chunk_async_generator(
+                self.load_history_strings_async(),
+                chunk_size=self.load_chunk_size,
+                max_time=self.load_chunk_time),
             cancel=lambda: False,  # Right now, we don't have cancellation
                                    # of history loading in any way.
-            item_callback=add_string))
+            item_callback=add_strings))
 
     #
     # Methods expected by `Buffer`.
@@ -67,12 +251,17 @@ class History(with_metaclass(ABCMeta, object)):
             ensure_future(self._start_loading())
 
     def get_item_loaded_event(self):
-        " Event which is triggered when a new item is loaded. "
+        """
+        Event which is triggered when new items are loaded. The new items are
+        prepended to `get_strings()`, use `HistoryStrings.prepended` to find
+        out how many.
+        """
         return self._item_loaded
 
     def get_strings(self):
         """
-        Get the strings from the history that are loaded so far.
+        Get the strings from the history that are loaded so far, as a
+        :class:`.HistoryStrings` sequence. (Oldest first.)
         """
         return self._loaded_strings
 
@@ -201,7 +390,7 @@ class FileHistory(History):
         if os.path.exists(self.filename):
             with open(self.filename, 'rb') as f:
                 for line in f:
-                    line = line.decode('utf-8')
+                    line = line.decode('utf-8', errors='replace')
 
                     if line.startswith('+'):
                         lines.append(line[1:])
@@ -223,3 +412,176 @@ class FileHistory(History):
             write('\n# %s\n' % datetime.datetime.now())
             for line in string.split('\n'):
                 write('+%s\n' % line)
+
+
+class _IndexedEntries(object):
+    """
+    Lazy sequence of the entries of an :class:`.IndexedFileHistory`. The
+    entries are only decoded when they are accessed.
+
+    :param data: Memory mapped history file. (Or any bytes-like object.)
+    :param starts: Array of byte offsets where the entries start.
+    :param ends: Array of byte offsets where the entries end.
+    """
+    def __init__(self, data, starts, ends, start=0, stop=None):
+        self._data = data
+        self._starts = starts
+        self._ends = ends
+        self._start = start
+        self._stop = len(starts) if stop is None else stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return _IndexedEntries(self._data, self._starts, self._ends,
+                                       self._start + start,
+                                       self._start + max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('History index out of range.')
+
+        index += self._start
+        return _decode_entry(self._data[self._starts[index]:self._ends[index]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _decode_entry(data):
+    """
+    Turn the '+' prefixed lines of one history entry into a string.
+    """
+    lines = data.decode('utf-8', errors='replace').split('\n')
+
+    # Drop trailing newline.
+    if lines[-1] == '':
+        lines.pop()
+
+    return '\n'.join(line[1:] for line in lines)
+
+
+# Consecutive lines that start with a '+' form one entry.
+_entry_re = re.compile(br'(?:^\+.*\n?)+', re.MULTILINE)
+
+
+class IndexedFileHistory(FileHistory):
+    """
+    :class:`.FileHistory` for very large history files.
+
+    The offsets of the entries are kept in a sidecar index file, which only
+    has to be extended for the entries that were added since the last time.
+    The history file is memory mapped, and entries are only decoded when
+    they are accessed, so the start-up time doesn't depend on the size of the
+    history. The file format is the same as for :class:`.FileHistory`.
+
+    :param index_filename: Filename of the index. (By default, the history
+        filename with '.index' appended.)
+    """
+    _INDEX_MAGIC = b'prompt_toolkit history index 1\n'
+    _INDEX_HEADER = struct.Struct('<QQB')  # File size, entry count, item size.
+
+    # Size of the tail that we compare to see whether the history file was
+    # only appended to, since we created the index.
+    _TAIL_SIZE = 32
+
+    def __init__(self, filename, index_filename=None):
+        self.index_filename = index_filename or filename + '.index'
+        super(IndexedFileHistory, self).__init__(filename)
+
+    def _start_loading(self):
+        # Read and update the index in a background thread. (For a big file
+        # without index, this takes a moment.)
+        entries = yield From(run_in_executor(self.load_entries))
+
+        if len(entries):
+            self._loaded_strings.prepend(entries)
+            self._item_loaded.fire()
+
+    def load_history_strings(self):
+        entries = self.load_entries()
+        return (entries[i] for i in range(len(entries) - 1, -1, -1))
+
+    def load_entries(self):
+        """
+        Memory map the history file and return a lazy sequence with all the
+        entries, oldest first. The index is updated when required.
+        """
+        try:
+            with open(self.filename, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            # The file doesn't exist or is empty.
+            return []
+
+        starts, ends, indexed_size = self._read_index(data)
+
+        if indexed_size != len(data):
+            # Always index the last entry again, it could have been extended.
+            if starts:
+                indexed_size = starts.pop()
+                ends.pop()
+
+            for m in _entry_re.finditer(data, indexed_size):
+                starts.append(m.start())
+                ends.append(m.end())
+
+            self._write_index(data, starts, ends)
+
+        return _IndexedEntries(data, starts, ends)
+
+    def _read_index(self, data):
+        """
+        Read the index. Returns a (starts, ends, indexed_size) tuple. When the
+        index doesn't exist or doesn't match the file, it's empty.
+        """
+        header = self._INDEX_HEADER
+        starts = array(str('l'))
+        ends = array(str('l'))
+
+        try:
+            with open(self.index_filename, 'rb') as f:
+                if f.read(len(self._INDEX_MAGIC)) != self._INDEX_MAGIC:
+                    return starts, ends, 0
+
+                size, count, itemsize = header.unpack(f.read(header.size))
+                tail = f.read(self._TAIL_SIZE)
+
+                if itemsize != starts.itemsize:
+                    return starts, ends, 0
+
+                starts.fromfile(f, count)
+                ends.fromfile(f, count)
+        except (IOError, OSError, EOFError, struct.error):
+            return array(str('l')), array(str('l')), 0
+
+        # The history file should only have been appended to.
+        if size > len(data) or self._get_tail(data, size) != tail:
+            return array(str('l')), array(str('l')), 0
+
+        return starts, ends, size
+
+    def _get_tail(self, data, size):
+        return data[max(0, size - self._TAIL_SIZE):size].rjust(self._TAIL_SIZE, b'\0')
+
+    def _write_index(self, data, starts, ends):
+        size = len(data)
+
+        try:
+            with open(self.index_filename, 'wb') as f:
+                f.write(self._INDEX_MAGIC)
+                f.write(self._INDEX_HEADER.pack(size, len(starts), starts.itemsize))
+                f.write(self._get_tail(data, size))
+                starts.tofile(f)
+                ends.tofile(f)
+        except (IOError, OSError):
+            # Not being able to write the index is not a problem. It's only
+            # slower next time.
+            pass
@@ -24,17 +24,19 @@ def create_input(stdin=None):
         return Vt100Input(stdin)
 
 
-def create_pipe_input():
+def create_pipe_input(batch_text=False):
     """
     Create an input pipe.
     This is mostly useful for unit testing.
+
+    :param batch_text: Report runs of plain text as one key press.
     """
     if is_windows():
         from .win32_pipe import Win32PipeInput
-        return Win32PipeInput()
+        return Win32PipeInput(batch_text=batch_text)
     else:
         from .posix_pipe import PosixPipeInput
-        return PosixPipeInput()
+        return PosixPipeInput(batch_text=batch_text)
 
 
 _default_input = TaskLocal()
@@ -0,0 +1,151 @@
+"""
+Input that receives its data in memory, without a file descriptor.
+"""
+from __future__ import unicode_literals
+
+from codecs import getincrementaldecoder
+import contextlib
+import six
+
+from ..eventloop import get_event_loop
+from ..eventloop.context import wrap_in_current_context
+from ..utils import DummyContext
+from .base import Input
+from .vt100_parser import Vt100Parser
+
+__all__ = [
+    'MemoryInput',
+]
+
+
+class MemoryInput(Input):
+    """
+    Input for which the data is given by calling `send_bytes` or `send_text`.
+    The data is parsed right away, and the attached application is called
+    from the event loop, without going through a pipe. (This is what the
+    telnet server uses for every connection.)
+
+    `send_bytes` and `send_text` have to be called from the event loop thread.
+
+    Usage::
+
+        input = MemoryInput()
+        input.send_text('inputdata')
+
+    :param batch_text: When True, report runs of plain text as one
+        `KeyPress(Keys.Any, text)` from `read_keys`, instead of one key press
+        per character.
+    """
+    def __init__(self, text='', errors=('ignore' if six.PY2 else 'surrogateescape'),
+                 batch_text=False):
+        self._buffer = []  # Buffer to collect the Key objects.
+        self.vt100_parser = Vt100Parser(
+            lambda key: self._buffer.append(key), batch_text=batch_text)
+
+        # Incremental decoder, because data can end in the middle of a utf-8
+        # byte sequence.
+        self._decoder = getincrementaldecoder('utf-8')(errors=errors)
+
+        # Stack of attached callbacks. (`None` when detached.)
+        self._callbacks = []
+        self._ready_scheduled = False
+        self._closed = False
+
+        if text:
+            self.send_text(text)
+
+    def send_bytes(self, data):
+        " Send binary data to the input. "
+        assert isinstance(data, six.binary_type)
+        self.send_text(self._decoder.decode(data))
+
+    def send_text(self, data):
+        " Send text to the input. "
+        assert isinstance(data, six.text_type)
+
+        if data and not self._closed:
+            self.vt100_parser.feed(data)
+            self._schedule_ready()
+
+    def _schedule_ready(self):
+        """
+        Call the attached callback from the event loop. (Also when no keys
+        were parsed, the application needs to know that it has to flush the
+        parser after a timeout.)
+        """
+        if self._callbacks and self._callbacks[-1] and not self._ready_scheduled:
+            self._ready_scheduled = True
+            get_event_loop().call_later(0, self._ready)
+
+    def _ready(self):
+        self._ready_scheduled = False
+
+        if self._callbacks and self._callbacks[-1]:
+            self._callbacks[-1]()
+
+    def fileno(self):
+        raise NotImplementedError
+
+    def typeahead_hash(self):
+        return 'memory-input-%s' % id(self)
+
+    def read_keys(self):
+        " Return the parsed keys. "
+        result = self._buffer
+        self._buffer = []
+        return result
+
+    def flush_keys(self):
+        """
+        Flush pending keys and return them.
+        (Used for flushing the 'escape' key.)
+        """
+        self.vt100_parser.flush()
+        return self.read_keys()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def raw_mode(self):
+        return DummyContext()
+
+    def cooked_mode(self):
+        return DummyContext()
+
+    def attach(self, input_ready_callback):
+        """
+        Return a context manager that makes this input active in the current
+        event loop.
+        """
+        assert callable(input_ready_callback)
+        return self._attached(wrap_in_current_context(input_ready_callback))
+
+    def detach(self):
+        """
+        Return a context manager that makes sure that this input is not active
+        in the current event loop.
+        """
+        return self._attached(None)
+
+    @contextlib.contextmanager
+    def _attached(self, callback):
+        self._callbacks.append(callback)
+
+        # Handle the data that was received while not attached.
+        if self._buffer or self._closed:
+            self._schedule_ready()
+
+        try:
+            yield
+        finally:
+            self._callbacks.pop()
+
+            if self._buffer or self._closed:
+                self._schedule_ready()
+
+    def close(self):
+        " Close the input. The attached application will notice this. "
+        if not self._closed:
+            self._closed = True
+            self._schedule_ready()
@@ -17,9 +17,13 @@ class PosixPipeInput(Vt100Input):
 
         input = PosixPipeInput()
         input.send_text('inputdata')
+
+    :param batch_text: When True, report runs of plain text as one
+        `KeyPress(Keys.Any, text)` from `read_keys`, instead of one key press
+        per character.
     """
     _id = 0
-    def __init__(self, text=''):
+    def __init__(self, text='', batch_text=False):
         self._r, self._w = os.pipe()
 
         class Stdin(object):
@@ -29,7 +33,7 @@ class PosixPipeInput(Vt100Input):
             def fileno(stdin):
                 return self._r
 
-        super(PosixPipeInput, self).__init__(Stdin())
+        super(PosixPipeInput, self).__init__(Stdin(), batch_text=batch_text)
         self.send_text(text)
 
         # Identifier for every PipeInput for the hash.
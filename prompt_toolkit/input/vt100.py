@@ -22,8 +22,12 @@ class Vt100Input(Input):
     """
     Vt100 input for Posix systems.
     (This uses a posix file descriptor that can be registered in the event loop.)
+
+    :param batch_text: When True, report runs of plain text as one
+        `KeyPress(Keys.Any, text)` from `read_keys`, instead of one key press
+        per character.
     """
-    def __init__(self, stdin):
+    def __init__(self, stdin, batch_text=False):
         # The input object should be a TTY.
         assert stdin.isatty()
 
@@ -48,7 +52,7 @@ class Vt100Input(Input):
         self._buffer = []  # Buffer to collect the Key objects.
         self.stdin_reader = PosixStdinReader(self._fileno)
         self.vt100_parser = Vt100Parser(
-            lambda key: self._buffer.append(key))
+            lambda key: self._buffer.append(key), batch_text=batch_text)
 
     @property
     def responds_to_cpr(self):
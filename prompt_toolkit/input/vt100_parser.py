@@ -33,6 +33,13 @@ _cpr_response_prefix_re = re.compile('^' + re.escape('\x1b[') + r'[\d;]*\Z')
 
 _mouse_event_prefix_re = re.compile('^' + re.escape('\x1b[') + r'(<?[\d;]*|M.{0,2})\Z')
 
+# Runs of plain text. (None of these characters can be the start of an escape
+# sequence or control key.)
+_plain_text_re = re.compile('[^\x00-\x1f\x7f]+')
+
+# End of bracketed paste.
+_paste_end_mark = '\x1b[201~'
+
 
 class _Flush(object):
     """ Helper object to indicate flush operation to the parser. """
@@ -74,20 +81,40 @@ class Vt100Parser(object):
         i.feed('data\x01...')
 
     :attr feed_key_callback: Function that will be called when a key is parsed.
+    :param batch_text: When True, report runs of plain text as one
+        `KeyPress(Keys.Any, text)`, instead of one key press per character.
+        (The :class:`~prompt_toolkit.key_binding.KeyProcessor` inserts these
+        at once when they would be handled by `self-insert`.)
+    :param paste_chunk_size: When given, deliver the content of a bracketed
+        paste while it's being received, as `Keys.BracketedPaste` key presses
+        of at most this size. (By default, the content is delivered as one
+        key press, once the end of the paste has been received.)
     """
     # Lookup table of ANSI escape sequences for a VT100 terminal
     # Hint: in order to know what sequences your terminal writes to stdin, run
     #       "od -c" and start typing.
-    def __init__(self, feed_key_callback):
+    def __init__(self, feed_key_callback, batch_text=False, paste_chunk_size=None):
         assert callable(feed_key_callback)
+        assert paste_chunk_size is None or paste_chunk_size > 1
 
         self.feed_key_callback = feed_key_callback
+        self.batch_text = batch_text
+        self.paste_chunk_size = paste_chunk_size
         self.reset()
 
     def reset(self, request=False):
         self._in_bracketed_paste = False
+        self._reset_paste_buffer()
         self._start_parser()
 
+    def _reset_paste_buffer(self):
+        self._paste_buffer = []  # List of received chunks.
+        self._paste_size = 0  # Total length of the chunks.
+
+        # The end of the received data, which could be the start of the end
+        # mark. (Not yet in `_paste_buffer`.)
+        self._paste_tail = ''
+
     def _start_parser(self):
         """
         Start the parser coroutine.
@@ -95,6 +122,9 @@ class Vt100Parser(object):
         self._input_parser = self._input_parser_generator()
         self._input_parser.send(None)
 
+        # True when the parser is not in the middle of a key sequence.
+        self._parser_idle = True
+
     def _get_match(self, prefix):
         """
         Return the key that maps to this prefix.
@@ -117,6 +147,7 @@ class Vt100Parser(object):
     def _input_parser_generator(self):
         """
         Coroutine (state machine) for the input parser.
+        (Yields the characters that are not yet handled.)
         """
         prefix = ''
         retry = False
@@ -129,7 +160,7 @@ class Vt100Parser(object):
                 retry = False
             else:
                 # Get next character.
-                c = yield
+                c = yield prefix
 
                 if c == _Flush:
                     flush = True
@@ -174,7 +205,7 @@ class Vt100Parser(object):
         else:
             if key == Keys.BracketedPaste:
                 self._in_bracketed_paste = True
-                self._paste_buffer = ''
+                self._reset_paste_buffer()
             else:
                 self.feed_key_callback(KeyPress(key, insert_text))
 
@@ -190,33 +221,94 @@ class Vt100Parser(object):
         # key presses and keep reading input until we see the end mark.)
         # This is much faster then parsing character by character.
         if self._in_bracketed_paste:
-            self._paste_buffer += data
-            end_mark = '\x1b[201~'
-
-            if end_mark in self._paste_buffer:
-                end_index = self._paste_buffer.index(end_mark)
-
-                # Feed content to key bindings.
-                paste_content = self._paste_buffer[:end_index]
-                self.feed_key_callback(KeyPress(Keys.BracketedPaste, paste_content))
+            # Only search the new data, and the end of the previous data.
+            data = self._paste_tail + data
+            end_index = data.find(_paste_end_mark)
+
+            if end_index == -1:
+                keep = len(_paste_end_mark) - 1
+                self._paste_tail = data[-keep:]
+                self._add_paste_content(data[:-keep])
+            else:
+                self._paste_tail = ''
+                self._add_paste_content(data[:end_index])
+                self._feed_paste_content(final=True)
 
                 # Quit bracketed paste mode and handle remaining input.
                 self._in_bracketed_paste = False
-                remaining = self._paste_buffer[end_index + len(end_mark):]
-                self._paste_buffer = ''
+                self._reset_paste_buffer()
 
-                self.feed(remaining)
+                self.feed(data[end_index + len(_paste_end_mark):])
 
         # Handle normal input character by character.
         else:
-            for i, c in enumerate(data):
+            i = 0
+            while i < len(data):
                 if self._in_bracketed_paste:
                     # Quit loop and process from this position when the parser
                     # entered bracketed paste.
                     self.feed(data[i:])
                     break
-                else:
-                    self._input_parser.send(c)
+
+                # Plain text, outside of a key sequence, doesn't have to go
+                # through the parser.
+                if self._parser_idle:
+                    match = _plain_text_re.match(data, i)
+                    if match:
+                        self._feed_text(match.group(0))
+                        i = match.end()
+                        continue
+
+                self._parser_idle = not self._input_parser.send(data[i])
+                i += 1
+
+    def _add_paste_content(self, text):
+        """
+        Add received content of a bracketed paste to the paste buffer.
+        """
+        if text:
+            self._paste_buffer.append(text)
+            self._paste_size += len(text)
+
+            if self.paste_chunk_size and self._paste_size >= self.paste_chunk_size:
+                self._feed_paste_content(final=False)
+
+    def _feed_paste_content(self, final):
+        """
+        Feed the content of the paste buffer to the key bindings.
+        """
+        content = ''.join(self._paste_buffer)
+        self._paste_buffer = []
+        self._paste_size = 0
+
+        # Without streaming: everything at once.
+        if not self.paste_chunk_size:
+            self.feed_key_callback(KeyPress(Keys.BracketedPaste, content))
+            return
+
+        # Don't split a '\r\n' line ending between two key presses.
+        if not final and content.endswith('\r'):
+            content = content[:-1]
+            self._add_paste_content('\r')
+
+        start = 0
+        while start < len(content):
+            end = start + self.paste_chunk_size
+            if content[end - 1:end + 1] == '\r\n':
+                end -= 1
+
+            self.feed_key_callback(KeyPress(Keys.BracketedPaste, content[start:end]))
+            start = end
+
+    def _feed_text(self, text):
+        """
+        Report a run of plain text.
+        """
+        if self.batch_text and len(text) > 1:
+            self.feed_key_callback(KeyPress(Keys.Any, text))
+        else:
+            for c in text:
+                self.feed_key_callback(KeyPress(c, c))
 
     def flush(self):
         """
@@ -230,7 +322,7 @@ class Vt100Parser(object):
         timeout, and processes everything that's still in the buffer as-is, so
         without assuming any characters will follow.
         """
-        self._input_parser.send(_Flush)
+        self._parser_idle = not self._input_parser.send(_Flush)
 
     def feed_and_flush(self, data):
         """
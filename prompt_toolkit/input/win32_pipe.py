@@ -25,9 +25,13 @@ class Win32PipeInput(Input):
 
         input = Win32PipeInput()
         input.send_text('inputdata')
+
+    :param batch_text: When True, report runs of plain text as one
+        `KeyPress(Keys.Any, text)` from `read_keys`, instead of one key press
+        per character.
     """
     _id = 0
-    def __init__(self):
+    def __init__(self, batch_text=False):
         # Event (handle) for registering this input in the event loop.
         # This event is set when there is data available to read from the pipe.
         # Note: We use this approach instead of using a regular pipe, like
@@ -40,7 +44,7 @@ class Win32PipeInput(Input):
         # Parser for incoming keys.
         self._buffer = []  # Buffer to collect the Key objects.
         self.vt100_parser = Vt100Parser(
-            lambda key: self._buffer.append(key))
+            lambda key: self._buffer.append(key), batch_text=batch_text)
 
         # Identifier for every PipeInput for the hash.
         self.__class__._id += 1
@@ -13,6 +13,9 @@ __all__ = [
     'load_basic_bindings',
 ]
 
+#: Enabled after the 'quoted-insert' command, until the next key press.
+in_quoted_insert = Condition(lambda: get_app().quoted_insert)
+
 
 def if_no_repeat(event):
     """ Callable that returns True when the previous event was delivered to
@@ -201,7 +204,7 @@ def load_basic_bindings():
 
         event.current_buffer.insert_text(data)
 
-    @handle(Keys.Any, filter=Condition(lambda: get_app().quoted_insert), eager=True)
+    @handle(Keys.Any, filter=in_quoted_insert, eager=True)
     def _(event):
         """
         Handle quoted insert.
@@ -117,6 +117,16 @@ class KeyBindingsBase(with_metaclass(ABCMeta, object)):
         """
         return []
 
+    def get_filters_starting_with_keys(self, keys):
+        """
+        Return the distinct filters of the key bindings returned by
+        `get_bindings_starting_with_keys`. (Many key bindings share the same
+        filter, there's no need to evaluate it more than once.)
+
+        :param keys: tuple of keys.
+        """
+        return _distinct_filters(self.get_bindings_starting_with_keys(keys))
+
     # `add` and `remove` don't have to be part of this interface.
 
 
@@ -145,12 +155,24 @@ class KeyBindings(KeyBindingsBase):
         self.bindings = []
         self._get_bindings_for_keys_cache = SimpleCache(maxsize=10000)
         self._get_bindings_starting_with_keys_cache = SimpleCache(maxsize=1000)
+        self._get_filters_starting_with_keys_cache = SimpleCache(maxsize=1000)
+        self._trie = None  # `_BindingsTrie`, created when needed.
         self.__version = 0  # For cache invalidation.
 
     def _clear_cache(self):
         self.__version += 1
         self._get_bindings_for_keys_cache.clear()
         self._get_bindings_starting_with_keys_cache.clear()
+        self._get_filters_starting_with_keys_cache.clear()
+        self._trie = None
+
+    def _get_trie(self):
+        """
+        Return the `_BindingsTrie` for the current list of bindings.
+        """
+        if self._trie is None:
+            self._trie = _BindingsTrie(self.bindings)
+        return self._trie
 
     @property
     def _version(self):
@@ -271,27 +293,7 @@ class KeyBindings(KeyBindingsBase):
         :param keys: tuple of keys.
         """
         def get():
-            result = []
-            for b in self.bindings:
-                if len(keys) == len(b.keys):
-                    match = True
-                    any_count = 0
-
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-
-                        if i == Keys.Any:
-                            any_count += 1
-
-                    if match:
-                        result.append((any_count, b))
-
-            # Place bindings that have more 'Any' occurrences in them at the end.
-            result = sorted(result, key=lambda item: -item[0])
-
-            return [item[1] for item in result]
+            return self._get_trie().get_bindings_for_keys(keys)
 
         return self._get_bindings_for_keys_cache.get(keys, get)
 
@@ -305,20 +307,113 @@ class KeyBindings(KeyBindingsBase):
         :param keys: tuple of keys.
         """
         def get():
-            result = []
-            for b in self.bindings:
-                if len(keys) < len(b.keys):
-                    match = True
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-                    if match:
-                        result.append(b)
-            return result
+            return self._get_trie().get_bindings_starting_with_keys(keys)
 
         return self._get_bindings_starting_with_keys_cache.get(keys, get)
 
+    def get_filters_starting_with_keys(self, keys):
+        return self._get_filters_starting_with_keys_cache.get(
+            keys, lambda: _distinct_filters(self.get_bindings_starting_with_keys(keys)))
+
+
+class _TrieNode(object):
+    """
+    Node of a `_BindingsTrie`.
+    """
+    __slots__ = ('children', 'bindings', 'longer_bindings')
+
+    def __init__(self):
+        self.children = {}  # Maps key to `_TrieNode`.
+
+        # The bindings for the key sequence leading to this node, and the
+        # bindings for longer sequences starting with it. These are
+        # (-any_count, index, binding) tuples, so that they can be sorted.
+        self.bindings = []
+        self.longer_bindings = []
+
+
+class _BindingsTrie(object):
+    """
+    Trie of key bindings, keyed on the keys of the key sequences. `Keys.Any`
+    edges match any key. This finds the bindings for a key sequence without
+    looking at all the key bindings.
+
+    :param bindings: List of `_Binding` objects.
+    """
+    def __init__(self, bindings):
+        self.root = _TrieNode()
+
+        for index, b in enumerate(bindings):
+            item = (-b.keys.count(Keys.Any), index, b)
+            node = self.root
+
+            for key in b.keys:
+                node.longer_bindings.append(item)
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = _TrieNode()
+                node = child
+
+            node.bindings.append(item)
+
+    def _get_nodes(self, keys):
+        """
+        Return the nodes for the key sequences that match `keys`.
+        """
+        nodes = [self.root]
+
+        for key in keys:
+            next_nodes = []
+
+            for node in nodes:
+                child = node.children.get(key)
+                if child is not None:
+                    next_nodes.append(child)
+
+                if key != Keys.Any:
+                    child = node.children.get(Keys.Any)
+                    if child is not None:
+                        next_nodes.append(child)
+
+            nodes = next_nodes
+            if not nodes:
+                break
+
+        return nodes
+
+    def get_bindings_for_keys(self, keys):
+        """
+        Return the bindings for exactly this key sequence. Bindings that have
+        more 'Any' occurrences are placed at the end.
+        """
+        items = [item for node in self._get_nodes(keys) for item in node.bindings]
+        items.sort(key=lambda item: item[:2])
+        return [item[2] for item in items]
+
+    def get_bindings_starting_with_keys(self, keys):
+        """
+        Return the bindings for longer key sequences that start with `keys`,
+        in the original order.
+        """
+        items = [item for node in self._get_nodes(keys) for item in node.longer_bindings]
+        items.sort(key=lambda item: item[1])
+        return [item[2] for item in items]
+
+
+def _distinct_filters(bindings):
+    """
+    Return the filters of these bindings, without duplicates.
+    """
+    result = []
+    seen = set()
+
+    for b in bindings:
+        if b.filter not in seen:
+            seen.add(b.filter)
+            result.append(b.filter)
+
+    return result
+
 
 def _check_and_expand_key(key):
     """
@@ -398,6 +493,10 @@ class _Proxy(KeyBindingsBase):
         self._update_cache()
         return self._bindings2.get_bindings_starting_with_keys(*a, **kw)
 
+    def get_filters_starting_with_keys(self, *a, **kw):
+        self._update_cache()
+        return self._bindings2.get_filters_starting_with_keys(*a, **kw)
+
 
 class ConditionalKeyBindings(_Proxy):
     """
@@ -10,7 +10,10 @@ from __future__ import unicode_literals
 from prompt_toolkit.application.current import get_app
 from prompt_toolkit.buffer import EditReadOnlyBuffer
 from prompt_toolkit.enums import EditingMode
-from prompt_toolkit.eventloop import run_in_executor, call_from_executor
+from prompt_toolkit.eventloop import call_later
+from prompt_toolkit.cache import memoized
+from prompt_toolkit.filters import cache_filter_results
+from prompt_toolkit.filters.base import is_decided_by
 from prompt_toolkit.filters.app import vi_navigation_mode
 from prompt_toolkit.keys import Keys, ALL_KEYS
 from prompt_toolkit.utils import Event
@@ -20,7 +23,6 @@ from .key_bindings import KeyBindingsBase
 from collections import deque
 from six.moves import range
 import six
-import time
 import weakref
 
 __all__ = [
@@ -34,6 +36,10 @@ class KeyPress(object):
     """
     :param key: A `Keys` instance or text (one character).
     :param data: The received string on stdin. (Often vt100 escape codes.)
+
+    A `KeyPress` with `Keys.Any` as key represents a run of plain text, that
+    was typed or pasted at once. (See the `batch_text` option of
+    :class:`~prompt_toolkit.input.vt100_parser.Vt100Parser`.)
     """
     def __init__(self, key, data=None):
         assert key in ALL_KEYS or len(key) == 1
@@ -60,6 +66,41 @@ NOTE: the implementation is very similar to the VT100 parser.
 _Flush = KeyPress('?', data='_Flush')
 
 
+def _is_character(key_press):
+    " True when this `KeyPress` is a single typed character. "
+    return len(key_press.key) == 1 and key_press.data == key_press.key
+
+
+@memoized()
+def _insert_invariant_filters():
+    """
+    The filters of which the outcome doesn't change when text is inserted:
+    the filters for the editing mode, the focus and the numeric argument.
+    """
+    from prompt_toolkit.filters import app
+    from .bindings.basic import in_quoted_insert
+
+    return frozenset([
+        app.buffer_has_focus, app.has_arg, app.is_read_only,
+        app.in_paste_mode,
+        app.vi_mode, app.vi_navigation_mode, app.vi_insert_mode,
+        app.vi_insert_multiple_mode, app.vi_replace_mode,
+        app.vi_selection_mode, app.vi_waiting_for_text_object_mode,
+        app.vi_digraph_mode, app.vi_recording_macro,
+        app.emacs_mode, app.emacs_insert_mode, app.emacs_selection_mode,
+        in_quoted_insert,
+    ])
+
+
+def _is_static(filter):
+    """
+    True when the outcome of this filter can't change while a run of text is
+    inserted. Other conditions could depend on the text that was inserted
+    before.
+    """
+    return is_decided_by(filter, _insert_invariant_filters())
+
+
 class KeyProcessor(object):
     """
     Statemachine that receives :class:`KeyPress` instances and according to the
@@ -90,6 +131,7 @@ class KeyProcessor(object):
         self.after_key_press = Event(self)
 
         self._keys_pressed = 0  # Monotonically increasing counter.
+        self._flush_wait_handle = None  # `TimerHandle` of the flush timeout.
 
         self.reset()
 
@@ -130,14 +172,86 @@ class KeyProcessor(object):
         keys = tuple(k.key for k in key_presses)
 
         # Get the filters for all the key bindings that have a longer match.
-        # Note that we transform it into a `set`, because we don't care about
-        # the actual bindings and executing it more than once doesn't make
-        # sense. (Many key bindings share the same filter.)
-        filters = set(b.filter for b in self._bindings.get_bindings_starting_with_keys(keys))
+        # Many key bindings share the same filter, the key bindings return
+        # every filter only once.
+        filters = self._bindings.get_filters_starting_with_keys(keys)
 
         # When any key binding is active, return True.
         return any(f() for f in filters)
 
+    def _inserts_itself(self, c, static=False):
+        """
+        True when the `self-insert` binding would handle this character, when
+        it's typed outside of a key sequence.
+
+        :param static: Only return True when the filters of all the bindings
+            that could handle this character are static. Then the outcome
+            doesn't depend on the text that is inserted in front of it.
+        """
+        from .bindings.named_commands import get_by_name
+
+        if static:
+            keys = (c, )
+            bindings = (self._bindings.get_bindings_for_keys(keys) +
+                        self._bindings.get_bindings_starting_with_keys(keys))
+
+            if not all(_is_static(b.filter) and _is_static(b.eager) for b in bindings):
+                return False
+
+        key_presses = [KeyPress(c)]
+        matches = self._get_matches(key_presses)
+        eager_matches = [m for m in matches if m.eager()]
+
+        if eager_matches:
+            matches = eager_matches
+        elif self._is_prefix_of_longer_match(key_presses):
+            return False
+
+        return bool(matches) and matches[-1].handler is get_by_name('self-insert')
+
+    def _can_insert_text(self, text):
+        """
+        True when `text` can be inserted at once, because every character
+        would have been handled by the `self-insert` binding on its own.
+        """
+        # Not in the middle of a key sequence, and without numeric argument.
+        # (That would repeat only the first character.)
+        if self.key_buffer or self.arg is not None:
+            return False
+
+        # The first character is matched against the current state. The
+        # bindings of the other characters are evaluated before the text in
+        # front of them is inserted, so they can't have dynamic filters.
+        return (self._inserts_itself(text[0]) and
+                all(self._inserts_itself(c, static=True) for c in set(text[1:])))
+
+    def _coalesce_text(self, key_press):
+        """
+        Merge `key_press` and the following characters in the input queue
+        into one `Keys.Any` key press, as long as they would be inserted by
+        `self-insert`. This way, typeahead is inserted at once, with only one
+        undo entry and one text change event.
+        """
+        if not self._can_insert_text(key_press.data):
+            return key_press
+
+        inserts_itself = {}
+        data = [key_press.data]
+        queue = self.input_queue
+
+        while queue and _is_character(queue[0]):
+            c = queue[0].key
+            if c not in inserts_itself:
+                inserts_itself[c] = self._inserts_itself(c, static=True)
+            if not inserts_itself[c]:
+                break
+
+            data.append(queue.popleft().data)
+
+        if len(data) == 1:
+            return key_press
+        return KeyPress(Keys.Any, ''.join(data))
+
     def _process(self):
         """
         Coroutine implementing the key match algorithm. Key strokes are sent
@@ -160,16 +274,19 @@ class KeyProcessor(object):
 
             # If we have some key presses, check for matches.
             if buffer:
-                matches = self._get_matches(buffer)
+                # (No handler is called in between, so the filters can be
+                # cached.)
+                with cache_filter_results(get_app().cache_filters):
+                    matches = self._get_matches(buffer)
 
-                if flush:
-                    is_prefix_of_longer_match = False
-                else:
-                    is_prefix_of_longer_match = self._is_prefix_of_longer_match(buffer)
+                    if flush:
+                        is_prefix_of_longer_match = False
+                    else:
+                        is_prefix_of_longer_match = self._is_prefix_of_longer_match(buffer)
 
-                # When eager matches were found, give priority to them and also
-                # ignore all the longer matches.
-                eager_matches = [m for m in matches if m.eager()]
+                    # When eager matches were found, give priority to them and
+                    # also ignore all the longer matches.
+                    eager_matches = [m for m in matches if m.eager()]
 
                 if eager_matches:
                     matches = eager_matches
@@ -263,6 +380,18 @@ class KeyProcessor(object):
             # Process next key.
             key_press = get_next()
 
+            # A run of text is handled as one key press when it can be
+            # inserted at once. Otherwise, process the characters one by one.
+            with cache_filter_results(app.cache_filters):
+                if key_press.key == Keys.Any and not self._can_insert_text(key_press.data):
+                    self.input_queue.extendleft(
+                        KeyPress(c) for c in reversed(key_press.data))
+                    continue
+
+                if (_is_character(key_press) and self.input_queue and
+                        _is_character(self.input_queue[0]) and not app.is_done):
+                    key_press = self._coalesce_text(key_press)
+
             is_flush = key_press is _Flush
             is_cpr = key_press.key == Keys.CPRResponse
 
@@ -379,34 +508,32 @@ class KeyProcessor(object):
         """
         Start auto flush timeout. Similar to Vim's `timeoutlen` option.
 
-        Start a background thread with a timer. When this timeout expires and
-        no key was pressed in the meantime, we flush all data in the queue and
-        call the appropriate key binding handlers.
+        Start a timer in the event loop. When this timeout expires and no key
+        was pressed in the meantime, we flush all data in the queue and call
+        the appropriate key binding handlers.
         """
+        # Cancel the previous timeout.
+        if self._flush_wait_handle:
+            self._flush_wait_handle.cancel()
+            self._flush_wait_handle = None
+
         timeout = get_app().timeoutlen
 
-        if timeout is None:
+        # Nothing to flush when the key buffer is empty.
+        if timeout is None or not self.key_buffer:
             return
 
         counter = self._keys_pressed
 
-        def wait():
-            " Wait for timeout. "
-            time.sleep(timeout)
-
-            if len(self.key_buffer) > 0 and counter == self._keys_pressed:
-                # (No keys pressed in the meantime.)
-                call_from_executor(flush_keys)
-
         def flush_keys():
             " Flush keys. "
-            self.feed(_Flush)
-            self.process_keys()
+            if len(self.key_buffer) > 0 and counter == self._keys_pressed:
+                # (No keys pressed in the meantime.)
+                self.feed(_Flush)
+                self.process_keys()
 
         # Automatically flush keys.
-        # (_daemon needs to be set, otherwise, this will hang the
-        # application for .5 seconds before exiting.)
-        run_in_executor(wait, _daemon=True)
+        self._flush_wait_handle = call_later(timeout, flush_keys)
 
 
 class KeyPressEvent(object):
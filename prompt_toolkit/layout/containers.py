@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 
 from abc import ABCMeta, abstractmethod
 from functools import partial
+from itertools import count
 from six import with_metaclass, text_type
 from six.moves import range
 
@@ -15,12 +16,12 @@ from .margins import Margin
 from .screen import Point, WritePosition, _CHAR_CACHE
 from .utils import explode_text_fragments
 
-from prompt_toolkit.formatted_text.utils import fragment_list_to_text, fragment_list_width
+from prompt_toolkit.formatted_text.utils import fragment_list_to_text, fragment_list_width, split_lines
 from prompt_toolkit.application.current import get_app
 from prompt_toolkit.cache import SimpleCache
 from prompt_toolkit.filters import to_filter, vi_insert_mode, emacs_insert_mode
 from prompt_toolkit.mouse_events import MouseEvent, MouseEventType
-from prompt_toolkit.utils import take_using_weights, get_cwidth, to_int, to_str
+from prompt_toolkit.utils import take_using_weights, get_cwidth, to_int, to_str, is_printable_ascii
 
 __all__ = [
     'Container',
@@ -1122,6 +1123,95 @@ class WindowAlign:
     _ALL = (LEFT, RIGHT, CENTER)
 
 
+# Unique tokens, reported by `Window` for the regions it paints on the screen.
+_region_tokens = count()
+
+
+class _WindowOutput(object):
+    """
+    The output of one rendering of a `Window`. When nothing changes, this
+    can be painted again on the next screen.
+
+    :param key: The output key. (See `Window._get_output_key`.)
+    """
+    def __init__(self, key, ui_content, visible_line_to_row_col, rowcol_to_yx,
+                 margin_fragments):
+        self.key = key
+        self.visible_line_to_row_col = visible_line_to_row_col
+        self.rowcol_to_yx = rowcol_to_yx
+        self.margin_fragments = margin_fragments
+
+        # The visible lines. (These are consecutive.)
+        linenos = [lineno for lineno, _ in visible_line_to_row_col.values()]
+        if linenos:
+            self.linenos = range(min(linenos), max(linenos) + 1)
+        else:
+            self.linenos = range(0)
+
+        self.lines = self.get_lines(ui_content)
+
+        #: The painted cells, or `None` if no snapshot has been taken.
+        self.cells = None
+
+    def get_lines(self, ui_content):
+        " Return the lines of `ui_content` that are visible in this output. "
+        return [ui_content.get_line(i) for i in self.linenos]
+
+    def take_snapshot(self, window, screen, write_position, has_focus):
+        """
+        Remember the cells that the window painted on the screen.
+        """
+        data_buffer = screen.data_buffer
+        zero_width_escapes = screen.zero_width_escapes
+        xmin = write_position.xpos
+        xmax = write_position.xpos + write_position.width
+        xs = range(xmin, xmax)
+        cells = []
+
+        for y in range(write_position.ypos, write_position.ypos + write_position.height):
+            row = data_buffer[y]
+            escapes = zero_width_escapes.get(y) or {}
+
+            cells.append((
+                y,
+                [(x, row[x]) for x in xs if x in row],
+                [(x, e) for x, e in escapes.items() if xmin <= x < xmax]))
+
+        self.cells = cells
+        self.window = window
+        self.cursor_position = screen.cursor_positions.get(window)
+        self.menu_position = screen.menu_positions.get(window)
+        self.show_cursor = screen.show_cursor if has_focus else None
+        self.height = write_position.ypos + write_position.height
+
+    def paint(self, screen, has_focus):
+        """
+        Paint the remembered cells on the given screen.
+        """
+        data_buffer = screen.data_buffer
+        zero_width_escapes = screen.zero_width_escapes
+
+        for y, row_cells, row_escapes in self.cells:
+            row = data_buffer[y]
+            for x, char in row_cells:
+                row[x] = char
+
+            if row_escapes:
+                escapes_row = zero_width_escapes[y]
+                for x, e in row_escapes:
+                    escapes_row[x] = e
+
+        # Set cursor and menu positions. (Like `Window._copy_body` does.)
+        if self.cursor_position is not None:
+            screen.set_cursor_position(self.window, self.cursor_position)
+        if self.menu_position is not None:
+            screen.set_menu_position(self.window, self.menu_position)
+        if has_focus:
+            screen.show_cursor = self.show_cursor
+
+        screen.height = max(screen.height, self.height)
+
+
 class Window(Container):
     """
     Container that holds a control.
@@ -1229,6 +1319,14 @@ class Window(Container):
         self._ui_content_cache = SimpleCache(maxsize=8)
         self._margin_width_cache = SimpleCache(maxsize=1)
 
+        # Everything that determined the output of the last rendering. (See
+        # `_report_region`.)
+        self._last_region_key = None
+        self._last_row_keys = {}  # Maps rows to (row_key, token) tuples.
+
+        # The output of the last rendering. (A `_WindowOutput` instance.)
+        self._last_output = None
+
         self.reset()
 
     def __repr__(self):
@@ -1386,7 +1484,8 @@ class Window(Container):
         z_index = z_index if self.z_index is None else self.z_index
 
         draw_func = partial(self._write_to_screen_at_index, screen,
-                            mouse_handlers, write_position, parent_style, erase_bg)
+                            mouse_handlers, write_position, parent_style, erase_bg,
+                            z_index)
 
         if z_index is None or z_index <= 0:
             # When no z_index is given, draw right away.
@@ -1396,7 +1495,7 @@ class Window(Container):
             screen.draw_with_z_index(z_index=z_index, draw_func=draw_func)
 
     def _write_to_screen_at_index(self, screen, mouse_handlers, write_position,
-                                  parent_style, erase_bg):
+                                  parent_style, erase_bg, z_index=None):
         # Don't bother writing invisible windows.
         # (We save some time, but also avoid applying last-line styling.)
         if write_position.height <= 0 or write_position.width <= 0:
@@ -1416,22 +1515,44 @@ class Window(Container):
         wrap_lines = self.wrap_lines()
         self._scroll(ui_content, write_position.width - total_margin_width, write_position.height)
 
-        # Erase background and fill with `char`.
-        self._fill_bg(screen, write_position, erase_bg)
-
         # Resolve `align` attribute.
         align = self.align() if callable(self.align) else self.align
 
-        # Write body
-        visible_line_to_row_col, rowcol_to_yx = self._copy_body(
-            ui_content, screen, write_position,
-            sum(left_margin_widths), write_position.width - total_margin_width,
-            self.vertical_scroll, self.horizontal_scroll,
-            wrap_lines=wrap_lines, highlight_lines=True,
-            vertical_scroll_2=self.vertical_scroll_2,
-            always_hide_cursor=self.always_hide_cursor(),
-            has_focus=get_app().layout.current_control == self.content,
-            align=align)
+        has_focus = get_app().layout.current_control == self.content
+
+        def paint_body():
+            " Erase background, fill with `char` and write body. "
+            self._fill_bg(screen, write_position, erase_bg)
+
+            return self._copy_body(
+                ui_content, screen, write_position,
+                sum(left_margin_widths), write_position.width - total_margin_width,
+                self.vertical_scroll, self.horizontal_scroll,
+                wrap_lines=wrap_lines, highlight_lines=True,
+                vertical_scroll_2=self.vertical_scroll_2,
+                always_hide_cursor=self.always_hide_cursor(),
+                has_focus=has_focus,
+                align=align)
+
+        # When nothing that determines the output of the body changed since
+        # the previous rendering, we can reuse the output of that rendering,
+        # instead of copying the body again.
+        output_key = self._get_output_key(
+            screen, ui_content, write_position, parent_style, erase_bg,
+            z_index, align, wrap_lines, has_focus,
+            left_margin_widths + right_margin_widths)
+        last_output = self._last_output
+
+        reuse = (last_output is not None and
+                 last_output.cells is not None and
+                 last_output.key == output_key and
+                 last_output.get_lines(ui_content) == last_output.lines)
+
+        if reuse:
+            visible_line_to_row_col = last_output.visible_line_to_row_col
+            rowcol_to_yx = last_output.rowcol_to_yx
+        else:
+            visible_line_to_row_col, rowcol_to_yx = paint_body()
 
         # Remember render info. (Set before generating the margins. They need this.)
         x_offset = write_position.xpos + sum(left_margin_widths)
@@ -1504,44 +1625,221 @@ class Window(Container):
             y_max=write_position.ypos + write_position.height,
             handler=mouse_handler)
 
-        # Render and copy margins.
-        move_x = 0
+        # Retrieve margin fragments.
+        # (ConditionalMargin returns a zero width for the left margins. -- Don't render.)
+        left_margins = [(m, width) for m, width in zip(self.left_margins, left_margin_widths)
+                        if width > 0]
+        right_margins = list(zip(self.right_margins, right_margin_widths))
 
-        def render_margin(m, width):
-            " Render margin. Return `Screen`. "
-            # Retrieve margin fragments.
-            fragments = m.create_margin(self.render_info, width, write_position.height)
+        margin_fragments = [
+            m.create_margin(self.render_info, width, write_position.height)
+            for m, width in left_margins + right_margins]
 
-            # Turn it into a UIContent object.
-            # already rendered those fragments using this size.)
-            return FormattedTextControl(fragments).create_content(
-                width + 1, write_position.height)
+        if reuse and margin_fragments == last_output.margin_fragments:
+            # Copy the output of the previous rendering.
+            last_output.paint(screen, has_focus)
+        else:
+            if reuse:
+                # Only the margins changed. Paint the body again.
+                paint_body()
+
+            def render_margin(fragments, width):
+                " Turn the margin fragments into a UIContent object. "
+                # already rendered those fragments using this size.)
+                return FormattedTextControl(fragments).create_content(
+                    width + 1, write_position.height)
 
-        for m, width in zip(self.left_margins, left_margin_widths):
-            if width > 0:  # (ConditionalMargin returns a zero width. -- Don't render.)
-                # Create screen for margin.
-                margin_screen = render_margin(m, width)
+            # Copy margins.
+            move_x = 0
 
+            for (m, width), fragments in zip(left_margins, margin_fragments):
                 # Copy and shift X.
-                self._copy_margin(margin_screen, screen, write_position, move_x, width)
+                self._copy_margin(render_margin(fragments, width), screen,
+                                  write_position, move_x, width)
                 move_x += width
 
-        move_x = write_position.width - sum(right_margin_widths)
+            move_x = write_position.width - sum(right_margin_widths)
 
-        for m, width in zip(self.right_margins, right_margin_widths):
-            # Create screen for margin.
-            margin_screen = render_margin(m, width)
+            for (m, width), fragments in zip(right_margins, margin_fragments[len(left_margins):]):
+                # Copy and shift X.
+                self._copy_margin(render_margin(fragments, width), screen,
+                                  write_position, move_x, width)
+                move_x += width
 
-            # Copy and shift X.
-            self._copy_margin(margin_screen, screen, write_position, move_x, width)
-            move_x += width
+            # Apply 'self.style'
+            self._apply_style(screen, write_position, parent_style)
 
-        # Apply 'self.style'
-        self._apply_style(screen, write_position, parent_style)
+            # Remember this output. If the previous output was the same, we
+            # expect it to be reused, so take a copy of the painted cells.
+            output = _WindowOutput(
+                output_key, ui_content, visible_line_to_row_col, rowcol_to_yx,
+                margin_fragments)
+
+            if (last_output is not None and last_output.key == output_key and
+                    last_output.lines == output.lines and
+                    last_output.margin_fragments == margin_fragments and
+                    not self._painted_outside_region(
+                        ui_content, rowcol_to_yx, has_focus,
+                        write_position.width - total_margin_width)):
+                output.take_snapshot(self, screen, write_position, has_focus)
+
+            self._last_output = output
+
+        # Report the painted region to the screen.
+        self._report_region(
+            screen, ui_content, write_position, visible_line_to_row_col,
+            rowcol_to_yx, margin_fragments, parent_style, erase_bg, align,
+            wrap_lines)
 
         # Tell the screen that this user control has been painted.
         screen.visible_windows.append(self)
 
+    def _painted_outside_region(self, ui_content, rowcol_to_yx, has_focus, width):
+        """
+        True when the cursor decorations or color columns could have been
+        painted outside of the write position of this window. (When the cursor
+        is not visible, they are painted at (0, 0).)
+        """
+        cpos = ui_content.cursor_position
+
+        if (cpos.y, cpos.x) not in rowcol_to_yx and (
+                has_focus or self.cursorline() or self.cursorcolumn()):
+            return True
+
+        return any(cc.position >= width for cc in self._get_colorcolumns())
+
+    def _get_focus_key(self, has_focus):
+        """
+        Everything that determines what `_highlight_digraph` and
+        `_show_key_processor_key_buffer` will paint.
+        """
+        if has_focus:
+            app = get_app()
+            key_buffer = app.key_processor.key_buffer
+
+            return (self._get_digraph_char(),
+                    key_buffer[-1].data if key_buffer else None,
+                    _in_insert_mode() and not app.is_done)
+
+    def _get_colorcolumns(self):
+        " Return the list of `ColorColumn` instances. "
+        colorcolumns = self.colorcolumns
+        if callable(colorcolumns):
+            colorcolumns = colorcolumns()
+        return colorcolumns
+
+    def _get_output_key(self, screen, ui_content, write_position, parent_style,
+                        erase_bg, z_index, align, wrap_lines, has_focus,
+                        margin_widths):
+        """
+        Everything that determines the output of this window, except for the
+        content of the visible lines and the margins.
+        """
+        # A transparent float paints on top of other windows. Its output
+        # depends on what was painted below.
+        if not erase_bg and z_index is not None:
+            below = [list(screen.row_tokens.get(y, ()))
+                     for y in range(write_position.ypos, write_position.ypos + write_position.height)]
+        else:
+            below = None
+
+        return (
+            write_position.xpos, write_position.ypos,
+            write_position.width, write_position.height,
+            parent_style, to_str(self.style), erase_bg,
+            self.char() if callable(self.char) else self.char,
+            align, wrap_lines, self.vertical_scroll, self.vertical_scroll_2,
+            self.horizontal_scroll, ui_content.line_count,
+            ui_content.cursor_position, ui_content.menu_position,
+            ui_content.show_cursor, self.always_hide_cursor(), has_focus,
+            self._get_focus_key(has_focus), self.cursorline(), self.cursorcolumn(),
+            [(cc.position, cc.style) for cc in self._get_colorcolumns()],
+            margin_widths, below)
+
+    def _report_region(self, screen, ui_content, write_position,
+                       visible_line_to_row_col, rowcol_to_yx, margin_fragments,
+                       parent_style, erase_bg, align, wrap_lines):
+        """
+        Report the rows that we painted to the screen.
+
+        For every row, we report a token that stays the same as long as
+        everything that determines the output of this row is equal to the
+        previous rendering. (Lines that are reused from a cached `UIContent`
+        are compared by identity, so this is cheap.) That way, the renderer
+        can skip these rows while computing the diff.
+        """
+        has_focus = get_app().layout.current_control == self.content
+        cursorline = self.cursorline()
+        cursorcolumn = self.cursorcolumn()
+
+        colorcolumns = self._get_colorcolumns()
+        focus_key = self._get_focus_key(has_focus)
+
+        # Screen position of the cursor. (The cursor line, the digraph and the
+        # key processor key buffer are drawn there.)
+        cpos = ui_content.cursor_position
+        cursor_yx = rowcol_to_yx.get((cpos.y, cpos.x))
+
+        if cursor_yx is None:
+            # When the cursor is not visible, `_copy_body` uses (0, 0), which
+            # can be outside of this window. Consider that row as changed.
+            cursor_yx = (0, 0)
+            if has_focus or cursorline or cursorcolumn:
+                screen.report_row(0, next(_region_tokens))
+
+        # Everything that determines the output of all rows.
+        key = (
+            write_position.xpos, write_position.ypos,
+            write_position.width, write_position.height,
+            parent_style, to_str(self.style), erase_bg,
+            self.char() if callable(self.char) else self.char,
+            align, wrap_lines, self.horizontal_scroll,
+            cursorline, cursorcolumn and cursor_yx[1],
+            [(cc.position, cc.style) for cc in colorcolumns],
+            has_focus)
+
+        if key != self._last_region_key:
+            self._last_region_key = key
+            self._last_row_keys = {}
+
+        margin_lines = [list(split_lines(fragments)) for fragments in margin_fragments]
+        get_line = ui_content.get_line
+        last_row_keys = self._last_row_keys
+        row_keys = {}
+        lines = {}
+
+        for y in range(write_position.height):
+            # The line displayed on this row, and the column where it starts.
+            try:
+                lineno, col = visible_line_to_row_col[y]
+            except KeyError:
+                line = col = None
+            else:
+                try:
+                    line = lines[lineno]
+                except KeyError:
+                    line = lines[lineno] = get_line(lineno)
+
+            if write_position.ypos + y == cursor_yx[0]:
+                cursor_key = (cursor_yx[1], focus_key)
+            else:
+                cursor_key = None
+
+            row_key = (line, col, cursor_key,
+                       [m[y] if y < len(m) else None for m in margin_lines])
+
+            # Reuse the token of the previous rendering, if nothing changed.
+            previous = last_row_keys.get(y)
+            if previous is not None and previous[0] == row_key:
+                token = previous[1]
+            else:
+                token = next(_region_tokens)
+
+            row_keys[y] = (row_key, token)
+            screen.report_row(write_position.ypos + y, token)
+
+        self._last_row_keys = row_keys
+
     def _copy_body(self, ui_content, new_screen, write_position, move_x,
                    width, vertical_scroll=0, horizontal_scroll=0,
                    wrap_lines=False, highlight_lines=False,
@@ -1594,6 +1892,26 @@ class Window(Container):
                         new_screen.zero_width_escapes[y + ypos][x + xpos] += text
                         continue
 
+                    # Without wrapping, only copy the visible part of the
+                    # line. (For very long lines, like minified JSON.) Text
+                    # that consists of printable ASCII characters only has a
+                    # width of one for each character.
+                    if not wrap_lines:
+                        if x >= write_position.width:
+                            break
+
+                        if is_printable_ascii(text):
+                            if x < 0:
+                                skip = min(-x, len(text))
+                                text = text[skip:]
+                                col += skip
+                                x += skip
+
+                            visible_text = text[:write_position.width - x]
+                            col += len(text) - len(visible_text)
+                            x += len(text) - len(visible_text)
+                            text = visible_text
+
                     for c in text:
                         char = _CHAR_CACHE[c, style]
                         char_width = char.width
@@ -459,6 +459,10 @@ class BufferControl(UIControl):
         self._last_click_timestamp = None
         self._last_get_processed_line = None
 
+        # Processed lines of the last rendering. (See
+        # `_create_get_processed_line_func`.)
+        self._processed_lines = {}
+
     def __repr__(self):
         return '<%s(buffer=%r at %r>' % (self.__class__.__name__, self.buffer, id(self))
 
@@ -536,11 +540,13 @@ class BufferControl(UIControl):
         """
         Create a function that returns the fragments for a given line.
         """
-        # Cache using `document.text`.
+        # Cache using `document.text`. (Or the rope, so that its text doesn't
+        # have to be created.)
         def get_formatted_text_for_line():
             return self.lexer.lex_document(document)
 
-        key = (document.text, self.lexer.invalidation_hash())
+        text = document.text if document.rope is None else document.rope
+        key = (text, self.lexer.invalidation_hash())
         return self._fragment_cache.get(key, get_formatted_text_for_line)
 
     def _create_get_processed_line_func(self, document, width, height):
@@ -587,11 +593,29 @@ class BufferControl(UIControl):
             get_line = self._get_formatted_text_for_line_func(document)
             cache = {}
 
+            # Processed lines of the previous rendering can be reused, when
+            # the fragments and the invalidation hash of the processors for
+            # that line are the same.
+            previous_lines = self._processed_lines
+            processed_lines = self._processed_lines = {}
+
             def get_processed_line(i):
                 try:
                     return cache[i]
                 except KeyError:
-                    processed_line = transform(i, get_line(i))
+                    fragments = get_line(i)
+                    invalidation_hash = merged_processor.invalidation_hash(self, document, i)
+
+                    if invalidation_hash is None:
+                        processed_line = transform(i, fragments)
+                    else:
+                        key = (tuple(fragments), width, height, invalidation_hash)
+                        processed_line = previous_lines.get(key) or processed_lines.get(key)
+
+                        if processed_line is None:
+                            processed_line = transform(i, fragments)
+                        processed_lines[key] = processed_line
+
                     cache[i] = processed_line
                     return processed_line
             return get_processed_line
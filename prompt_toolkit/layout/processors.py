@@ -8,7 +8,6 @@ fragment types.
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 from six import with_metaclass, text_type
-from six.moves import range
 
 from prompt_toolkit.application.current import get_app
 from prompt_toolkit.cache import SimpleCache
@@ -19,9 +18,9 @@ from prompt_toolkit.formatted_text.utils import fragment_list_len, fragment_list
 from prompt_toolkit.search import SearchDirection
 from prompt_toolkit.utils import to_int, to_str
 
-from .utils import explode_text_fragments
+from .utils import add_style_to_ranges
 
-import re
+import bisect
 
 __all__ = [
     'Processor',
@@ -63,6 +62,15 @@ class Processor(with_metaclass(ABCMeta, object)):
         """
         return Transformation(transformation_input.fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        """
+        When this changes, `apply_transformation` could give a different
+        output for the given line. (Given the same input fragments.) This is
+        used by the :class:`~prompt_toolkit.layout.controls.BufferControl` to
+        reuse processed lines. `None` means that the output can't be reused.
+        """
+        return None
+
 
 class TransformationInput(object):
     """
@@ -116,11 +124,13 @@ class DummyProcessor(Processor):
     def apply_transformation(self, transformation_input):
         return Transformation(transformation_input.fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        return ()
+
 
 class HighlightSearchProcessor(Processor):
     """
     Processor that highlights search matches in the document.
-    Note that this doesn't support multiline search matches yet.
 
     The style classes 'search' and 'search.current' will be applied to the
     content.
@@ -134,44 +144,56 @@ class HighlightSearchProcessor(Processor):
         """
         return buffer_control.search_state.text
 
+    def _get_matches(self, buffer_control, document, lineno):
+        """
+        Return a list of (start, end, is_current) tuples for the search
+        matches in this line.
+        """
+        search_text = self._get_search_text(buffer_control)
+        result = []
+
+        if search_text and not get_app().is_done:
+            index = document.get_search_index(
+                search_text, buffer_control.search_state.ignore_case())
+            current_match = index.get_match_at(document.cursor_position)
+            line_start = document.translate_row_col_to_index(lineno, 0)
+
+            for start, end in index.get_matches_at_line(lineno):
+                is_current = bool(current_match and
+                                  current_match[0] <= line_start + start < current_match[1])
+                result.append((start, end, is_current))
+
+        return result
+
     def apply_transformation(self, transformation_input):
         buffer_control, document, lineno, source_to_display, fragments, _, _ = transformation_input.unpack()
 
-        search_text = self._get_search_text(buffer_control)
         searchmatch_fragment = ' class:%s ' % (self._classname, )
         searchmatch_current_fragment = ' class:%s ' % (self._classname_current, )
 
-        if search_text and not get_app().is_done:
-            # For each search match, replace the style string.
-            line_text = fragment_list_to_text(fragments)
-            fragments = explode_text_fragments(fragments)
+        matches = self._get_matches(buffer_control, document, lineno)
 
-            if buffer_control.search_state.ignore_case():
-                flags = re.IGNORECASE
-            else:
-                flags = 0
-
-            # Get cursor column.
-            if document.cursor_position_row == lineno:
-                cursor_column = source_to_display(document.cursor_position_col)
-            else:
-                cursor_column = None
+        if matches:
+            # For each search match, add the style string.
+            ranges = []
 
-            for match in re.finditer(re.escape(search_text), line_text, flags=flags):
-                if cursor_column is not None:
-                    on_cursor = match.start() <= cursor_column < match.end()
+            for start, end, is_current in matches:
+                if is_current:
+                    style = searchmatch_current_fragment
                 else:
-                    on_cursor = False
+                    style = searchmatch_fragment
 
-                for i in range(match.start(), match.end()):
-                    old_fragment, text = fragments[i]
-                    if on_cursor:
-                        fragments[i] = (old_fragment + searchmatch_current_fragment, fragments[i][1])
-                    else:
-                        fragments[i] = (old_fragment + searchmatch_fragment, fragments[i][1])
+                ranges.append((source_to_display(start), source_to_display(end), style))
+
+            fragments = add_style_to_ranges(fragments, ranges)
 
         return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        # The matches of this line. (Identical lines can have different
+        # matches, e.g. only one of them contains the current match.)
+        return tuple(self._get_matches(buffer_control, document, lineno))
+
 
 class HighlightIncrementalSearchProcessor(HighlightSearchProcessor):
     """
@@ -212,22 +234,24 @@ class HighlightSelectionProcessor(Processor):
             from_ = source_to_display(from_)
             to = source_to_display(to)
 
-            fragments = explode_text_fragments(fragments)
+            length = sum(len(fragment[1]) for fragment in fragments)
 
-            if from_ == 0 and to == 0 and len(fragments) == 0:
+            if from_ == 0 and to == 0 and length == 0:
                 # When this is an empty line, insert a space in order to
                 # visualise the selection.
                 return Transformation([(selected_fragment, ' ')])
             else:
-                for i in range(from_, to):
-                    if i < len(fragments):
-                        old_fragment, old_text = fragments[i]
-                        fragments[i] = (old_fragment + selected_fragment, old_text)
-                    elif i == len(fragments):
-                        fragments.append((selected_fragment, ' '))
+                fragments = add_style_to_ranges(fragments, [(from_, to, selected_fragment)])
+
+                # Selection of the line ending.
+                if from_ <= length < to:
+                    fragments.append((selected_fragment, ' '))
 
         return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        return (document.selection_range_at_line(lineno), )
+
 
 class PasswordProcessor(Processor):
     """
@@ -242,6 +266,9 @@ class PasswordProcessor(Processor):
         fragments = [(style, self.char * len(text)) for style, text in ti.fragments]
         return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        return self.char
+
 
 class HighlightMatchingBracketProcessor(Processor):
     """
@@ -291,6 +318,13 @@ class HighlightMatchingBracketProcessor(Processor):
         else:
             return []
 
+    def _get_positions(self, document):
+        " Return the positions to highlight. (Cached during one rendering.) "
+        text = document.text if document.rope is None else document.rope
+        key = (get_app().render_counter, text, document.cursor_position)
+        return self._positions_cache.get(
+            key, lambda: self._get_positions_to_highlight(document))
+
     def apply_transformation(self, transformation_input):
         buffer_control, document, lineno, source_to_display, fragments, _, _ = transformation_input.unpack()
 
@@ -299,27 +333,32 @@ class HighlightMatchingBracketProcessor(Processor):
             return Transformation(fragments)
 
         # Get the highlight positions.
-        key = (get_app().render_counter, document.text, document.cursor_position)
-        positions = self._positions_cache.get(
-            key, lambda: self._get_positions_to_highlight(document))
+        positions = self._get_positions(document)
 
         # Apply if positions were found at this line.
         if positions:
             for row, col in positions:
                 if row == lineno:
                     col = source_to_display(col)
-                    fragments = explode_text_fragments(fragments)
-                    style, text = fragments[col]
 
                     if col == document.cursor_position_col:
-                        style += ' class:matching-bracket.cursor '
+                        style = ' class:matching-bracket.cursor '
                     else:
-                        style += ' class:matching-bracket.other '
+                        style = ' class:matching-bracket.other '
 
-                    fragments[col] = (style, text)
+                    fragments = add_style_to_ranges(fragments, [(col, col + 1, style)])
 
         return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if get_app().is_done:
+            return ()
+
+        columns = tuple(col for row, col in self._get_positions(document) if row == lineno)
+        if columns:
+            return columns, document.cursor_position_col
+        return ()
+
 
 class DisplayMultipleCursors(Processor):
     """
@@ -332,32 +371,37 @@ class DisplayMultipleCursors(Processor):
 
         if vi_insert_multiple_mode():
             cursor_positions = buff.multiple_cursor_positions
-            fragments = explode_text_fragments(fragments)
+            length = sum(len(fragment[1]) for fragment in fragments)
 
             # If any cursor appears on the current line, highlight that.
             start_pos = document.translate_row_col_to_index(lineno, 0)
             end_pos = start_pos + len(document.lines[lineno])
 
             fragment_suffix = ' class:multiple-cursors'
+            columns = set(source_to_display(p - start_pos)
+                          for p in cursor_positions if start_pos <= p <= end_pos)
 
-            for p in cursor_positions:
-                if start_pos <= p <= end_pos:
-                    column = source_to_display(p - start_pos)
+            fragments = add_style_to_ranges(fragments, [
+                (column, column + 1, fragment_suffix)
+                for column in sorted(columns) if column < length])
 
-                    # Replace fragment.
-                    try:
-                        style, text = fragments[column]
-                    except IndexError:
-                        # Cursor needs to be displayed after the current text.
-                        fragments.append((fragment_suffix, ' '))
-                    else:
-                        style += fragment_suffix
-                        fragments[column] = (style, text)
+            # Cursor needs to be displayed after the current text.
+            if any(column >= length for column in columns):
+                fragments.append((fragment_suffix, ' '))
 
             return Transformation(fragments)
         else:
             return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if vi_insert_multiple_mode():
+            start_pos = document.translate_row_col_to_index(lineno, 0)
+            end_pos = start_pos + len(document.lines[lineno])
+
+            return tuple(sorted(p - start_pos for p in buffer_control.buffer.multiple_cursor_positions
+                                if start_pos <= p <= end_pos))
+        return ()
+
 
 class BeforeInput(Processor):
     """
@@ -388,6 +432,11 @@ class BeforeInput(Processor):
         return Transformation(fragments, source_to_display=source_to_display,
                               display_to_source=display_to_source)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if lineno == 0:
+            return tuple(to_formatted_text(self.text, self.style))
+        return ()
+
     def __repr__(self):
         return 'BeforeInput(%r, %r)' % (self.text, self.style)
 
@@ -434,6 +483,11 @@ class AfterInput(Processor):
         else:
             return Transformation(fragments=ti.fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if lineno == document.line_count - 1:
+            return tuple(to_formatted_text(self.text, self.style))
+        return ()
+
     def __repr__(self):
         return '%s(%r, style=%r)' % (
             self.__class__.__name__, self.text, self.style)
@@ -461,6 +515,15 @@ class AppendAutoSuggestion(Processor):
         else:
             return Transformation(fragments=ti.fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if lineno == document.line_count - 1:
+            buffer = buffer_control.buffer
+
+            if buffer.suggestion and document.is_cursor_at_the_end:
+                return buffer.suggestion.text
+            return ''
+        return ()
+
 
 class ShowLeadingWhiteSpaceProcessor(Processor):
     """
@@ -487,16 +550,24 @@ class ShowLeadingWhiteSpaceProcessor(Processor):
         # Walk through all te fragments.
         if fragments and fragment_list_to_text(fragments).startswith(' '):
             t = (self.style, self.get_char())
-            fragments = explode_text_fragments(fragments)
-
-            for i in range(len(fragments)):
-                if fragments[i][1] == ' ':
-                    fragments[i] = t
+            text = fragment_list_to_text(fragments)
+            count = len(text) - len(text.lstrip(' '))
+
+            # Replace the leading spaces.
+            result = [t] * count
+            for fragment in fragments:
+                if count >= len(fragment[1]):
+                    count -= len(fragment[1])
                 else:
-                    break
+                    result.append((fragment[0], fragment[1][count:]) + tuple(fragment[2:]))
+                    count = 0
+            fragments = result
 
         return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        return self.get_char()
+
 
 class ShowTrailingWhiteSpaceProcessor(Processor):
     """
@@ -522,18 +593,25 @@ class ShowTrailingWhiteSpaceProcessor(Processor):
 
         if fragments and fragments[-1][1].endswith(' '):
             t = (self.style, self.get_char())
-            fragments = explode_text_fragments(fragments)
+            text = fragment_list_to_text(fragments)
+            count = len(text) - len(text.rstrip(' '))
 
             # Walk backwards through all te fragments and replace whitespace.
-            for i in range(len(fragments) - 1, -1, -1):
-                char = fragments[i][1]
-                if char == ' ':
-                    fragments[i] = t
+            result = [t] * count
+            for fragment in reversed(fragments):
+                if count >= len(fragment[1]):
+                    count -= len(fragment[1])
                 else:
-                    break
+                    result.append((fragment[0], fragment[1][:len(fragment[1]) - count]) +
+                                  tuple(fragment[2:]))
+                    count = 0
+            fragments = result[::-1]
 
         return Transformation(fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        return self.get_char()
+
 
 class TabsProcessor(Processor):
     """
@@ -564,55 +642,78 @@ class TabsProcessor(Processor):
         separator1 = to_str(self.char1)
         separator2 = to_str(self.char2)
 
-        # Transform fragments.
-        fragments = explode_text_fragments(ti.fragments)
-
-        position_mappings = {}
+        # Transform fragments. Only the fragments that contain tabs are split.
+        # (For each tab, remember the position in the source and on the
+        # display, and the width.)
+        tab_positions = []
+        tab_display_positions = []
+        tab_widths = []
         result_fragments = []
+        source_pos = 0
         pos = 0
 
-        for i, fragment_and_text in enumerate(fragments):
-            position_mappings[i] = pos
-
-            if fragment_and_text[1] == '\t':
-                # Calculate how many characters we have to insert.
-                count = tabstop - (pos % tabstop)
-                if count == 0:
-                    count = tabstop
-
-                # Insert tab.
-                result_fragments.append((style, separator1))
-                result_fragments.append((style, separator2 * (count - 1)))
-                pos += count
-            else:
-                result_fragments.append(fragment_and_text)
-                pos += 1
-
-        position_mappings[len(fragments)] = pos
-        # Add `pos+1` to mapping, because the cursor can be right after the
-        # line as well.
-        position_mappings[len(fragments) + 1] = pos + 1
+        for fragment in ti.fragments:
+            if '\t' not in fragment[1]:
+                result_fragments.append(fragment)
+                source_pos += len(fragment[1])
+                pos += len(fragment[1])
+                continue
+
+            for i, text in enumerate(fragment[1].split('\t')):
+                if i > 0:
+                    # Calculate how many characters we have to insert.
+                    count = tabstop - (pos % tabstop)
+                    if count == 0:
+                        count = tabstop
+
+                    tab_positions.append(source_pos)
+                    tab_display_positions.append(pos)
+                    tab_widths.append(count)
+
+                    # Insert tab.
+                    result_fragments.append((style, separator1))
+                    result_fragments.append((style, separator2 * (count - 1)))
+                    source_pos += 1
+                    pos += count
+
+                if text:
+                    result_fragments.append((fragment[0], text) + tuple(fragment[2:]))
+                    source_pos += len(text)
+                    pos += len(text)
 
         def source_to_display(from_position):
             " Maps original cursor position to the new one. "
-            return position_mappings[from_position]
+            # Position after the last tab before this position.
+            i = bisect.bisect_left(tab_positions, from_position)
+            if i == 0:
+                return from_position
+            i -= 1
+            return (tab_display_positions[i] + tab_widths[i] +
+                    from_position - tab_positions[i] - 1)
 
         def display_to_source(display_pos):
             " Maps display cursor position to the original one. "
-            position_mappings_reversed = dict((v, k) for k, v in position_mappings.items())
-
-            while display_pos >= 0:
-                try:
-                    return position_mappings_reversed[display_pos]
-                except KeyError:
-                    display_pos -= 1
-            return 0
+            # The cursor can be right after the line as well.
+            display_pos = min(display_pos, pos + 1)
+
+            i = bisect.bisect_right(tab_display_positions, display_pos)
+            if display_pos < 0:
+                return 0
+            elif i == 0:
+                return display_pos
+            i -= 1
+            if display_pos < tab_display_positions[i] + tab_widths[i]:
+                return tab_positions[i]
+            return tab_positions[i] + 1 + display_pos - tab_display_positions[i] - tab_widths[i]
 
         return Transformation(
             result_fragments,
             source_to_display=source_to_display,
             display_to_source=display_to_source)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        return to_int(self.tabstop), to_str(self.char1), to_str(self.char2)
+
 
 class ReverseSearchProcessor(Processor):
     """
@@ -755,6 +856,14 @@ class ConditionalProcessor(Processor):
         else:
             return Transformation(transformation_input.fragments)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if self.filter():
+            value = self.processor.invalidation_hash(buffer_control, document, lineno)
+            if value is not None:
+                return True, value
+        else:
+            return False,
+
     def __repr__(self):
         return '%s(processor=%r, filter=%r)' % (
             self.__class__.__name__, self.processor, self.filter)
@@ -774,6 +883,16 @@ class DynamicProcessor(Processor):
         processor = self.get_processor() or DummyProcessor()
         return processor.apply_transformation(ti)
 
+    def invalidation_hash(self, buffer_control, document, lineno):
+        processor = self.get_processor()
+        if processor is None:
+            return ()
+
+        # (`get_processor` can return a new instance each time.)
+        value = processor.invalidation_hash(buffer_control, document, lineno)
+        if value is not None:
+            return type(processor), value
+
 
 def merge_processors(processors):
     """
@@ -826,3 +945,12 @@ class _MergedProcessor(Processor):
         del source_to_display_functions[:1]
 
         return Transformation(fragments, source_to_display, display_to_source)
+
+    def invalidation_hash(self, buffer_control, document, lineno):
+        result = []
+        for p in self.processors:
+            value = p.invalidation_hash(buffer_control, document, lineno)
+            if value is None:
+                return
+            result.append((type(p), value))
+        return tuple(result)
@@ -3,12 +3,15 @@ from __future__ import unicode_literals
 from prompt_toolkit.cache import FastDictCache
 from prompt_toolkit.utils import get_cwidth
 
+from array import array
 from collections import defaultdict, namedtuple
+from itertools import repeat
 
 __all__ = [
     'Point',
     'Size',
     'Screen',
+    'CompactScreen',
     'Char',
 ]
 
@@ -168,6 +171,14 @@ class Screen(object):
 
         self._draw_float_functions = []  # List of (z_index, draw_func)
 
+        #: For each row, the list of region tokens that have been reported by
+        #: the containers that painted on this row, in drawing order. (See
+        #: `report_region`.) When the tokens of a row are equal to the tokens
+        #: of the same row in the previous screen, the renderer knows that
+        #: the content of this row didn't change and it can be skipped while
+        #: computing the diff.
+        self.row_tokens = defaultdict(list)
+
     def set_cursor_position(self, window, position):
         " Set the cursor position for a given window. "
         self.cursor_positions[window] = position
@@ -224,6 +235,29 @@ class Screen(object):
             self._draw_float_functions = functions[1:]
             functions[0][1]()
 
+    def report_region(self, write_position, token):
+        """
+        Report that the area at the given `write_position` has been painted.
+
+        `token` should be an object that is only equal to a token that was
+        reported for a previous screen if the painted content is exactly the
+        same. (The renderer compares the tokens of every row with the previous
+        screen, and only looks at the individual characters of rows for which
+        the tokens are different.)
+
+        Code that writes directly into `data_buffer` should always report the
+        region it touched.
+        """
+        for y in range(write_position.ypos, write_position.ypos + write_position.height):
+            self.row_tokens[y].append(token)
+
+    def report_row(self, y, token):
+        """
+        Report that (a part of) row `y` has been painted. (Like
+        `report_region`, but for one single row.)
+        """
+        self.row_tokens[y].append(token)
+
     def append_style_to_content(self, style_str):
         """
         For all the characters in the screen.
@@ -231,10 +265,12 @@ class Screen(object):
         """
         b = self.data_buffer
         char_cache = _CHAR_CACHE
+        row_tokens = self.row_tokens
 
         append_style = ' ' + style_str
 
         for y, row in b.items():
+            row_tokens[y].append(append_style)
             for x, char in row.items():
                 b[y][x] = char_cache[char.char, char.style + append_style]
 
@@ -265,6 +301,141 @@ class Screen(object):
                 row[x] = char_cache[cell.char, prepend_style + cell.style + append_style]
 
 
+class _CharTable(object):
+    """
+    Interned characters of one `CompactScreen`. (Every screen has its own
+    table, so that the tables don't keep growing while the process lives.)
+    """
+    __slots__ = ('_ids', 'chars')
+
+    def __init__(self):
+        self._ids = {}  # Maps (char, style) tuples to integers.
+        self.chars = []  # Maps those integers back to `Char` instances.
+
+    def get_id(self, char):
+        " Return the integer that represents this `Char`. "
+        key = char.char, char.style
+
+        try:
+            return self._ids[key]
+        except KeyError:
+            result = self._ids[key] = len(self.chars)
+            self.chars.append(char)
+            return result
+
+
+class _CompactRow(object):
+    """
+    One row of a `CompactScreen`. This stores the characters as integers in
+    an array, but behaves like a dictionary that maps x positions to `Char`
+    instances. (-1 is used for positions that were never written.)
+
+    Negative positions are invisible. Writing those is a no-op.
+    """
+    __slots__ = ('_ids', '_default_char', '_table')
+
+    def __init__(self, default_char, table):
+        self._ids = array('i')
+        self._default_char = default_char
+        self._table = table
+
+    def __getitem__(self, x):
+        ids = self._ids
+
+        if 0 <= x < len(ids):
+            char_id = ids[x]
+            if char_id != -1:
+                return self._table.chars[char_id]
+        return self._default_char
+
+    def __setitem__(self, x, char):
+        if x < 0:
+            return
+
+        ids = self._ids
+        if x >= len(ids):
+            ids.extend(repeat(-1, x + 1 - len(ids)))
+
+        ids[x] = self._table.get_id(char)
+
+    def __contains__(self, x):
+        return 0 <= x < len(self._ids) and self._ids[x] != -1
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __bool__(self):
+        return any(char_id != -1 for char_id in self._ids)
+
+    __nonzero__ = __bool__  # For Python 2.
+
+    def keys(self):
+        return [x for x, char_id in enumerate(self._ids) if char_id != -1]
+
+    def items(self):
+        chars = self._table.chars
+        return [(x, chars[char_id]) for x, char_id in enumerate(self._ids)
+                if char_id != -1]
+
+
+class _CompactDataBuffer(dict):
+    """
+    Maps row numbers to `_CompactRow` instances. (Like a `defaultdict`.)
+    """
+    def __init__(self, default_char):
+        super(_CompactDataBuffer, self).__init__()
+        self.default_char = default_char
+        self.char_table = _CharTable()
+
+    def __missing__(self, y):
+        row = self[y] = _CompactRow(self.default_char, self.char_table)
+        return row
+
+
+class _ZeroWidthEscapesRow(dict):
+    """
+    Maps x positions to escape sequences. Missing positions are the empty
+    string. (They are not inserted, unlike a `defaultdict`.)
+    """
+    def __missing__(self, x):
+        return ''
+
+
+class _ZeroWidthEscapesBuffer(dict):
+    """
+    Maps row numbers to `_ZeroWidthEscapesRow` instances.
+    """
+    def __missing__(self, y):
+        row = self[y] = _ZeroWidthEscapesRow()
+        return row
+
+
+class CompactScreen(Screen):
+    """
+    :class:`.Screen` that stores the characters in arrays of integers,
+    instead of dictionaries of :class:`.Char` objects.
+
+    This has exactly the same interface as :class:`.Screen`, but uses much
+    less memory per rendered frame and creates less garbage. (This is useful
+    for large terminals, or when many applications are rendering in the same
+    process, like with the telnet server.) Reading and writing individual
+    cells is slightly slower.
+    """
+    def __init__(self, default_char=None, initial_width=0, initial_height=0):
+        super(CompactScreen, self).__init__(
+            default_char=default_char, initial_width=initial_width,
+            initial_height=initial_height)
+
+        if default_char is None:
+            default_char = _CHAR_CACHE[' ', Transparent]
+
+        self.data_buffer = _CompactDataBuffer(default_char)
+        self.zero_width_escapes = _ZeroWidthEscapesBuffer()
+
+
 class WritePosition(object):
     def __init__(self, xpos, ypos, width, height):
         assert height >= 0
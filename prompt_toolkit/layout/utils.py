@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 
 __all__ = [
     'explode_text_fragments',
+    'add_style_to_ranges',
 ]
 
 
@@ -59,3 +60,55 @@ def explode_text_fragments(fragments):
             result.append((style, c))
 
     return _ExplodedList(result)
+
+
+def add_style_to_ranges(fragments, ranges):
+    """
+    Return a copy of the fragments, where a style is added to the characters
+    in the given ranges. Fragments are only split at the range boundaries.
+    (Unlike exploding the fragments, this doesn't create a tuple for every
+    character.)
+
+    :param fragments: List of (style, text) tuples.
+    :param ranges: List of (start, end, style) tuples. The style is added to
+        the characters from `start` until `end`. The ranges should be sorted
+        and should not overlap.
+    """
+    result = []
+    append = result.append
+    ranges = [r for r in ranges if r[0] < r[1]]
+    r = 0
+    pos = 0
+
+    for fragment in fragments:
+        style, text = fragment[:2]
+        rest = tuple(fragment[2:])  # Mouse handler.
+        end = pos + len(text)
+
+        # Fragments without any characters in a range are taken as they are.
+        if r == len(ranges) or ranges[r][0] >= end:
+            append(fragment)
+            pos = end
+            continue
+
+        i = pos
+        while r < len(ranges) and ranges[r][0] < end:
+            range_start, range_end, range_style = ranges[r]
+            range_start = max(range_start, i)
+            range_stop = min(range_end, end)
+
+            if range_start > i:
+                append((style, text[i - pos:range_start - pos]) + rest)
+            append((style + range_style, text[range_start - pos:range_stop - pos]) + rest)
+            i = range_stop
+
+            if range_end <= end:
+                r += 1
+            else:
+                break
+
+        if i < end:
+            append((style, text[i - pos:]) + rest)
+        pos = end
+
+    return result
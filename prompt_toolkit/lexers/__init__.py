@@ -3,7 +3,7 @@ Lexer interface and implementations.
 Used for syntax highlighting.
 """
 from __future__ import unicode_literals
-from .base import Lexer, SimpleLexer, DynamicLexer
+from .base import Lexer, SimpleLexer, DynamicLexer, ThreadedLexer
 from .pygments import PygmentsLexer, SyntaxSync, SyncFromStart, RegexSync
 
 __all__ = [
@@ -11,6 +11,7 @@ __all__ = [
     'Lexer',
     'SimpleLexer',
     'DynamicLexer',
+    'ThreadedLexer',
 
     # Pygments.
     'PygmentsLexer',
@@ -4,11 +4,14 @@ Base classes for prompt_toolkit lexers.
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 from six import with_metaclass, text_type
+from prompt_toolkit.log import logger
+import threading
 
 __all__ = [
     'Lexer',
     'SimpleLexer',
     'DynamicLexer',
+    'ThreadedLexer',
 ]
 
 
@@ -76,3 +79,178 @@ class DynamicLexer(Lexer):
     def invalidation_hash(self):
         lexer = self.get_lexer() or self._dummy
         return id(lexer)
+
+
+class ThreadedLexer(Lexer):
+    """
+    Wrapper that runs the lexer in a background thread.
+
+    (Use this to prevent the user interface from becoming unresponsive when
+    lexing takes too much time, like for a big document with a
+    :class:`.PygmentsLexer` that lexes from the start.)
+
+    Lines that are not lexed yet are displayed as they were lexed for the
+    previous document (if they didn't change), or without highlighting.
+    The application is invalidated when lexed lines become available. Lexing
+    of a document stops when another document is lexed.
+
+    :param lexer: :class:`.Lexer` instance.
+    :param chunk_size: Lines are lexed in chunks of this size. In between, the
+        lexing can be stopped. (For a :class:`.PygmentsLexer`, this should be
+        smaller than `REUSE_GENERATOR_MAX_DISTANCE`.)
+    """
+    def __init__(self, lexer, chunk_size=50):
+        assert isinstance(lexer, Lexer), 'Got %r' % (lexer, )
+        assert chunk_size > 0
+
+        self.lexer = lexer
+        self.chunk_size = chunk_size
+
+        # Only one thread uses the lexer at a time.
+        self._lexer_lock = threading.Lock()
+        self._job = None
+
+    def lex_document(self, document):
+        from prompt_toolkit.application.current import get_app
+
+        previous_job = self._job
+        job = _LexerJob(self, document, get_app(return_none=True), previous_job)
+        self._set_job(job)
+
+        def get_line(lineno):
+            " Return the tokens for the given line. "
+            try:
+                return job.lines[lineno]
+            except KeyError:
+                # Lex the lines of this document again, when they are requested
+                # after another document was lexed.
+                if self._job is not job:
+                    self._set_job(job)
+
+                job.request(lineno)
+                return job.get_fallback_line(lineno)
+        return get_line
+
+    def _set_job(self, job):
+        if self._job is not None:
+            self._job.cancelled = True
+        job.cancelled = False
+        self._job = job
+
+    def invalidation_hash(self):
+        return self.lexer.invalidation_hash()
+
+    def __repr__(self):
+        return 'ThreadedLexer(%r)' % (self.lexer, )
+
+
+class _LexerJob(object):
+    """
+    Lexing of one document by a `ThreadedLexer`.
+    """
+    def __init__(self, threaded_lexer, document, app, previous_job):
+        self.threaded_lexer = threaded_lexer
+        self.document = document
+        self.app = app
+        self.cancelled = False
+
+        #: True when the lexer raised an exception. (The job is not retried,
+        #: the lines are shown without highlighting.)
+        self.failed = False
+
+        #: Map line numbers to the lexed lines.
+        self.lines = {}
+
+        # The lines to show until this document is lexed. (Of the last
+        # document for which lines were lexed.)
+        if previous_job is None:
+            self.fallback_lines, self.fallback_line_count = {}, 0
+        elif previous_job.lines:
+            self.fallback_lines = previous_job.lines
+            self.fallback_line_count = previous_job.document.line_count
+        else:
+            self.fallback_lines = previous_job.fallback_lines
+            self.fallback_line_count = previous_job.fallback_line_count
+
+        self._get_line = None  # Created in the thread.
+        self._lexed_until = 0
+        self._requested = set()
+        self._running = False
+        self._lock = threading.Lock()
+
+    def get_fallback_line(self, lineno):
+        """
+        The previously lexed line at this position, or at the same position
+        from the end of the document, if it has the same text. Otherwise, the
+        text without highlighting.
+        """
+        try:
+            text = self.document.lines[lineno]
+        except IndexError:
+            return []
+
+        offset = self.document.line_count - self.fallback_line_count
+
+        for i in (lineno, lineno - offset):
+            fragments = self.fallback_lines.get(i)
+            if fragments is not None and ''.join(f[1] for f in fragments) == text:
+                return fragments
+
+        return [('', text)]
+
+    def request(self, lineno):
+        " Lex the given line in the background. "
+        from prompt_toolkit.eventloop import run_in_executor
+
+        with self._lock:
+            self._requested.add(lineno)
+
+            if self._running or self.failed:
+                return
+            self._running = True
+
+        run_in_executor(self._run)
+
+    def _run(self):
+        " Lex the requested lines. (This runs in a thread.) "
+        chunk_size = self.threaded_lexer.chunk_size
+        requested = []
+
+        with self.threaded_lexer._lexer_lock:
+            try:
+                while True:
+                    with self._lock:
+                        # Lines that were not lexed because of a cancellation
+                        # are lexed when this document is requested again.
+                        self._requested.update(l for l in requested if l not in self.lines)
+
+                        if self.cancelled or not self._requested:
+                            self._running = False
+                            return
+                        requested = sorted(self._requested)
+                        self._requested = set()
+
+                    if self._get_line is None:
+                        self._get_line = self.threaded_lexer.lexer.lex_document(self.document)
+
+                    for lineno in requested:
+                        # Lex the lines until the requested line in chunks, to
+                        # be able to stop in between.
+                        while self._lexed_until + chunk_size < lineno and not self.cancelled:
+                            self._lexed_until += chunk_size
+                            self.lines[self._lexed_until] = self._get_line(self._lexed_until)
+
+                        if self.cancelled:
+                            break
+
+                        self.lines[lineno] = self._get_line(lineno)
+                        self._lexed_until = max(self._lexed_until, lineno)
+
+                    if self.app is not None:
+                        self.app.invalidate()
+            except Exception:
+                logger.exception('Lexing in ThreadedLexer failed.')
+
+                with self._lock:
+                    self.failed = True
+                    self._running = False
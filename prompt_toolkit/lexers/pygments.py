@@ -161,6 +161,16 @@ class PygmentsLexer(Lexer):
     # (This should probably be bigger than MIN_LINES_BACKWARDS.)
     REUSE_GENERATOR_MAX_DISTANCE = 100
 
+    # When the document was edited (compared to the previously lexed
+    # document), restart lexing at a synchronisation point at least this
+    # amount of lines before the first changed line. The lines before the
+    # change are compared to the previous document to verify this point.
+    INCREMENTAL_VERIFY_LINES = 10
+
+    # Lines after the change are taken from the previous document, once this
+    # amount of consecutive lines was lexed exactly like before.
+    INCREMENTAL_RESYNC_LINES = 5
+
     def __init__(self, pygments_lexer_cls, sync_from_start=True, syntax_sync=None):
         assert syntax_sync is None or isinstance(syntax_sync, SyntaxSync)
 
@@ -176,6 +186,9 @@ class PygmentsLexer(Lexer):
         # Create syntax sync instance.
         self.syntax_sync = syntax_sync or RegexSync.from_pygments_lexer_cls(pygments_lexer_cls)
 
+        # The lines and the lexed lines of the previous document.
+        self._previous = None
+
     @classmethod
     def from_filename(cls, filename, sync_from_start=True):
         """
@@ -203,6 +216,63 @@ class PygmentsLexer(Lexer):
         # Pygments generators that are currently lexing.
         line_generators = {}  # Map lexer generator to the line number.
 
+        # Lines that start in the middle of a token. (Like a multiline
+        # string.)
+        continued_lines = set()
+
+        # Compare with the previous document. The lexed lines before the first
+        # changed line can be reused, except for the lines of a token that
+        # continues in the changed line. (The end of that token could be
+        # different now.)
+        lines = document.lines
+
+        if self._previous is None:
+            previous_lines, previous_cache, previous_continued_lines = [], {}, set()
+        else:
+            previous_lines, previous_cache, previous_continued_lines = self._previous
+        self._previous = lines, cache, continued_lines
+
+        first_changed, common_suffix = _compare_lines(previous_lines, lines)
+
+        # When lines were added or removed at the end, the last common line
+        # got or lost its line ending, which ends the token on that line.
+        if first_changed > 0 and first_changed == min(len(lines), len(previous_lines)):
+            first_changed -= 1
+
+        while first_changed > 0 and first_changed in previous_continued_lines:
+            first_changed -= 1
+        line_offset = len(lines) - len(previous_lines)
+
+        # Find a synchronisation point before the change, from where the lines
+        # before the change are lexed again and compared with the previous
+        # document. (A regular expression of the lexer can look ahead beyond
+        # the change.) If they are equal, the previous lines are used and
+        # lexing continues from there, otherwise, the previous lines from
+        # that point can't be used. (When the change is close to the start,
+        # that's the first line. Without such a point, nothing before the
+        # change is reused.)
+        restart_row = None
+        if first_changed > 0:
+            if first_changed >= self.INCREMENTAL_VERIFY_LINES:
+                row, column = self.syntax_sync.get_sync_start_position(
+                    document, first_changed - self.INCREMENTAL_VERIFY_LINES)
+            else:
+                row, column = 0, 0
+
+            if (column == 0 and row not in previous_continued_lines and
+                    all(n in previous_cache for n in range(row, first_changed))):
+                restart_row = row
+
+        reuse_before = [0 if restart_row is None else restart_row]
+        restart_checked = [restart_row is None]
+        restart_generator = [None]
+
+        # Number of consecutive lines (for each generator) after the change
+        # that are equal to the previous document, and the line from where
+        # the previous document can be used again.
+        resync_counts = {}
+        resynced_from = [None]
+
         def get_syntax_sync():
             " The Syntax synchronisation object that we currently use. "
             if self.sync_from_start():
@@ -228,13 +298,51 @@ class PygmentsLexer(Lexer):
                 # still replace \r\n and \r by \n.  (We don't want that,
                 # Pygments should return exactly the same amount of text, as we
                 # have given as input.)
+                lineno = start_lineno
+
                 for _, t, v in self.pygments_lexer.get_tokens_unprocessed(text):
+                    # Remember the lines that start inside this token.
+                    newlines = v.count('\n')
+                    if newlines:
+                        # (The line after a trailing newline starts a new token.)
+                        if v.endswith('\n'):
+                            continued_lines.update(range(lineno + 1, lineno + newlines))
+                        else:
+                            continued_lines.update(range(lineno + 1, lineno + newlines + 1))
+                        lineno += newlines
+
                     # Turn Pygments `Token` object into prompt_toolkit `Token`
                     # objects.
                     yield _token_cache[t], v
 
             return enumerate(split_lines(get_text_fragments()), start_lineno)
 
+        def verify_restart():
+            """
+            Lex the lines from `restart_row` until the change again. When they
+            are equal to the previous document, the previous lines are valid
+            and the generator can be used for the lines after the change.
+            """
+            restart_checked[0] = True
+            generator = create_line_generator(restart_row)
+
+            for num, line in generator:
+                # (The first line misses the empty fragment of the token
+                # that ended the line before it.)
+                if not _same_fragments(line, previous_cache[num],
+                                       ignore_empty=(num == restart_row)):
+                    break
+
+                if num == first_changed - 1:
+                    reuse_before[0] = first_changed
+                    restart_generator[0] = generator
+                    line_generators[generator] = num
+                    return
+
+            # Not equal: the lexer was in another state at `restart_row`, or
+            # the lines are lexed differently now.
+            reuse_before[0] = restart_row
+
         def get_generator(i):
             """
             Find an already started generator that is close, or create a new one.
@@ -244,6 +352,12 @@ class PygmentsLexer(Lexer):
             if generator:
                 return generator
 
+            # When lexing from the start, continue after the change with the
+            # generator that started before the change.
+            if (i >= first_changed and restart_generator[0] in line_generators and
+                    self.sync_from_start()):
+                return restart_generator[0]
+
             # No generator found. Determine starting point for the syntax
             # synchronisation first.
 
@@ -274,15 +388,62 @@ class PygmentsLexer(Lexer):
             line_generators[generator] = row
             return generator
 
+        def get_previous_line(i):
+            " Return the lexed line from the previous document, if it's still valid. "
+            if i < reuse_before[0]:
+                previous_i = i
+            elif resynced_from[0] is not None and i >= resynced_from[0]:
+                previous_i = i - line_offset
+            else:
+                return
+
+            if previous_i in previous_continued_lines:
+                continued_lines.add(i)
+            return previous_cache.get(previous_i)
+
+        def compare_with_previous(generator, num, line):
+            """
+            Compare a lexed line after the change with the previous document.
+            After a couple of equal lines, the lexer is in the same state as
+            before, and the previous lines can be used again.
+            """
+            if (resynced_from[0] is None and num >= first_changed and
+                    num >= len(lines) - common_suffix):
+                continued = num in continued_lines
+
+                if not lines[num].strip():
+                    # Empty lines are equal in any lexer state.
+                    pass
+                elif (continued == (num - line_offset in previous_continued_lines) and
+                        _same_fragments(line, previous_cache.get(num - line_offset))):
+                    # Lines inside a token don't tell anything about the
+                    # lexer state. Only count the others.
+                    if not continued:
+                        resync_counts[generator] = resync_counts.get(generator, 0) + 1
+                        if resync_counts[generator] >= self.INCREMENTAL_RESYNC_LINES:
+                            resynced_from[0] = num + 1
+                else:
+                    resync_counts[generator] = 0
+
         def get_line(i):
             " Return the tokens for a given line number. "
             try:
                 return cache[i]
             except KeyError:
+                if not restart_checked[0] and i >= restart_row:
+                    verify_restart()
+
+                line = get_previous_line(i)
+                if line is not None:
+                    cache[i] = line
+                    return line
+
                 generator = get_generator(i)
 
                 # Exhaust the generator, until we find the requested line.
                 for num, line in generator:
+                    compare_with_previous(generator, num, line)
+
                     cache[num] = line
                     if num == i:
                         line_generators[generator] = i
@@ -299,3 +460,35 @@ class PygmentsLexer(Lexer):
             return []
 
         return get_line
+
+
+def _same_fragments(line1, line2, ignore_empty=False):
+    """
+    Compare two lexed lines.
+
+    :param ignore_empty: Ignore empty fragments. (Where the lexer started
+        matters for these.)
+    """
+    if line2 is None:
+        return False
+    if ignore_empty:
+        return [f for f in line1 if f[1]] == [f for f in line2 if f[1]]
+    return line1 == line2
+
+
+def _compare_lines(lines1, lines2):
+    """
+    Compare two lists of lines. Return the index of the first line that is
+    different and the number of equal lines at the end.
+    """
+    max_count = min(len(lines1), len(lines2))
+
+    start = 0
+    while start < max_count and lines1[start] == lines2[start]:
+        start += 1
+
+    end = 0
+    while end < max_count - start and lines1[-end - 1] == lines2[-end - 1]:
+        end += 1
+
+    return start, end
@@ -152,6 +152,15 @@ class Output(with_metaclass(ABCMeta, object)):
     def scroll_buffer_to_prompt(self):
         " For Win32 only. "
 
+    @property
+    def backlogged(self):
+        """
+        `True` when the output can't keep up with what has been written to
+        it. Rendering is skipped while this is the case. (The output has to
+        invalidate the application when it has caught up.)
+        """
+        return False
+
 
 class DummyOutput(Output):
     """
@@ -15,8 +15,6 @@ from prompt_toolkit.utils import is_windows
 
 from collections import deque
 from six.moves import range
-import time
-import threading
 
 __all__ = [
     'Renderer',
@@ -150,7 +148,19 @@ def _output_screen_diff(app, output, screen, current_pos, color_depth,
     row_count = min(max(screen.height, previous_screen.height), height)
     c = 0  # Column counter.
 
+    # Region tokens, reported by the containers that painted each row.
+    row_tokens = screen.row_tokens
+    previous_row_tokens = previous_screen.row_tokens
+
     for y in range(row_count):
+        # When the same regions were painted on this row with exactly the same
+        # content, the row didn't change. Skip it.
+        # (We use `get` in order not to create new entries in the
+        # `defaultdict`s. Rows without tokens are always compared.)
+        tokens = row_tokens.get(y)
+        if tokens and tokens == previous_row_tokens.get(y):
+            continue
+
         new_row = screen.data_buffer[y]
         previous_row = previous_screen.data_buffer[y]
         zero_width_escapes_row = screen.zero_width_escapes[y]
@@ -262,19 +272,25 @@ class Renderer(object):
         output = Vt100_Output.from_pty(sys.stdout)
         r = Renderer(style, output)
         r.render(app, layout=...)
+
+    :param screen_class: The :class:`.Screen` subclass to be used for
+        rendering. (E.g. :class:`.CompactScreen` for using less memory.)
     """
     CPR_TIMEOUT = 2  # Time to wait until we consider CPR to be not supported.
 
-    def __init__(self, style, output, full_screen=False, mouse_support=False, cpr_not_supported_callback=None):
+    def __init__(self, style, output, full_screen=False, mouse_support=False,
+                 cpr_not_supported_callback=None, screen_class=Screen):
         assert isinstance(style, BaseStyle)
         assert isinstance(output, Output)
         assert callable(cpr_not_supported_callback) or cpr_not_supported_callback is None
+        assert issubclass(screen_class, Screen)
 
         self.style = style
         self.output = output
         self.full_screen = full_screen
         self.mouse_support = to_filter(mouse_support)
         self.cpr_not_supported_callback = cpr_not_supported_callback
+        self.screen_class = screen_class
 
         self._in_alternate_screen = False
         self._mouse_support_enabled = False
@@ -409,19 +425,14 @@ class Renderer(object):
                 do_cpr()
 
                 def timer():
-                    time.sleep(self.CPR_TIMEOUT)
-
                     # Not set in the meantime -> not supported.
                     if self.cpr_support == CPR_Support.UNKNOWN:
                         self.cpr_support = CPR_Support.NOT_SUPPORTED
 
                         if self.cpr_not_supported_callback:
-                            # Make sure to call this callback in the main thread.
-                            get_event_loop().call_from_executor(self.cpr_not_supported_callback)
+                            self.cpr_not_supported_callback()
 
-                t = threading.Thread(target=timer)
-                t.daemon = True
-                t.start()
+                get_event_loop().call_later(self.CPR_TIMEOUT, timer)
 
     def report_absolute_cursor_row(self, row):
         """
@@ -466,27 +477,24 @@ class Renderer(object):
 
         f = Future()
 
+        # Timeout.
+        def on_timeout():
+            # Got timeout.
+            if not f.done():
+                self._waiting_for_cpr_futures = deque()
+                f.set_result(None)
+
+        timer = get_event_loop().call_later(timeout, on_timeout)
+
         # When a CPR has been received, set the result.
         def wait_for_responses():
             for response_f in cpr_futures:
                 yield From(response_f)
             if not f.done():
+                timer.cancel()
                 f.set_result(None)
         ensure_future(wait_for_responses())
 
-        # Timeout.
-        def wait_for_timeout():
-            time.sleep(timeout)
-
-            # Got timeout.
-            if not f.done():
-                self._waiting_for_cpr_futures = deque()
-                f.set_result(None)
-
-        t = threading.Thread(target=wait_for_timeout)
-        t.daemon = True
-        t.start()
-
         return f
 
     def render(self, app, layout, is_done=False):
@@ -521,7 +529,7 @@ class Renderer(object):
 
         # Create screen and write layout to it.
         size = output.get_size()
-        screen = Screen()
+        screen = self.screen_class()
         screen.show_cursor = False  # Hide cursor by default, unless one of the
                                     # containers decides to display it.
         mouse_handlers = MouseHandlers()
@@ -0,0 +1,339 @@
+"""
+Rope: immutable text, stored as a balanced tree of chunks.
+
+A :class:`.Rope` can be used instead of a string as the text of a
+:class:`~prompt_toolkit.document.Document`. Inserting or deleting text
+creates a new rope that shares all unchanged chunks with the original one, so
+that editing a big document doesn't require copying the whole text for every
+change. Every node knows the number of newlines below it, which makes
+translating between indexes and (row, column) positions fast as well.
+
+Ropes don't keep a copy of their text as a string. (Old versions of a rope
+can be kept around cheaply, for instance for undo.)
+"""
+from __future__ import unicode_literals
+
+import six
+from six.moves import range
+
+__all__ = [
+    'Rope',
+]
+
+# Size of the chunks when a rope is created from a string, and the maximum
+# size of a chunk when text is inserted in an existing chunk.
+_CHUNK_SIZE = 1024
+_MAX_CHUNK_SIZE = 2 * _CHUNK_SIZE
+
+
+class _Leaf(object):
+    " Chunk of text. "
+    __slots__ = ('text', 'length', 'newlines')
+    height = 0
+
+    def __init__(self, text):
+        self.text = text
+        self.length = len(text)
+        self.newlines = text.count('\n')
+
+
+class _Node(object):
+    " Concatenation of two subtrees. "
+    __slots__ = ('left', 'right', 'length', 'newlines', 'height')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = left.length + right.length
+        self.newlines = left.newlines + right.newlines
+        self.height = max(left.height, right.height) + 1
+
+
+def _build(text):
+    " Create a balanced tree for this text. (`None` for an empty string.) "
+    leaves = [_Leaf(text[i:i + _CHUNK_SIZE]) for i in range(0, len(text), _CHUNK_SIZE)]
+
+    def build(start, end):
+        if end - start == 1:
+            return leaves[start]
+        middle = (start + end) // 2
+        return _Node(build(start, middle), build(middle, end))
+
+    if leaves:
+        return build(0, len(leaves))
+
+
+def _balance(left, right):
+    """
+    Create a node for these subtrees. (Their heights can differ by two at most,
+    this does the rotations of an AVL tree when needed.)
+    """
+    if left.height > right.height + 1:
+        if left.left.height >= left.right.height:
+            return _Node(left.left, _Node(left.right, right))
+        middle = left.right
+        return _Node(_Node(left.left, middle.left), _Node(middle.right, right))
+
+    elif right.height > left.height + 1:
+        if right.right.height >= right.left.height:
+            return _Node(_Node(left, right.left), right.right)
+        middle = right.left
+        return _Node(_Node(left, middle.left), _Node(middle.right, right.right))
+
+    return _Node(left, right)
+
+
+def _join(left, right):
+    " Concatenate two trees. (Both can be `None`.) "
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if left.height == 0 and right.height == 0 and left.length + right.length <= _CHUNK_SIZE:
+        return _Leaf(left.text + right.text)
+
+    if left.height > right.height + 1:
+        return _balance(left.left, _join(left.right, right))
+    if right.height > left.height + 1:
+        return _balance(_join(left, right.left), right.right)
+    return _Node(left, right)
+
+
+def _split(node, index):
+    " Split a tree at this index. Return a (left, right) tuple of trees. "
+    if node is None:
+        return None, None
+
+    if node.height == 0:
+        if index <= 0:
+            return None, node
+        if index >= node.length:
+            return node, None
+        return _Leaf(node.text[:index]), _Leaf(node.text[index:])
+
+    left_length = node.left.length
+
+    if index < left_length:
+        left, right = _split(node.left, index)
+        return left, _join(right, node.right)
+    elif index > left_length:
+        left, right = _split(node.right, index - left_length)
+        return _join(node.left, left), right
+    else:
+        return node.left, node.right
+
+
+def _replace_in_leaf(node, start, end, text):
+    """
+    Replace the text between `start` and `end` when that range falls within
+    one chunk (the common case when typing). Only the path to that chunk is
+    copied. Returns `None` when this is not possible.
+    """
+    if node.height == 0:
+        new_text = node.text[:start] + text + node.text[end:]
+        if 0 < len(new_text) <= _MAX_CHUNK_SIZE:
+            return _Leaf(new_text)
+        return None
+
+    left_length = node.left.length
+
+    if end <= left_length:
+        left = _replace_in_leaf(node.left, start, end, text)
+        if left is not None:
+            return _Node(left, node.right)
+
+    elif start >= left_length:
+        right = _replace_in_leaf(node.right, start - left_length, end - left_length, text)
+        if right is not None:
+            return _Node(node.left, right)
+
+
+def _collect(node, start, end, result):
+    " Append the chunks of text between `start` and `end` to `result`. "
+    if start == 0 and end == node.length:
+        # The whole subtree. (Walk it without recursion.)
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.height:
+                stack.append(node.right)
+                stack.append(node.left)
+            else:
+                result.append(node.text)
+
+    elif node.height == 0:
+        result.append(node.text[start:end])
+    else:
+        left_length = node.left.length
+        if start < left_length:
+            _collect(node.left, start, min(end, left_length), result)
+        if end > left_length:
+            _collect(node.right, max(0, start - left_length), end - left_length, result)
+
+
+class Rope(object):
+    """
+    Immutable text, stored as a balanced tree of chunks.
+
+    Editing operations return a new :class:`.Rope` and take `O(log n)` time.
+    Slicing returns a string.
+
+    :param text: string
+    """
+    __slots__ = ('_root', )
+
+    def __init__(self, text=''):
+        assert isinstance(text, six.text_type), 'Got %r' % text
+        self._root = _build(text)
+
+    @classmethod
+    def _from_root(cls, root):
+        rope = cls.__new__(cls)
+        rope._root = root
+        return rope
+
+    def __repr__(self):
+        if len(self) < 15:
+            text = self.text
+        else:
+            text = self[:12] + '...'
+
+        return '%s(%r)' % (self.__class__.__name__, text)
+
+    def __len__(self):
+        if self._root is None:
+            return 0
+        return self._root.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.text[index]
+
+            result = []
+            if start < stop:
+                _collect(self._root, start, stop, result)
+            return ''.join(result)
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('Rope index out of range.')
+
+        node = self._root
+        while node.height:
+            if index < node.left.length:
+                node = node.left
+            else:
+                index -= node.left.length
+                node = node.right
+        return node.text[index]
+
+    @property
+    def text(self):
+        " The text as a string. "
+        return self[:]
+
+    def replace(self, start, end, text):
+        """
+        Return a new :class:`.Rope` in which the text between `start` and
+        `end` has been replaced by `text`.
+        """
+        assert 0 <= start <= end <= len(self)
+        assert isinstance(text, six.text_type)
+
+        if start == end and not text:
+            return self
+
+        root = self._root
+        new_root = None
+
+        if root is not None:
+            new_root = _replace_in_leaf(root, start, end, text)
+
+        if new_root is None:
+            left, rest = _split(root, start)
+            _, right = _split(rest, end - start)
+            new_root = _join(_join(left, _build(text)), right)
+
+        return Rope._from_root(new_root)
+
+    def insert(self, index, text):
+        " Return a new :class:`.Rope` with `text` inserted at `index`. "
+        return self.replace(index, index, text)
+
+    def delete(self, start, end):
+        " Return a new :class:`.Rope` without the text between `start` and `end`. "
+        return self.replace(start, end, '')
+
+    @property
+    def line_count(self):
+        " Number of lines. (A trailing newline starts a new line.) "
+        if self._root is None:
+            return 1
+        return self._root.newlines + 1
+
+    def get_line_start(self, row):
+        " Return the index of the first character of this line. "
+        assert 0 <= row < self.line_count
+
+        if row == 0:
+            return 0
+
+        # Find the newline that ends the previous line.
+        n = row - 1
+        offset = 0
+        node = self._root
+
+        while node.height:
+            left = node.left
+            if n < left.newlines:
+                node = left
+            else:
+                n -= left.newlines
+                offset += left.length
+                node = node.right
+
+        pos = -1
+        for _ in range(n + 1):
+            pos = node.text.find('\n', pos + 1)
+        return offset + pos + 1
+
+    def get_line(self, row):
+        " Return the text of this line, without newline. "
+        start = self.get_line_start(row)
+
+        if row + 1 < self.line_count:
+            end = self.get_line_start(row + 1) - 1
+        else:
+            end = len(self)
+
+        return self[start:end]
+
+    def translate_index_to_position(self, index):
+        """
+        Given an index for the text, return the corresponding (row, col) tuple.
+        (0-based.)
+        """
+        assert 0 <= index <= len(self)
+
+        # Count the newlines before this index.
+        row = 0
+        node = self._root
+
+        if node is not None:
+            i = index
+            while node.height:
+                left = node.left
+                if i < left.length:
+                    node = left
+                else:
+                    row += left.newlines
+                    i -= left.length
+                    node = node.right
+            row += node.text.count('\n', 0, i)
+
+        return row, index - self.get_line_start(row)
@@ -34,7 +34,7 @@ from prompt_toolkit.clipboard import DynamicClipboard, InMemoryClipboard
 from prompt_toolkit.completion import DynamicCompleter, ThreadedCompleter
 from prompt_toolkit.document import Document
 from prompt_toolkit.enums import DEFAULT_BUFFER, SEARCH_BUFFER, EditingMode
-from prompt_toolkit.eventloop import ensure_future, Return, From, get_event_loop
+from prompt_toolkit.eventloop import ensure_future, Return, From, get_event_loop, call_later
 from prompt_toolkit.filters import is_done, has_focus, renderer_height_is_known, to_filter, Condition, has_arg
 from prompt_toolkit.formatted_text import to_formatted_text, merge_formatted_text
 from prompt_toolkit.history import InMemoryHistory
@@ -62,8 +62,6 @@ from prompt_toolkit.widgets.toolbars import ValidationToolbar, SystemToolbar, Se
 from six import text_type
 
 import contextlib
-import threading
-import time
 
 __all__ = [
     'PromptSession',
@@ -649,25 +647,28 @@ class PromptSession(object):
     @contextlib.contextmanager
     def _auto_refresh_context(self):
         " Return a context manager for the auto-refresh loop. "
-        done = [False]  # nonlocal
+        timer = [None]  # nonlocal
+        done = [False]
 
         # Enter.
 
-        def run():
-            while not done[0]:
-                time.sleep(self.refresh_interval)
+        def refresh():
+            # (Stop when the context was left, maybe in another thread, after
+            # this timer fired.)
+            if not done[0]:
                 self.app.invalidate()
+                timer[0] = call_later(self.refresh_interval, refresh)
 
         if self.refresh_interval:
-            t = threading.Thread(target=run)
-            t.daemon = True
-            t.start()
+            timer[0] = call_later(self.refresh_interval, refresh)
 
         try:
             yield
         finally:
             # Exit.
             done[0] = True
+            if timer[0]:
+                timer[0].cancel()
 
     def prompt(
             self, message=None,
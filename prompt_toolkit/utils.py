@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 import inspect
 import os
+import re
 import signal
 import sys
 import threading
@@ -16,6 +17,7 @@ __all__ = [
     'Event',
     'DummyContext',
     'get_cwidth',
+    'is_printable_ascii',
     'suspend_to_background_supported',
     'is_conemu_ansi',
     'is_windows',
@@ -177,6 +179,8 @@ class _CharSizesCache(dict):
         #       text.
         if len(string) == 1:
             result = max(0, wcwidth(string))
+        elif is_printable_ascii(string):
+            result = len(string)
         else:
             result = sum(max(0, wcwidth(c)) for c in string)
 
@@ -190,6 +194,8 @@ class _CharSizesCache(dict):
 
 _CHAR_SIZES_CACHE = _CharSizesCache()
 
+_PRINTABLE_ASCII_RE = re.compile(r'[\x20-\x7e]*\Z')
+
 
 def get_cwidth(string):
     """
@@ -198,6 +204,14 @@ def get_cwidth(string):
     return _CHAR_SIZES_CACHE[string]
 
 
+def is_printable_ascii(string):
+    """
+    True when the string consists of printable ASCII characters only. (Each of
+    these has a width of one.)
+    """
+    return _PRINTABLE_ASCII_RE.match(string) is not None
+
+
 def suspend_to_background_supported():
     """
     Returns `True` when the Python implementation supports
@@ -1,13 +1,16 @@
 from __future__ import unicode_literals
 
-from prompt_toolkit.buffer import Buffer
+import gc
+
+from prompt_toolkit.buffer import Buffer, _get_change
+from prompt_toolkit.rope import Rope
 
 import pytest
 
 
-@pytest.fixture
-def _buffer():
-    buff = Buffer()
+@pytest.fixture(params=[False, True], ids=['string', 'rope'])
+def _buffer(request):
+    buff = Buffer(use_rope=request.param)
     return buff
 
 
@@ -110,3 +113,110 @@ def test_swap_characters_before_cursor(_buffer):
     _buffer.swap_characters_before_cursor()
 
     assert _buffer.text == 'hello wrold'
+
+
+def test_transform_current_line(_buffer):
+    _buffer.insert_text('abc\n\ndef')
+    _buffer.cursor_position = 1
+    _buffer.transform_current_line(lambda s: s.upper())
+
+    assert _buffer.text == 'ABC\n\ndef'
+    assert _buffer.cursor_position == 1
+
+    # Empty line.
+    _buffer.cursor_position = 4
+    _buffer.transform_current_line(lambda s: s.upper())
+
+    assert _buffer.text == 'ABC\n\ndef'
+
+
+def test_insert_text_derives_lines():
+    buff = Buffer()
+    buff.text = 'line 1\nline 2\n'
+    buff.document.lines
+    buff.document._line_start_indexes
+
+    buff.insert_text('new ')
+    gc.collect()
+    assert buff.document._cache.previous is not None
+    assert buff.document.lines == ['new line 1', 'line 2', '']
+
+
+def test_rope_storage():
+    buff = Buffer(use_rope=True)
+    buff.text = 'line\n' * 10000
+    buff.cursor_position = 5000
+
+    buff.save_to_undo_stack()
+    buff.insert_text('abc')
+    buff.delete_before_cursor(2)
+    buff.delete(3)
+
+    # The text is kept in a rope, which is shared with the documents.
+    document = buff.document
+    assert isinstance(buff._working_lines[buff.working_index], Rope)
+    assert document.rope is buff._working_lines[buff.working_index]
+    assert document.cursor_position_row == 1000
+    assert document.current_line == 'ae'
+    assert buff.text == 'line\n' * 1000 + 'ae\n' + 'line\n' * 8999
+
+    buff.undo()
+    assert buff.text == 'line\n' * 10000
+    buff.redo()
+    assert buff.text == 'line\n' * 1000 + 'ae\n' + 'line\n' * 8999
+
+    # The text of the rope is created only once.
+    assert buff.text is buff.text
+    assert buff.document.text is buff.text
+
+
+def test_get_change_of_ropes():
+    old = Rope('line\n' * 10000)
+    new = old.replace(20000, 20003, 'abcd')
+
+    assert _get_change(old, new) == (20000, 'lin', 'abcd')
+    assert _get_change('aaa', 'aaaa') == (3, '', 'a')
+    assert _get_change(Rope('abc'), Rope('abc')) == (3, '', '')
+
+
+def test_undo_stack_contains_changes(_buffer):
+    _buffer.text = 'line\n' * 10000
+
+    # Consecutive insertions and deletions are merged.
+    _buffer.save_to_undo_stack()
+    _buffer.cursor_position = 5
+    for c in 'hello':
+        _buffer.insert_text(c)
+    _buffer.delete_before_cursor(2)
+
+    _buffer.save_to_undo_stack()
+    _buffer.delete(2)
+    _buffer.delete(2)
+
+    assert [e.changes for e in _buffer._undo_stack] == [
+        [(5, '', 'hel')], [(8, 'line', '')]]
+
+    _buffer.undo()
+    assert _buffer.text == 'line\nhelline\n' + 'line\n' * 9998
+    _buffer.undo()
+    assert _buffer.text == 'line\n' * 10000
+    assert _buffer.cursor_position == 0
+
+    _buffer.redo()
+    _buffer.redo()
+    assert _buffer.text == 'line\nhel\n' + 'line\n' * 9998
+    assert _buffer.cursor_position == 8
+
+
+def test_max_undo_size():
+    buff = Buffer(max_undo_size=10)
+
+    for i in range(6):
+        buff.save_to_undo_stack()
+        buff.insert_text('abc')
+
+    # Only the last three changes are kept.
+    assert buff._undo_size == 9
+    for i in range(6):
+        buff.undo()
+    assert buff.text == 'abc' * 3
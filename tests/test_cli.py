@@ -6,9 +6,10 @@ input and check the result.
 from __future__ import unicode_literals
 
 from functools import partial
+from prompt_toolkit.application.current import get_app
 from prompt_toolkit.clipboard import InMemoryClipboard, ClipboardData
 from prompt_toolkit.enums import EditingMode
-from prompt_toolkit.filters import ViInsertMode
+from prompt_toolkit.filters import Condition, ViInsertMode
 from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.input.defaults import create_pipe_input
 from prompt_toolkit.input.vt100_parser import ANSI_SEQUENCES
@@ -29,7 +30,8 @@ def _history():
 
 def _feed_cli_with_input(
         text, editing_mode=EditingMode.EMACS, clipboard=None, history=None,
-        multiline=False, check_line_ending=True, key_bindings=None):
+        multiline=False, check_line_ending=True, key_bindings=None,
+        batch_text=False):
     """
     Create a Prompt, feed it with the given user input and return the CLI
     object.
@@ -40,7 +42,7 @@ def _feed_cli_with_input(
     if check_line_ending:
         assert text.endswith('\r')
 
-    inp = create_pipe_input()
+    inp = create_pipe_input(batch_text=batch_text)
 
     try:
         inp.send_text(text)
@@ -310,6 +312,39 @@ def test_controlx_controlx():
     assert result.text == 'hello worldX'
 
 
+def test_batched_text_input():
+    # Plain text is inserted at once, but only if every character would be
+    # handled by `self-insert`.
+    bindings = KeyBindings()
+
+    @bindings.add('j', 'j')
+    def _(event):
+        event.current_buffer.insert_text('X')
+
+    result, cli = _feed_cli_with_input('hijjab\r', key_bindings=bindings, batch_text=True)
+    assert result.text == 'hiXab'
+
+    # A numeric argument repeats only the first character.
+    result, cli = _feed_cli_with_input('\x1b4abc\r', batch_text=True)
+    assert result.text == 'aaaabc'
+
+    # Vi navigation mode.
+    result, cli = _feed_cli_with_input(
+        'hello\x1bbiX\r', editing_mode=EditingMode.VI, batch_text=True)
+    assert result.text == 'Xhello'
+
+    # A binding of which the filter depends on the text before it.
+    bindings = KeyBindings()
+
+    @bindings.add(' ', filter=Condition(lambda: get_app().current_buffer.text.endswith('teh')))
+    def _(event):
+        event.current_buffer.delete_before_cursor(3)
+        event.current_buffer.insert_text('the ')
+
+    result, cli = _feed_cli_with_input('teh x\r', key_bindings=bindings, batch_text=True)
+    assert result.text == 'the x'
+
+
 def test_emacs_history_bindings():
     # Adding a new item to the history.
     history = _history()
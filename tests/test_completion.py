@@ -7,7 +7,7 @@ import tempfile
 from contextlib import contextmanager
 from six import text_type
 
-from prompt_toolkit.completion import CompleteEvent, PathCompleter, WordCompleter
+from prompt_toolkit.completion import CompleteEvent, DynamicCompleter, PathCompleter, WordCompleter
 from prompt_toolkit.document import Document
 
 
@@ -314,3 +314,113 @@ def test_word_completer_dynamic_word_list():
     completions = completer.get_completions(Document('a'), CompleteEvent())
     assert [c.text for c in completions] == ['abc', 'aaa']
     assert called[0] == 2
+
+
+def test_word_completer_index_follows_word_list():
+    words = ['bar', 'Foo2', 'foo1', 'baz', 'fox', 'foo']
+    completer = WordCompleter(words, ignore_case=True)
+
+    completions = completer.get_completions(Document('FO'), CompleteEvent())
+    assert [c.text for c in completions] == ['Foo2', 'foo1', 'fox', 'foo']
+    index = completer._index
+
+    completions = completer.get_completions(Document('foo'), CompleteEvent())
+    assert [c.text for c in completions] == ['Foo2', 'foo1', 'foo']
+    assert completer._index is index
+
+    # Modifying the list rebuilds the index.
+    words.append('food')
+    words[0] = 'foobar'
+    completions = completer.get_completions(Document('foo'), CompleteEvent())
+    assert [c.text for c in completions] == ['foobar', 'Foo2', 'foo1', 'foo', 'food']
+    assert completer._index is not index
+
+    # Assigning another list rebuilds the index.
+    index = completer._index
+    completer.words = ['foo3']
+    completions = completer.get_completions(Document('foo'), CompleteEvent())
+    assert [c.text for c in completions] == ['foo3']
+    assert completer._index is not index
+
+
+def test_word_completer_index_of_callable():
+    # The index is reused as long as the callable returns the same list.
+    words = ['abc', 'abd']
+    completer = WordCompleter(lambda: words)
+
+    list(completer.get_completions(Document('a'), CompleteEvent()))
+    index = completer._index
+    list(completer.get_completions(Document('ab'), CompleteEvent()))
+    assert completer._index is index
+
+    words = ['abe']
+    completions = completer.get_completions(Document('ab'), CompleteEvent())
+    assert [c.text for c in completions] == ['abe']
+    assert completer._index is not index
+
+
+def test_word_completer_refine_completions():
+    completer = WordCompleter(['abc', 'abd', 'Abe', 'xyz'], ignore_case=True)
+    previous_document = Document('x a')
+    previous = list(completer.get_completions(previous_document, CompleteEvent()))
+
+    completions = completer.refine_completions(
+        Document('x aB'), CompleteEvent(text_inserted=True), previous_document, previous)
+    assert [(c.text, c.start_position) for c in completions] == [
+        ('abc', -2), ('abd', -2), ('Abe', -2)]
+
+    # A new word was started: can't refine.
+    assert completer.refine_completions(
+        Document('x a b'), CompleteEvent(text_inserted=True), previous_document, previous) is None
+
+
+def test_dynamic_completer_refine_completions():
+    completers = [WordCompleter(['abc', 'abd']), WordCompleter(['abx'])]
+    completer = DynamicCompleter(lambda: completers[0])
+    previous_document = Document('a')
+    previous = list(completer.get_completions(previous_document, CompleteEvent()))
+
+    completions = completer.refine_completions(
+        Document('ab'), CompleteEvent(text_inserted=True), previous_document, previous)
+    assert [c.text for c in completions] == ['abc', 'abd']
+
+    # Another completer can't refine these completions.
+    completers.pop(0)
+    assert completer.refine_completions(
+        Document('ab'), CompleteEvent(text_inserted=True), previous_document, previous) is None
+
+
+def test_buffer_refines_completions_while_typing():
+    from prompt_toolkit.buffer import Buffer
+    from prompt_toolkit.eventloop import get_event_loop, call_later
+
+    def insert_text(text):
+        # Insert text and let the completer coroutine finish.
+        buff.insert_text(text)
+        f = get_event_loop().create_future()
+        call_later(.05, lambda: f.set_result(None))
+        get_event_loop().run_until_complete(f)
+
+    class CountingCompleter(WordCompleter):
+        calls = 0
+
+        def get_completions(self, document, complete_event):
+            CountingCompleter.calls += 1
+            return super(CountingCompleter, self).get_completions(document, complete_event)
+
+    completer = CountingCompleter(['abc', 'abd', 'abde', 'xyz'])
+    buff = Buffer(completer=completer, complete_while_typing=True)
+
+    insert_text('a')
+    assert [c.text for c in buff.complete_state.completions] == ['abc', 'abd', 'abde']
+
+    insert_text('b')
+    insert_text('d')
+    assert [c.text for c in buff.complete_state.completions] == ['abd', 'abde']
+    assert CountingCompleter.calls == 1
+
+    # After deleting text, the completions are computed again.
+    buff.delete_before_cursor()
+    insert_text('x')
+    assert buff.complete_state is None
+    assert CountingCompleter.calls == 2
@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+import gc
+
 import pytest
 
 from prompt_toolkit.document import Document
@@ -78,3 +80,57 @@ def test_translate_index_to_position(document):
 def test_is_cursor_at_the_end(document):
     assert Document('hello', 5).is_cursor_at_the_end
     assert not Document('hello', 4).is_cursor_at_the_end
+
+
+def test_search_index():
+    document = Document('aaa\nbAa\naa', 0)
+    index = document.get_search_index('aa', ignore_case=True)
+
+    # Overlapping occurrences are found, but not highlighted.
+    assert index.positions == [0, 1, 5, 8]
+    assert index.find_after(1) == 1
+    assert index.find_after(0, count=2) == 5
+    assert index.find_before(len(document.text)) == 8
+    assert index.find_before(5) == 1
+    assert index.find_before(1) is None
+    assert index.get_matches_at_line(0) == [(0, 2)]
+    assert index.get_matches_at_line(1) == [(1, 3)]
+
+    # The index is shared with documents that have the same text.
+    assert Document(document.text).get_search_index('aa', True) is index
+
+    # Occurrences that span multiple lines.
+    index = document.get_search_index('a\nb')
+    assert index.get_matches_at_line(0) == [(2, 3)]
+    assert index.get_matches_at_line(1) == [(0, 1)]
+    assert index.get_match_at(4) == (2, 5)
+
+
+def test_replace():
+    document = Document('line 1\nline 2\nline 3\n', 9)
+
+    # Cursor stays at the same place in the surrounding text.
+    assert document.replace(0, 4, 'l').cursor_position == 6
+    assert document.replace(7, 11, 'LINE').text == 'line 1\nLINE 2\nline 3\n'
+    assert document.replace(7, 11, 'LINE').cursor_position == 11
+    assert document.replace(10, 12, '').cursor_position == 9
+    assert document.replace(0, 4, '', cursor_position=0).cursor_position == 0
+
+    # When the lines are known, the new document derives its lines from them.
+    document.lines
+    document._line_start_indexes
+    assert document.replace(0, 0, 'new ')._cache.previous is not None
+
+    # The derived cache is not kept alive by anything else than the document.
+    document.replace(0, 0, 'old ')
+    gc.collect()
+    assert Document('old ' + document.text)._cache.previous is None
+
+    for start, end, text in [(0, 0, 'a\nb'), (3, 10, ''), (6, 7, ''), (7, 7, '\n\n'),
+                             (21, 21, 'x'), (0, 21, ''), (13, 14, 'c\nd')]:
+        new_document = document.replace(start, end, text)
+        expected = Document(new_document.text)
+        assert new_document.lines == expected.lines
+        assert new_document._line_start_indexes == expected._line_start_indexes
+        assert new_document.cursor_position_row == expected.translate_index_to_position(
+            new_document.cursor_position)[0]
@@ -0,0 +1,228 @@
+from __future__ import unicode_literals
+from prompt_toolkit.eventloop import get_event_loop, set_event_loop
+from prompt_toolkit.eventloop.posix import PosixEventLoop
+from prompt_toolkit.eventloop.select import AutoSelector, PollSelector, SelectSelector
+from prompt_toolkit.eventloop.utils import ThreadPool
+import socket
+import threading
+import time
+import pytest
+
+
+@pytest.fixture
+def loop():
+    previous_loop = get_event_loop()
+    loop = PosixEventLoop(max_workers=2)
+    set_event_loop(loop)
+    yield loop
+    set_event_loop(previous_loop)
+    if not loop.closed:
+        loop.close()
+
+
+def test_run_in_executor_reuses_threads(loop):
+    threads = set()
+
+    def work():
+        threads.add(threading.current_thread())
+
+    for i in range(10):
+        loop.run_until_complete(loop.run_in_executor(work))
+
+    # Never more threads than `max_workers`.
+    assert len(threads) <= 2
+    assert loop.thread_pool.worker_count <= 2
+
+    # (The futures are set before the workers are done with the tasks, so
+    # wait for them.)
+    loop.close()
+    assert loop.thread_pool.active_tasks == 0
+
+
+def test_run_in_executor_result_and_exception(loop):
+    f = loop.run_in_executor(lambda: 42)
+    loop.run_until_complete(f)
+    assert f.result() == 42
+
+    def fail():
+        raise ValueError
+
+    f = loop.run_in_executor(fail)
+    f.add_done_callback(lambda f: None)  # Wake up the loop.
+    loop.run_until_complete(f)
+    with pytest.raises(ValueError):
+        f.result()
+
+
+def test_thread_pool_is_bounded():
+    pool = ThreadPool(max_workers=2)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def work():
+        started.release()
+        release.wait()
+
+    for i in range(5):
+        pool.submit(work)
+
+    started.acquire()
+    started.acquire()
+    assert pool.worker_count == 2
+    assert pool.active_tasks == 2
+    assert pool.queued_tasks == 3
+
+    release.set()
+    pool.shutdown(wait=True)
+    assert pool.active_tasks == 0
+    assert pool.queued_tasks == 0
+
+
+def test_thread_pool_daemon_tasks_dont_wait():
+    pool = ThreadPool(max_workers=1)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def work():
+        started.release()
+        release.wait()
+
+    pool.submit(work)
+    pool.submit(work, daemon=True)
+
+    # Both tasks are running, even though the pool has only one worker for
+    # regular tasks.
+    started.acquire()
+    started.acquire()
+    assert pool.active_tasks == 2
+    assert pool.queued_tasks == 0
+
+    release.set()
+    pool.shutdown(wait=True)
+
+    with pytest.raises(RuntimeError):
+        pool.submit(work)
+
+
+def test_thread_pool_blocked_daemon_tasks_dont_block_regular_tasks():
+    pool = ThreadPool(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+    done = threading.Event()
+
+    def blocking_work():
+        started.set()
+        release.wait()
+
+    pool.submit(blocking_work, daemon=True)
+    started.wait()
+
+    try:
+        pool.submit(done.set)
+        assert done.wait(5)
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
+
+
+def test_close_waits_for_running_tasks(loop):
+    done = []
+
+    def work():
+        release.wait()
+        done.append(True)
+
+    release = threading.Event()
+    loop.run_in_executor(work)
+    loop.run_until_complete(loop.run_in_executor(lambda: None))
+
+    threading.Timer(.1, release.set).start()
+    loop.close()
+    assert done == [True]
+
+
+def test_call_later_order_and_cancel(loop):
+    calls = []
+    f = loop.create_future()
+
+    loop.call_later(.03, lambda: calls.append(3))
+    loop.call_later(.01, lambda: calls.append(1))
+    handle = loop.call_later(.02, lambda: calls.append(2))
+    loop.call_later(.04, lambda: f.set_result(None))
+    handle.cancel()
+
+    loop.run_until_complete(f)
+    assert calls == [1, 3]
+    assert handle.cancelled
+
+
+def test_call_later_from_other_thread(loop):
+    # The loop is waiting in `select` without a timeout, a timer added from
+    # another thread should wake it up.
+    f = loop.create_future()
+
+    def add_timer():
+        loop.call_later(0, lambda: f.set_result(None))
+
+    threading.Timer(.05, add_timer).start()
+    loop.run_until_complete(f)
+    assert f.done()
+
+
+def test_call_at_accepts_int(loop):
+    f = loop.create_future()
+    handle = loop.call_at(int(time.time()), lambda: f.set_result(None))
+
+    loop.run_until_complete(f)
+    assert isinstance(handle.when, float)
+
+
+def test_poll_selector_timeout_in_seconds():
+    # The timeout of the selector is given in seconds. The loop should not
+    # wake up more than a couple of times while waiting for the timer.
+    calls = []
+
+    class CountingPollSelector(PollSelector):
+        def select_read_write(self, timeout):
+            calls.append(timeout)
+            return super(CountingPollSelector, self).select_read_write(timeout)
+
+    loop = PosixEventLoop(selector=CountingPollSelector)
+    try:
+        f = loop.create_future()
+        loop.call_later(.1, lambda: f.set_result(None))
+        loop.run_until_complete(f)
+    finally:
+        loop.close()
+
+    assert len(calls) < 5
+
+
+@pytest.mark.parametrize('selector', [AutoSelector, PollSelector, SelectSelector])
+def test_add_writer(selector):
+    loop = PosixEventLoop(selector=selector)
+    a, b = socket.socketpair()
+    done = loop.create_future()
+    result = []
+
+    def writable():
+        result.append('writable')
+        loop.remove_writer(a)
+        b.send(b'x')
+
+    def readable():
+        result.append(a.recv(10))
+        done.set_result(None)
+
+    try:
+        # Reader and writer for the same socket.
+        loop.add_reader(a, readable)
+        loop.add_writer(a, writable)
+        loop.run_until_complete(done)
+        loop.remove_reader(a)
+    finally:
+        loop.close()
+        a.close()
+        b.close()
+
+    assert result == ['writable', b'x']
@@ -1,5 +1,5 @@
 from __future__ import unicode_literals
-from prompt_toolkit.filters import Condition, Never, Always, Filter, to_filter
+from prompt_toolkit.filters import Condition, Never, Always, Filter, to_filter, cache_filter_results, filter_cache_statistics
 import pytest
 
 
@@ -58,3 +58,38 @@ def test_to_filter():
 
     with pytest.raises(TypeError):
         to_filter(4)
+
+
+def test_cache_filter_results():
+    calls = []
+
+    @Condition
+    def a():
+        calls.append('a')
+        return True
+
+    @Condition
+    def b():
+        calls.append('b')
+        return False
+
+    combined = a & ~b
+
+    filter_cache_statistics.reset()
+    with cache_filter_results():
+        assert combined()
+        assert combined()
+        assert a() and not b()
+
+        # Nested blocks share the cache.
+        with cache_filter_results():
+            assert combined()
+
+    assert calls == ['a', 'b']
+    assert filter_cache_statistics.saved == 4
+
+    # Outside of the block, and when disabled, nothing is cached.
+    combined()
+    with cache_filter_results(enabled=False):
+        combined()
+    assert calls == ['a', 'b'] * 3
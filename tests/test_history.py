@@ -0,0 +1,115 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.eventloop import Future, get_event_loop
+from prompt_toolkit.history import HistoryStrings, FileHistory, IndexedFileHistory, InMemoryHistory
+
+
+def test_history_strings():
+    strings = HistoryStrings(['c', 'd'])
+    strings.append('e')
+    strings.extendleft(['b', 'a'])
+
+    assert list(strings) == ['a', 'b', 'c', 'd', 'e']
+    assert list(reversed(strings)) == ['e', 'd', 'c', 'b', 'a']
+    assert strings[0] == 'a' and strings[-1] == 'e'
+    assert strings[1:3] == ['b', 'c']
+    assert strings.prepended == 2
+
+    copy = strings[:]
+    copy[2] = 'C'
+    copy[0] = 'A'
+    assert list(copy) == ['A', 'b', 'C', 'd', 'e']
+    assert list(strings) == ['a', 'b', 'c', 'd', 'e']
+
+
+def test_buffer_receives_loaded_strings():
+    history = InMemoryHistory()
+    buff = Buffer(history=history)
+    buff.text = 'input'
+
+    # Simulate loading, the newest string is loaded first.
+    history.get_strings().extendleft(['two', 'one'])
+    history.get_item_loaded_event().fire()
+
+    assert list(buff._working_lines) == ['one', 'two', 'input']
+    assert buff.working_index == 2
+
+    buff.history_backward()
+    assert buff.text == 'two'
+
+
+def _write_history(filename, strings):
+    history = FileHistory(filename)
+    for s in strings:
+        history.store_string(s)
+
+
+def test_indexed_file_history(tmpdir):
+    filename = str(tmpdir.join('history'))
+    _write_history(filename, ['first', 'multi\nline', '中文'])
+
+    history = IndexedFileHistory(filename)
+    entries = history.load_entries()
+    assert list(entries) == ['first', 'multi\nline', '中文']
+    assert entries[-1] == '中文'
+    assert list(entries[1:]) == ['multi\nline', '中文']
+    assert list(history.load_history_strings()) == \
+        list(FileHistory(filename).load_history_strings())
+
+    # The index is reused and extended for appended entries.
+    _write_history(filename, ['second', 'third'])
+    assert list(IndexedFileHistory(filename).load_entries()) == [
+        'first', 'multi\nline', '中文', 'second', 'third']
+
+    # A rewritten history file invalidates the index.
+    with open(filename, 'wb') as f:
+        f.write(b'+other\n')
+    assert list(IndexedFileHistory(filename).load_entries()) == ['other']
+
+
+def test_indexed_file_history_with_invalid_utf8(tmpdir):
+    filename = str(tmpdir.join('history'))
+    with open(filename, 'wb') as f:
+        f.write(b'\n# 2018-01-01\n+caf\xe9\n')
+
+    assert list(IndexedFileHistory(filename).load_entries()) == ['caf\ufffd']
+    assert list(FileHistory(filename).load_history_strings()) == ['caf\ufffd']
+
+
+def test_indexed_file_history_without_file(tmpdir):
+    history = IndexedFileHistory(str(tmpdir.join('missing')))
+    assert list(history.load_entries()) == []
+
+
+class _ManyStringsHistory(InMemoryHistory):
+    load_chunk_size = 100
+    load_chunk_time = 10
+
+    def load_history_strings(self):
+        # Newest first.
+        for i in range(1000, 0, -1):
+            yield 'line %i' % i
+
+
+def test_history_is_loaded_in_chunks():
+    history = _ManyStringsHistory()
+    events = []
+    done = Future()
+
+    def item_loaded(sender):
+        events.append(sender)
+        if len(history.get_strings()) == 1000:
+            done.set_result(None)
+
+    history.get_item_loaded_event().add_handler(item_loaded)
+
+    buff = Buffer(history=history)
+    get_event_loop().run_until_complete(done)
+
+    assert len(events) == 10
+    assert list(history.get_strings()) == ['line %i' % i for i in range(1, 1001)]
+    assert buff._working_lines[0] == 'line 1'
+    assert buff._working_lines[-2] == 'line 1000'
+    assert buff.working_index == 1000
@@ -140,3 +140,47 @@ def test_cpr_response_2(processor, stream):
     assert len(processor.keys) == 2
     assert processor.keys[0].key == Keys.CPRResponse
     assert processor.keys[1].key == Keys.ControlJ
+
+
+def test_batch_text(processor):
+    stream = Vt100Parser(processor.feed_key, batch_text=True)
+    stream.feed('\x1bhello\x01ab\x1b')
+    stream.feed('[Ac')
+
+    assert [(k.key, k.data) for k in processor.keys] == [
+        (Keys.Escape, '\x1b'),
+        ('h', 'h'),
+        (Keys.Any, 'ello'),
+        (Keys.ControlA, '\x01'),
+        (Keys.Any, 'ab'),
+        (Keys.Up, '\x1b[A'),
+        ('c', 'c'),
+    ]
+
+
+def test_bracketed_paste(processor, stream):
+    # The end mark is split over several chunks.
+    stream.feed('\x1b[200~hello')
+    stream.feed('\r\nworld\x1b[20')
+    stream.feed('1')
+    stream.feed('~a')
+
+    assert [(k.key, k.data) for k in processor.keys] == [
+        (Keys.BracketedPaste, 'hello\r\nworld'),
+        ('a', 'a'),
+    ]
+
+
+def test_bracketed_paste_streaming(processor):
+    stream = Vt100Parser(processor.feed_key, paste_chunk_size=4)
+    stream.feed('\x1b[200~abc\r')
+    assert [k.data for k in processor.keys] == []
+
+    # The end of the data could be the start of the end mark, and line
+    # endings are not split.
+    stream.feed('\nde\r\nfghi')
+    assert [k.data for k in processor.keys] == ['abc', '\r\nde']
+
+    stream.feed('j\x1b[201~')
+    assert [k.data for k in processor.keys] == ['abc', '\r\nde', '\r\nfg', 'hij']
+    assert all(k.key == Keys.BracketedPaste for k in processor.keys)
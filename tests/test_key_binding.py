@@ -2,11 +2,14 @@ from __future__ import unicode_literals
 
 from prompt_toolkit.application import Application
 from prompt_toolkit.application.current import set_app
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.filters import Condition
 from prompt_toolkit.input.defaults import create_pipe_input
 from prompt_toolkit.key_binding.key_bindings import KeyBindings
 from prompt_toolkit.key_binding.key_processor import KeyProcessor, KeyPress
 from prompt_toolkit.keys import Keys
 from prompt_toolkit.layout import Window, Layout
+from prompt_toolkit.layout.controls import BufferControl
 from prompt_toolkit.output import DummyOutput
 
 import pytest
@@ -182,3 +185,79 @@ def test_previous_key_sequence(processor):
         assert events[1].previous_key_sequence[0].data == 'a'
         assert events[1].previous_key_sequence[1].key == 'a'
         assert events[1].previous_key_sequence[1].data == 'a'
+
+
+def test_typeahead_is_inserted_at_once():
+    buff = Buffer()
+    app = Application(
+        layout=Layout(Window(BufferControl(buff))),
+        output=DummyOutput(),
+        input=create_pipe_input())
+
+    changes = []
+
+    def text_changed(sender):
+        changes.append(sender.text)
+
+    buff.on_text_changed += text_changed
+
+    with set_app(app):
+        app.key_processor.feed_multiple(
+            [KeyPress(c) for c in 'hello'] +
+            [KeyPress(Keys.ControlA, '\x01')] +
+            [KeyPress(c) for c in 'ab'])
+        app.key_processor.process_keys()
+
+    assert buff.text == 'abhello'
+    assert len(changes) == 2
+
+
+def test_typeahead_with_dynamic_filter():
+    # A binding of which the filter depends on the text typed before it in
+    # the same run.
+    buff = Buffer()
+    bindings = KeyBindings()
+
+    @bindings.add(' ', filter=Condition(lambda: buff.text.endswith('teh')))
+    def _(event):
+        buff.text = buff.text[:-3] + 'the '
+        buff.cursor_position = len(buff.text)
+
+    app = Application(
+        layout=Layout(Window(BufferControl(buff))),
+        key_bindings=bindings,
+        output=DummyOutput(),
+        input=create_pipe_input())
+
+    with set_app(app):
+        app.key_processor.feed_multiple([KeyPress(c) for c in 'teh x'])
+        app.key_processor.process_keys()
+
+    assert buff.text == 'the x'
+
+
+def test_bindings_with_any(handlers):
+    bindings = KeyBindings()
+    bindings.add('a', 'b')(handlers.a_b)
+    bindings.add(Keys.Any, 'b')(handlers.any_b)
+    bindings.add('a', Keys.Any)(handlers.a_any)
+    bindings.add('a', 'b', 'c')(handlers.a_b_c)
+    bindings.add(Keys.Any)(handlers.any)
+    bindings.add('a')(handlers.a)
+
+    def names(result):
+        return [''.join(k if len(k) == 1 else 'any' for k in b.keys) for b in result]
+
+    # Bindings with more 'Any' keys come first. (The last one has priority.)
+    assert names(bindings.get_bindings_for_keys(('a', 'b'))) == ['anyb', 'aany', 'ab']
+    assert names(bindings.get_bindings_for_keys(('x', 'b'))) == ['anyb']
+    assert names(bindings.get_bindings_for_keys(('a', ))) == ['any', 'a']
+    assert names(bindings.get_bindings_for_keys(('a', 'b', 'd'))) == []
+
+    assert names(bindings.get_bindings_starting_with_keys(('a', ))) == [
+        'ab', 'anyb', 'aany', 'abc']
+    assert names(bindings.get_bindings_starting_with_keys(('x', ))) == ['anyb']
+    assert names(bindings.get_bindings_starting_with_keys(('a', 'b'))) == ['abc']
+
+    # Every filter only once.
+    assert len(bindings.get_filters_starting_with_keys(('a', ))) == 1
@@ -1,8 +1,13 @@
+# encoding: utf-8
 from __future__ import unicode_literals
 
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.application.dummy import DummyApplication
+from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.layout import Layout, InvalidLayoutError
 from prompt_toolkit.layout.containers import HSplit, VSplit, Window
-from prompt_toolkit.layout.controls import BufferControl
+from prompt_toolkit.layout.controls import BufferControl, SearchBufferControl
+from prompt_toolkit.layout.processors import Processor, Transformation, TabsProcessor
 import pytest
 
 
@@ -56,3 +61,99 @@ def test_layout_class():
 def test_create_invalid_layout():
     with pytest.raises(InvalidLayoutError):
         Layout(HSplit([]))
+
+
+class _CountingProcessor(Processor):
+    def __init__(self, reusable=True):
+        self.reusable = reusable
+        self.linenos = []
+
+    def apply_transformation(self, ti):
+        self.linenos.append(ti.lineno)
+        return Transformation(ti.fragments)
+
+    def invalidation_hash(self, buffer_control, document, lineno):
+        if self.reusable:
+            return ()
+
+
+def test_processed_lines_are_reused():
+    processor = _CountingProcessor()
+    buff = Buffer()
+    buff.text = 'one\ntw\tthree\nfour'
+    control = BufferControl(buff, input_processors=[processor, TabsProcessor()])
+
+    def get_lines():
+        content = control.create_content(80, 10)
+        return [content.get_line(i) for i in range(content.line_count)]
+
+    lines = get_lines()
+    assert processor.linenos == [0, 1, 2]
+    assert lines[1] == [('', 'tw'), ('class:tab', '|'), ('class:tab', '┈'), ('', 'three'), ('', ' ')]
+
+    # Nothing changed.
+    assert get_lines() == lines
+    assert processor.linenos == [0, 1, 2]
+
+    # A new line, and a selection in line 2.
+    buff.text = 'zero\n' + buff.text
+    buff.cursor_position = 5
+    buff.start_selection()
+    buff.cursor_position = 7
+    get_lines()
+    assert sorted(processor.linenos[3:]) == [0, 1]
+
+    # Processors without invalidation hash are always applied.
+    processor.reusable = False
+    del processor.linenos[:]
+    get_lines()
+    get_lines()
+    assert sorted(processor.linenos) == [0, 0, 1, 1, 2, 2, 3, 3]
+
+
+def test_search_highlighting_keeps_fragments():
+    buff = Buffer()
+    buff.text = 'abc abc'
+    buff.cursor_position = 5
+    control = BufferControl(buff, search_buffer_control=SearchBufferControl())
+    control.search_state.text = 'bc'
+
+    with set_app(DummyApplication()):
+        line = control.create_content(80, 10).get_line(0)
+
+    assert line == [
+        ('', 'a'), (' class:search ', 'bc'), ('', ' a'),
+        (' class:search.current ', 'bc'), ('', ' ')]
+
+
+def test_multiline_search_highlighting():
+    buff = Buffer()
+    buff.text = 'ab\ncd'
+    buff.cursor_position = 0
+    control = BufferControl(buff, search_buffer_control=SearchBufferControl())
+    control.search_state.text = 'b\nc'
+
+    with set_app(DummyApplication()):
+        content = control.create_content(80, 10)
+        lines = [content.get_line(0), content.get_line(1)]
+
+    assert lines == [
+        [('', 'a'), (' class:search ', 'b'), ('', ' ')],
+        [(' class:search ', 'c'), ('', 'd'), ('', ' ')]]
+
+
+def test_search_highlighting_of_identical_lines():
+    buff = Buffer()
+    buff.text = 'foo\nfoo'
+    buff.cursor_position = 4
+    control = BufferControl(buff, search_buffer_control=SearchBufferControl())
+    control.search_state.text = 'foo'
+
+    with set_app(DummyApplication()):
+        content = control.create_content(80, 10)
+        lines = [content.get_line(0), content.get_line(1)]
+
+    # Only the second line contains the current match.
+    assert lines == [
+        [(' class:search ', 'foo'), ('', ' ')],
+        [(' class:search.current ', 'foo'), ('', ' ')]]
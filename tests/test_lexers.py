@@ -0,0 +1,136 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.document import Document
+from prompt_toolkit.eventloop import get_event_loop
+from prompt_toolkit.lexers import Lexer, PygmentsLexer, ThreadedLexer
+
+import pytest
+
+pygments = pytest.importorskip('pygments')
+
+
+def _lex(lexer, text):
+    document = Document(text)
+    get_line = lexer.lex_document(document)
+    return [[f for f in get_line(i) if f[1]] for i in range(len(document.lines))]
+
+
+def test_pygments_lexer_reuses_previous_document():
+    from pygments.lexers import PythonLexer
+
+    code = ''.join(
+        'def f%i(a):\n'
+        '    """\n'
+        '    Docstring.\n'
+        '    """\n'
+        '    return a + %i\n'
+        '\n' % (i, i) for i in range(50))
+
+    lexer = PygmentsLexer(PythonLexer)
+    lexed = []
+    get_tokens = lexer.pygments_lexer.get_tokens_unprocessed
+
+    def count_lexed_text(text):
+        for index, token, value in get_tokens(text):
+            lexed.append(len(value))
+            yield index, token, value
+    lexer.pygments_lexer.get_tokens_unprocessed = count_lexed_text
+
+    _lex(lexer, code)
+    del lexed[:]
+
+    # Edits in the middle: the result is equal to lexing from scratch, but
+    # only the text around the change is lexed.
+    for old, new in [('a + 25', 'a - 25'), ('a + 30', "'a + 30"), ("'a + 30", 'a + 30'),
+                     ('a + 35', '1\n    y = 2\n    return y')]:
+        code = code.replace(old, new, 1)
+        assert _lex(lexer, code) == _lex(PygmentsLexer(PythonLexer), code)
+        assert sum(lexed) < len(code) / 4
+        del lexed[:]
+
+
+def test_pygments_lexer_edits_equal_fresh_lex():
+    from pygments.lexers import PythonLexer
+
+    def lex_all(lexer, text):
+        document = Document(text)
+        get_line = lexer.lex_document(document)
+        return [get_line(i) for i in range(len(document.lines))]
+
+    texts = [
+        # A docstring is opened above the lines before the change.
+        '\'\'\'doc\n    return "s"\ndef f(a):\n"""\n',
+        '\'\'\'doc\n\'\'\'\n    return "s"\ndef f(a):\n"""\n',
+        '\'\'\'doc\n\'\'\'\n    return "s"\ndef f(a):\n"""\nx = 1',
+        '\'\'\'doc\n\'\'\'\n    return "s"\ndef f(a):\n"""',
+        # A string that continues over several lines.
+        '\nx = 1\n\'\'\'\\\n\\\ndef f(a):\n\\"""\'"\'\'',
+        '\nx = 1\n\'\'x = 1\'\\\n\\\ndef f(a):\n\\"""\'"\'\'',
+    ]
+
+    lexer = PygmentsLexer(PythonLexer)
+    for text in texts:
+        assert lex_all(lexer, text) == lex_all(PygmentsLexer(PythonLexer), text)
+
+
+def test_threaded_lexer():
+    from pygments.lexers import PythonLexer
+
+    def wait_for(get_line, lineno):
+        # Run the event loop (which starts the thread), until the line is
+        # lexed.
+        loop = get_event_loop()
+        for i in range(500):
+            if get_line(lineno) != [('', lines[lineno])]:
+                return get_line(lineno)
+            f = loop.create_future()
+            loop.call_later(.01, lambda: f.set_result(None))
+            loop.run_until_complete(f)
+
+    lines = ['x = %i' % i for i in range(1000)]
+    lexer = ThreadedLexer(PygmentsLexer(PythonLexer), chunk_size=10)
+    get_line = lexer.lex_document(Document('\n'.join(lines)))
+
+    # Lines are displayed without highlighting, until they are lexed.
+    assert get_line(500) == [('', 'x = 500')]
+    highlighted = wait_for(get_line, 500)
+    assert ('class:pygments.name', 'x') in highlighted
+
+    # The highlighted lines are shown for the changed document, until it's
+    # lexed again.
+    lines.insert(0, '"""')
+    get_line = lexer.lex_document(Document('\n'.join(lines)))
+    assert get_line(501) == highlighted
+    assert get_line(1) == [('', 'x = 0')]
+
+    assert ('class:pygments.literal.string.double', 'x = 0') in wait_for(get_line, 1)
+
+
+def test_threaded_lexer_failure():
+    calls = []
+
+    class FailingLexer(Lexer):
+        def lex_document(self, document):
+            def get_line(lineno):
+                calls.append(lineno)
+                raise ValueError
+            return get_line
+
+    lexer = ThreadedLexer(FailingLexer())
+    get_line = lexer.lex_document(Document('a\nb'))
+    assert get_line(0) == [('', 'a')]
+
+    # Wait until the job failed.
+    loop = get_event_loop()
+    for i in range(500):
+        if lexer._job.failed:
+            break
+        f = loop.create_future()
+        loop.call_later(.01, lambda: f.set_result(None))
+        loop.run_until_complete(f)
+
+    # The failing job is not started again.
+    assert lexer._job.failed
+    assert get_line(1) == [('', 'b')]
+    assert not lexer._job._running
+    assert calls == [0]
@@ -0,0 +1,163 @@
+# encoding: utf-8
+"""
+Test the screen diffing of the renderer.
+"""
+from __future__ import unicode_literals
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.input.base import DummyInput
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.layout.containers import HSplit, Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+from prompt_toolkit.layout.screen import Size, Screen, CompactScreen
+from prompt_toolkit.output.vt100 import Vt100_Output
+import pytest
+
+
+class _Capture:
+    " Emulate an stdout object. "
+    encoding = 'utf-8'
+
+    def __init__(self):
+        self._data = []
+
+    def write(self, data):
+        self._data.append(data)
+
+    def pop(self):
+        result = ''.join(self._data)
+        self._data = []
+        return result
+
+    def flush(self):
+        pass
+
+
+def _create_app(container, screen_class=Screen):
+    stdout = _Capture()
+    output = Vt100_Output(stdout, lambda: Size(rows=10, columns=40), write_binary=False)
+    app = Application(layout=Layout(container), input=DummyInput(),
+                      output=output, full_screen=True)
+    app.renderer.screen_class = screen_class
+    return app, stdout
+
+
+def _render(app, stdout):
+    with set_app(app):
+        app.render_counter += 1
+        app.renderer.render(app, app.layout)
+    return stdout.pop()
+
+
+@pytest.mark.parametrize('screen_class', [Screen, CompactScreen])
+def test_only_changed_rows_are_redrawn(screen_class):
+    top = FormattedTextControl('top-pane')
+    bottom = FormattedTextControl('bottom-pane')
+    app, stdout = _create_app(HSplit([
+        Window(top, height=1),
+        Window(bottom, height=1),
+    ]), screen_class=screen_class)
+
+    output = _render(app, stdout)
+    assert 'top-pane' in output
+    assert 'bottom-pane' in output
+
+    # Nothing changed.
+    output = _render(app, stdout)
+    assert 'pane' not in output
+
+    # Change only the bottom window.
+    bottom.text = 'bottom-text'
+    output = _render(app, stdout)
+    assert 'top-pane' not in output
+    assert 'text' in output
+
+    # Row tokens are equal for unchanged windows.
+    screen1 = app.renderer.last_rendered_screen
+    _render(app, stdout)
+    screen2 = app.renderer.last_rendered_screen
+    assert screen1.row_tokens[0] == screen2.row_tokens[0]
+    assert screen1.row_tokens[1] == screen2.row_tokens[1]
+
+
+@pytest.mark.parametrize('screen_class', [Screen, CompactScreen])
+def test_exit_style_invalidates_rows(screen_class):
+    app, stdout = _create_app(Window(FormattedTextControl('hello'), height=1),
+                              screen_class=screen_class)
+    _render(app, stdout)
+
+    app.exit_style = 'class:exiting'
+    output = _render(app, stdout)
+    assert 'hello' in output
+
+
+def test_compact_screen_renders_like_screen():
+    def render(screen_class):
+        app, stdout = _create_app(HSplit([
+            Window(FormattedTextControl([('bold', 'abc'), ('', '\u4e2d\u6587')]),
+                   height=2, style='bg:#ff0000'),
+            Window(FormattedTextControl('x'), width=3, char='-'),
+        ]), screen_class=screen_class)
+        return _render(app, stdout)
+
+    assert render(Screen) == render(CompactScreen)
+
+
+def test_only_changed_lines_of_a_window_are_redrawn():
+    control = FormattedTextControl('line-one\nline-two\nline-three')
+    app, stdout = _create_app(Window(control))
+    _render(app, stdout)
+
+    control.text = 'line-one\nline-2\nline-three'
+    output = _render(app, stdout)
+    assert '2' in output
+    assert 'one' not in output
+    assert 'three' not in output
+
+
+def test_output_of_unchanged_window_is_reused():
+    log = Window(FormattedTextControl('log-line'))
+    editor = FormattedTextControl('editor')
+    app, stdout = _create_app(HSplit([log, Window(editor, height=1)]))
+
+    copied = []
+    copy_body = log._copy_body
+
+    def count_copy_body(*a, **kw):
+        copied.append(True)
+        return copy_body(*a, **kw)
+    log._copy_body = count_copy_body
+
+    for i in range(4):
+        editor.text = 'editor %i' % i
+        output = _render(app, stdout)
+
+    # The log window is painted twice, the second time a snapshot is taken,
+    # after that, it's reused.
+    assert len(copied) == 2
+    assert '3' in output
+    assert 'log-line' not in output
+    assert app.renderer.last_rendered_screen.data_buffer[0][0].char == 'l'
+
+
+@pytest.mark.parametrize('horizontal_scroll', [0, 3, 9, 12, 60])
+def test_long_lines_are_clipped(horizontal_scroll, monkeypatch):
+    from prompt_toolkit.layout import containers
+
+    fragments = [('', 'a' * 10), ('class:x', '中文'), ('', 'é'),
+                 ('', 'b' * 10), ('class:y', 'c\x01' * 5), ('', 'd' * 1000)]
+
+    def render():
+        app, stdout = _create_app(Window(
+            FormattedTextControl(fragments),
+            get_horizontal_scroll=lambda window: horizontal_scroll))
+        _render(app, stdout)
+        screen = app.renderer.last_rendered_screen
+        return [(x, screen.data_buffer[0][x]) for x in range(40)]
+
+    clipped = render()
+
+    # Copying all the characters of the line gives the same result.
+    monkeypatch.setattr(containers, 'is_printable_ascii', lambda text: False)
+    assert render() == clipped
@@ -0,0 +1,73 @@
+from __future__ import unicode_literals
+
+import random
+
+from prompt_toolkit.document import Document
+from prompt_toolkit.rope import Rope
+
+
+def _check(rope, text):
+    assert len(rope) == len(text)
+    assert rope.text == text
+    assert rope.line_count == text.count('\n') + 1
+
+    lines = text.split('\n')
+    for row in range(len(lines)):
+        assert rope.get_line(row) == lines[row]
+
+    document = Document(text)
+    for index in range(0, len(text) + 1, 7):
+        assert rope.translate_index_to_position(index) == \
+            document.translate_index_to_position(index)
+
+
+def test_rope_edits():
+    r = random.Random(0)
+    text = ''.join(r.choice('ab\n') for _ in range(5000))
+    rope = Rope(text)
+    _check(rope, text)
+
+    for i in range(300):
+        start = r.randint(0, len(text))
+        end = min(len(text), start + r.choice([0, 1, 3, 200, 3000]))
+        data = ''.join(r.choice('cd\n') for _ in range(r.choice([0, 1, 5, 2500])))
+
+        new_rope = rope.replace(start, end, data)
+        new_text = text[:start] + data + text[end:]
+
+        assert new_rope.text == new_text
+        assert rope.text == text  # Unchanged.
+        rope, text = new_rope, new_text
+
+        if i % 50 == 0:
+            _check(rope, text)
+
+    _check(rope, text)
+    assert rope[10:20] == text[10:20]
+    assert rope[-5:] == text[-5:]
+    assert rope[-1] == text[-1]
+
+    _check(rope.delete(0, len(rope)), '')
+    _check(Rope('').insert(0, 'a\nb'), 'a\nb')
+
+
+def test_document_with_rope():
+    text = 'line %i\n' * 1000 % tuple(range(1000))
+    rope = Rope(text)
+
+    for cursor_position in [0, 6, 7, 3000, len(text)]:
+        d1 = Document(rope, cursor_position)
+        d2 = Document(text, cursor_position)
+
+        assert d1.text == d2.text
+        assert d1.cursor_position_row == d2.cursor_position_row
+        assert d1.cursor_position_col == d2.cursor_position_col
+        assert d1.current_line_before_cursor == d2.current_line_before_cursor
+        assert d1.current_line_after_cursor == d2.current_line_after_cursor
+        assert d1.current_char == d2.current_char
+        assert d1.char_before_cursor == d2.char_before_cursor
+        assert d1.line_count == d2.line_count
+
+        for row, col in [(0, 0), (5, 3), (5, 100), (-1, 2), (-2000, 4), (2000, 0)]:
+            assert d1.translate_row_col_to_index(row, col) == \
+                d2.translate_row_col_to_index(row, col)
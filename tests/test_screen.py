@@ -0,0 +1,63 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.layout.screen import Screen, CompactScreen, WritePosition, _CHAR_CACHE
+import pytest
+
+
+@pytest.mark.parametrize('screen_class', [Screen, CompactScreen])
+def test_data_buffer(screen_class):
+    screen = screen_class()
+    a = _CHAR_CACHE['a', 'class:a']
+    b = _CHAR_CACHE['b', '']
+
+    row = screen.data_buffer[2]
+    row[3] = a
+    row[5] = b
+
+    assert 2 in screen.data_buffer
+    assert 4 not in screen.data_buffer
+    assert 3 in row
+    assert 4 not in row
+    assert sorted(row.keys()) == [3, 5]
+    assert row[3] == a
+    assert row[4].char == ' '
+    assert max(row.keys()) == 5
+    assert not screen.data_buffer[4]
+
+
+@pytest.mark.parametrize('screen_class', [Screen, CompactScreen])
+def test_fill_area_and_append_style(screen_class):
+    screen = screen_class()
+    screen.data_buffer[0][0] = _CHAR_CACHE['x', '']
+
+    screen.fill_area(WritePosition(xpos=0, ypos=0, width=2, height=1), 'class:fill')
+    assert screen.data_buffer[0][0].char == 'x'
+    assert screen.data_buffer[0][0].style == 'class:fill '
+    assert screen.data_buffer[0][1].style == 'class:fill [transparent]'
+
+    screen.append_style_to_content('class:done')
+    assert screen.data_buffer[0][0].style == 'class:fill  class:done'
+
+
+def test_compact_screen_zero_width_escapes():
+    screen = CompactScreen()
+    screen.zero_width_escapes[1][2] += '\x1b]'
+    screen.zero_width_escapes[1][2] += 'x'
+
+    assert screen.zero_width_escapes[1][2] == '\x1b]x'
+    assert 3 not in screen.zero_width_escapes[1]
+
+
+def test_compact_screen_char_table():
+    # Every screen interns its own characters.
+    screen1 = CompactScreen()
+    screen1.data_buffer[0][0] = _CHAR_CACHE['a', 'class:a']
+    screen1.data_buffer[1][0] = _CHAR_CACHE['b', '']
+    screen1.data_buffer[1][1] = _CHAR_CACHE['a', 'class:a']
+
+    screen2 = CompactScreen()
+    screen2.data_buffer[0][0] = _CHAR_CACHE['b', '']
+
+    assert len(screen1.data_buffer.char_table.chars) == 2
+    assert len(screen2.data_buffer.char_table.chars) == 1
+    assert screen1.data_buffer[1][0] == screen2.data_buffer[0][0]
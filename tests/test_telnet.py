@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.contrib.telnet.protocol import TelnetProtocolParser
+from prompt_toolkit.eventloop import get_event_loop, set_event_loop
+from prompt_toolkit.eventloop.posix import PosixEventLoop
+from prompt_toolkit.input.memory import MemoryInput
+from prompt_toolkit.keys import Keys
+
+import pytest
+
+
+@pytest.fixture
+def loop():
+    previous_loop = get_event_loop()
+    loop = PosixEventLoop()
+    set_event_loop(loop)
+    yield loop
+    set_event_loop(previous_loop)
+    loop.close()
+
+
+def test_protocol_parser():
+    received = []
+    sizes = []
+    parser = TelnetProtocolParser(received.append, lambda rows, columns: sizes.append((rows, columns)))
+
+    # Data between commands is passed at once. Escaped IAC and NAWS
+    # subnegotiation (also when split over several chunks.)
+    parser.feed(b'hello\xff\xff world\x00!\xff\xfb')
+    parser.feed(b'\x01abc\xff\xfa\x1f\x00\x50')
+    parser.feed(b'\x00\x18\xff')
+    parser.feed(b'\xf0xyz')
+
+    assert received == [b'hello', b'\xff', b' world!', b'abc', b'xyz']
+    assert sizes == [(24, 80)]
+
+
+def test_memory_input(loop):
+    input = MemoryInput()
+    calls = []
+
+    # Data that is sent while not attached is kept.
+    input.send_bytes(b'ab\xc3')
+
+    def ready():
+        calls.append(input.read_keys())
+        if input.closed:
+            done.set_result(None)
+
+    done = loop.create_future()
+
+    with input.attach(ready):
+        input.send_bytes(b'\xa9\x1b')
+        input.close()
+        loop.run_until_complete(done)
+
+    keys = [key for keys in calls for key in keys]
+    assert ''.join(k.data for k in keys) == 'ab\xe9'
+    assert [k.key for k in input.flush_keys()] == [Keys.Escape]
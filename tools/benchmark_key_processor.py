@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Benchmark for the key processor.
+
+Feeds a burst of typed characters (typeahead) into the key processor of an
+application with the default key bindings and measures how many keys per
+second are processed, with and without merging the characters that are
+handled by `self-insert` into one insertion.
+"""
+from __future__ import unicode_literals, print_function
+
+import timeit
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.input.base import DummyInput
+from prompt_toolkit.key_binding.key_processor import KeyPress
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.layout.containers import Window
+from prompt_toolkit.layout.controls import BufferControl
+from prompt_toolkit.output import DummyOutput
+
+
+def benchmark(name, coalesce, count=2000, number=5):
+    text = ('SELECT * FROM table WHERE id = 1; ' * count)[:count]
+
+    def run():
+        buff = Buffer()
+        app = Application(layout=Layout(Window(BufferControl(buff))),
+                          input=DummyInput(), output=DummyOutput())
+        processor = app.key_processor
+
+        if not coalesce:
+            processor._coalesce_text = lambda key_press: key_press
+
+        with set_app(app):
+            processor.feed_multiple([KeyPress(c) for c in text])
+            processor.process_keys()
+
+        assert buff.text == text
+
+    duration = timeit.timeit(run, number=number) / number
+    print('%-16s %10.0f keys/s' % (name, count / duration))
+    return duration
+
+
+def main():
+    without = benchmark('one by one', coalesce=False)
+    with_ = benchmark('coalesced', coalesce=True)
+    print('%.1fx faster' % (without / with_))
+
+
+if __name__ == '__main__':
+    main()
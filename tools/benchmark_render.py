@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark for the screen diff of the renderer.
+
+Renders a layout twice, with only one changed line between both renderings,
+and measures how long it takes to compute the diff between both screens,
+with and without the row tokens that are reported by the windows.
+"""
+from __future__ import unicode_literals, print_function
+
+from collections import defaultdict
+import timeit
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.input.base import DummyInput
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.layout.containers import HSplit, VSplit, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+from prompt_toolkit.layout.screen import Size
+from prompt_toolkit.output.vt100 import Vt100_Output
+from prompt_toolkit.renderer import _output_screen_diff
+
+
+class _NullStdout(object):
+    encoding = 'utf-8'
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _prompt_layout():
+    buff = Buffer()
+    buff.text = 'SELECT * FROM table WHERE id = 1'
+    toolbar = FormattedTextControl('[F4] Emacs  [F5] Multiline')
+
+    def change():
+        buff.insert_text('2')
+
+    layout = HSplit([
+        Window(BufferControl(buff), height=1),
+        Window(toolbar, height=1, style='reverse'),
+    ])
+    return layout, Size(rows=24, columns=80), False, change
+
+
+def _full_screen_layout():
+    panes = [
+        FormattedTextControl('\n'.join(
+            'pane %i, line %i: %s' % (p, i, 'x' * 70) for i in range(90)))
+        for p in range(3)]
+
+    def change():
+        panes[1].text = panes[1].text.replace('line 45:', 'line 45!')
+
+    layout = VSplit([Window(p) for p in panes])
+    return layout, Size(rows=90, columns=300), True, change
+
+
+def benchmark(name, create_layout, number=200):
+    container, size, full_screen, change = create_layout()
+    output = Vt100_Output(_NullStdout(), lambda: size, write_binary=False)
+    app = Application(layout=Layout(container), input=DummyInput(),
+                      output=output, full_screen=full_screen)
+    renderer = app.renderer
+
+    with set_app(app):
+        app.render_counter += 1
+        renderer.render(app, app.layout)
+        previous_screen = renderer.last_rendered_screen
+
+        change()
+        app.render_counter += 1
+        renderer.render(app, app.layout)
+        screen = renderer.last_rendered_screen
+
+        def diff():
+            _output_screen_diff(
+                app, output, screen, renderer._cursor_pos, app.color_depth,
+                previous_screen, None, full_screen=full_screen,
+                attrs_for_style_string=renderer._attrs_for_style, size=size,
+                previous_width=size.columns)
+
+        with_tokens = timeit.timeit(diff, number=number) / number
+
+        screen.row_tokens = defaultdict(list)
+        previous_screen.row_tokens = defaultdict(list)
+        without_tokens = timeit.timeit(diff, number=number) / number
+
+    print('%-12s with row tokens: %8.3fms   without: %8.3fms   (%.1fx)' % (
+        name, with_tokens * 1000, without_tokens * 1000,
+        without_tokens / with_tokens))
+
+
+def main():
+    benchmark('prompt', _prompt_layout)
+    benchmark('full screen', _full_screen_layout, number=20)
+
+
+if __name__ == '__main__':
+    main()